@@ -1,14 +1,31 @@
-from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks
+from fastapi import FastAPI, WebSocket, WebSocketDisconnect, BackgroundTasks, HTTPException, Query, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 import uvicorn
-import json
+import hmac
+import os
+import datetime
 import asyncio
-import random
-from datetime import datetime, timedelta
-from typing import List, Dict, Any
+from typing import Dict, List, Any, Optional
 from sqlalchemy.orm import Session
 from database.db_config import engine
+from database.async_db import run_in_db_thread, run_with_session
+from database.checkpoint import Checkpointer
+from database.event_log import EventLogWriter, ensure_event_schema, query_events
+from database.redis_config import get_redis
 from database.models import Nation, Leader
+from game_logic.game_state import new_game_state, global_tension
+from game_logic.playable_nations import PlayableNationsCache, etag_matches
+from realtime.codecs import CodecError, decode, compression_dictionary, compression_stats
+from realtime.commands import CommandQueue, Reply, MAX_COMMANDS_PER_FRAME, command_response, create_registry
+from realtime.connections import ClientConnection
+from realtime.profiler import SamplingProfiler, DEFAULT_SAMPLE_INTERVAL
+from realtime.pubsub import FramePublisher, CommandConsumer, GatewayRelay, KEEPALIVE, ROOM_CLOSED_MESSAGE
+from realtime.rooms import Room, RoomRegistry, DEFAULT_ROOM
+from realtime.scheduler import TickScheduler, LoopLagMonitor
+from realtime.state_cache import StateCache
+from realtime.subscriptions import SUBSCRIBE, UNSUBSCRIBE
+from realtime import metrics
 
 # Create FastAPI app
 app = FastAPI(title="Geopolitics 2025 API", 
@@ -24,334 +41,461 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Initial default game state - used when resetting
-DEFAULT_GAME_STATE = {
-    "date": "January 20, 2025",
-    "speed": "normal",
-    "paused": True,
-    "nations": [
-        {"name": "United States", "leader": "Donald Trump", "gdp": 25000, "military_power": 100},
-        {"name": "China", "leader": "Li Qiang", "gdp": 18000, "military_power": 85},
-        {"name": "Russia", "leader": "Vladimir Putin", "gdp": 4000, "military_power": 70},
-        {"name": "India", "leader": "Narendra Modi", "gdp": 3500, "military_power": 65},
-        {"name": "France", "leader": "Emmanuel Macron", "gdp": 3000, "military_power": 60},
-        {"name": "Germany", "leader": "Friedrich Merz", "gdp": 4500, "military_power": 55},
-        {"name": "United Kingdom", "leader": "Keir Starmer", "gdp": 3200, "military_power": 58},
-        {"name": "Poland", "leader": "Sławomir Mentzen", "gdp": 800, "military_power": 30},
-        {"name": "Ukraine", "leader": "Volodymyr Zelenskyy", "gdp": 350, "military_power": 25},
-        {"name": "North Korea", "leader": "Kim Jong-un", "gdp": 30, "military_power": 20}
-    ],
-    "alliances": [
-        {
-            "name": "NATO",
-            "members": ["United States", "United Kingdom", "France", "Germany", "Poland"]
-        },
-        {
-            "name": "Shanghai Cooperation",
-            "members": ["China", "Russia"]
-        }
-    ],
-    "events": []
-}
+# Game state of the default room
+GAME_STATE = new_game_state()
+
+# Process role: "standalone" runs the simulation and serves clients in one
+# process; "simulation" also publishes frames to Redis for gateways;
+# "gateway" runs no simulation and relays frames from Redis to its clients
+GAME_ROLE = os.getenv("GAME_ROLE", "standalone")
+
+# Maximum number of rooms (independent games) hosted by this process
+MAX_ROOMS = int(os.getenv("MAX_ROOMS", "500"))
+
+# Seconds a room stays hosted with no clients (or, in the simulation role, no
+# commands or gateway keepalives), so a page refresh finds the game where it was
+ROOM_IDLE_TTL = float(os.getenv("ROOM_IDLE_TTL", "300"))
+
+publisher = None
+gateway = None
+if GAME_ROLE == "simulation":
+    publisher = FramePublisher(get_redis(), lambda room_id: snapshot_for_room(room_id))
+
+# Every generated event is appended to the game_events table in batches
+event_log = EventLogWriter() if GAME_ROLE != "gateway" else None
 
-# Game state
-GAME_STATE = DEFAULT_GAME_STATE.copy()
+# Latest state of every room is cached in Redis for HTTP readers; entries of
+# rooms that stop changing expire after STATE_CACHE_TTL seconds (0 disables).
+# Gateways only read it
+STATE_CACHE_TTL = float(os.getenv("STATE_CACHE_TTL", "60"))
+state_cache = StateCache(get_redis(), STATE_CACHE_TTL) if STATE_CACHE_TTL > 0 else None
 
-# WebSocket connection manager
-class ConnectionManager:
-    def __init__(self):
-        self.active_connections: List[WebSocket] = []
+rooms = RoomRegistry(GAME_STATE, new_game_state, publisher=publisher, max_rooms=MAX_ROOMS, event_log=event_log,
+                     state_cache=state_cache if GAME_ROLE != "gateway" else None)
+manager = rooms.default.manager
 
-    async def connect(self, websocket: WebSocket):
-        await websocket.accept()
-        self.active_connections.append(websocket)
-        # Send current game state upon connection
-        await self.send_personal_message(json.dumps(GAME_STATE), websocket)
+if GAME_ROLE == "gateway":
+    gateway = GatewayRelay(get_redis(), rooms)
 
-    def disconnect(self, websocket: WebSocket):
-        self.active_connections.remove(websocket)
+# Single fixed-timestep task ticking every active room; the policy decides
+# what happens to ticks whose deadline passed (catch_up, skip or slow_down)
+TICK_MISSED_DEADLINE_POLICY = os.getenv("TICK_MISSED_DEADLINE_POLICY", "catch_up")
+# Seconds command-driven state changes are collected before they are broadcast together
+FRAME_INTERVAL = float(os.getenv("FRAME_INTERVAL", "0.1"))
+# Client commands are validated on arrival, queued, and applied by the scheduler between ticks
+command_registry = create_registry(lambda: run_with_session(load_new_game_nations))
+command_queue = CommandQueue(command_registry)
+scheduler = TickScheduler(TICK_MISSED_DEADLINE_POLICY, FRAME_INTERVAL, command_queue)
 
-    async def send_personal_message(self, message: str, websocket: WebSocket):
-        await websocket.send_text(message)
+# Nation-select list, rebuilt only when the seed data version changes
+PLAYABLE_NATIONS_REVALIDATE_SECONDS = float(os.getenv("PLAYABLE_NATIONS_REVALIDATE_SECONDS", "5"))
+playable_nations = PlayableNationsCache(engine, PLAYABLE_NATIONS_REVALIDATE_SECONDS)
 
-    async def broadcast(self, message: str):
-        for connection in self.active_connections:
-            await connection.send_text(message)
+# Rooms are checkpointed to Redis every CHECKPOINT_INTERVAL seconds (0 disables)
+# and restored on startup; gateways hold no state of their own
+CHECKPOINT_INTERVAL = float(os.getenv("CHECKPOINT_INTERVAL", "5"))
+CHECKPOINT_RESTORE_TIMEOUT = float(os.getenv("CHECKPOINT_RESTORE_TIMEOUT", "10"))
+# Seconds the checkpoint of a room nobody rejoins is kept after the room is released (0 keeps it forever)
+CHECKPOINT_IDLE_TTL = float(os.getenv("CHECKPOINT_IDLE_TTL", str(7 * 24 * 3600)))
+checkpointer = None
+if CHECKPOINT_INTERVAL > 0 and GAME_ROLE != "gateway":
+    checkpointer = Checkpointer(get_redis(), rooms, CHECKPOINT_INTERVAL, CHECKPOINT_RESTORE_TIMEOUT,
+                                CHECKPOINT_IDLE_TTL)
 
-    async def broadcast_game_state(self):
-        if self.active_connections:
-            await self.broadcast(json.dumps(GAME_STATE))
+# Proves the event loop stays free while database work runs on its thread pool
+loop_monitor = LoopLagMonitor()
 
-manager = ConnectionManager()
+# Prometheus metrics: hot paths update counters and histograms; connection
+# counts and queue depths are only read when /metrics is scraped
+metrics.instrument_engine(engine)
+metrics.registry.register(metrics.Gauge(
+    "geo_active_connections", "Open WebSocket connections, per room",
+    lambda: [((room.id,), room.connection_count) for room in list(rooms.rooms.values())], ("room",)
+))
+metrics.registry.register(metrics.Gauge(
+    "geo_client_queue_depth", "Messages queued for each client's writer",
+    lambda: [
+        ((room.id, connection.id), len(connection.queue))
+        for room in list(rooms.rooms.values())
+        for connection in list(room.manager.active_connections.values())
+    ],
+    ("room", "client")
+))
+metrics.registry.register(metrics.Gauge(
+    "geo_event_loop_lag_max_seconds", "Worst event loop lag seen", lambda: [((), loop_monitor.max_lag)]
+))
+metrics.registry.register(metrics.Gauge(
+    "geo_scheduler_active_rooms", "Rooms the tick scheduler is ticking", lambda: [((), scheduler.active_rooms)]
+))
+metrics.registry.register(metrics.Gauge(
+    "geo_scheduler_missed_deadlines", "Tick deadlines skipped or slipped under the missed deadline policy",
+    lambda: [((), scheduler.missed_deadlines)]
+))
+
+def snapshot_for_room(room_id: str) -> Optional[str]:
+    room = rooms.get(room_id)
+    return room.manager.snapshot_message() if room else None
 
 # Game simulation task
 async def simulate_game_progression():
-    current_date = datetime.strptime(GAME_STATE["date"], "%B %d, %Y")
-    
-    # Define speed multipliers
-    speed_multipliers = {
-        "very_slow": 0.5,
-        "slow": 0.8,
-        "normal": 1.0,
-        "fast": 1.5,
-        "very_fast": 2.0
-    }
-    
-    while True:
-        try:
-            # Skip simulation if game is paused
-            if GAME_STATE["paused"]:
-                await asyncio.sleep(1)
-                continue
-                
-            # Get speed multiplier
-            multiplier = speed_multipliers.get(GAME_STATE["speed"], 1.0)
-            
-            # Advance date
-            current_date += timedelta(days=1)
-            GAME_STATE["date"] = current_date.strftime("%B %d, %Y")
-            
-            # Update nation data
-            for nation in GAME_STATE["nations"]:
-                # Simulate economic growth
-                gdp_change = random.uniform(-0.2, 0.5) * multiplier
-                nation["gdp"] = round(max(nation["gdp"] * (1 + gdp_change / 100), 10), 1)
-                
-                # Simulate military changes
-                military_change = random.uniform(-0.1, 0.2) * multiplier
-                nation["military_power"] = round(min(max(nation["military_power"] * (1 + military_change / 100), 10), 100), 1)
-            
-            # Random events (very rare)
-            if random.random() < 0.01 * multiplier:
-                event_types = ["political", "economic", "military", "disaster"]
-                event_type = random.choice(event_types)
-                nations = [nation["name"] for nation in GAME_STATE["nations"]]
-                affected_nation = random.choice(nations)
-                
-                events = {
-                    "political": [
-                        f"Election announced in {affected_nation}",
-                        f"Political unrest in {affected_nation}",
-                        f"New policy announced by {affected_nation}"
-                    ],
-                    "economic": [
-                        f"Economic boom in {affected_nation}",
-                        f"Recession hitting {affected_nation}",
-                        f"New trade deal involving {affected_nation}"
-                    ],
-                    "military": [
-                        f"{affected_nation} increases military spending",
-                        f"{affected_nation} reduces nuclear arsenal",
-                        f"Military exercise by {affected_nation}"
-                    ],
-                    "disaster": [
-                        f"Natural disaster in {affected_nation}",
-                        f"Infrastructure failure in {affected_nation}",
-                        f"Public health crisis in {affected_nation}"
-                    ]
-                }
-                
-                event_text = random.choice(events[event_type])
-                GAME_STATE["events"].insert(0, {
-                    "date": GAME_STATE["date"],
-                    "type": event_type,
-                    "text": event_text
-                })
-                
-                # Keep only the last 20 events
-                if len(GAME_STATE["events"]) > 20:
-                    GAME_STATE["events"] = GAME_STATE["events"][:20]
-            
-            # Broadcast updated game state
-            await manager.broadcast_game_state()
-            
-            # Sleep based on game speed
-            await asyncio.sleep(1.0 / multiplier)
-        except Exception as e:
-            print(f"Error in game simulation: {str(e)}")
-            await asyncio.sleep(5)  # Wait 5 seconds before retrying
+    # Rooms that were already running (e.g. a restored default room) start ticking
+    for room in list(rooms.rooms.values()):
+        scheduler.update(room)
+    await scheduler.run()
 
 # Start game simulation on startup
 @app.on_event("startup")
 async def startup_event():
+    print(f"Starting backend in {GAME_ROLE} role")
+    loop_monitor.start()
+    if gateway:
+        gateway.start()
+        return
+    
+    try:
+        await run_in_db_thread(ensure_event_schema)
+    except Exception as e:
+        print(f"Error preparing game_events table: {str(e)}")
+    event_log.start()
+    
+    # Pick up running campaigns from the latest checkpoint before ticking starts
+    if checkpointer:
+        await checkpointer.restore_all()
+        checkpointer.start()
+    
+    if state_cache:
+        state_cache.start()
     asyncio.create_task(simulate_game_progression())
+    asyncio.create_task(release_idle_rooms())
+    if publisher:
+        publisher.start()
+        CommandConsumer(get_redis(), handle_stream_command).start()
 
 # Root endpoint
 @app.get("/")
 async def root():
     return {"message": "Welcome to Geopolitics 2025 API"}
 
+# Nations for a new game, fresh from the database
+def load_new_game_nations(session: Session) -> List[Dict[str, Any]]:
+    # Get all nations and their leaders from database
+    nations_with_leaders = (
+        session.query(Nation, Leader)
+        .join(Leader, Nation.leader_id == Leader.id)
+        .all()
+    )
+    
+    # Format the nations data
+    return [
+        {
+            "name": nation.name,
+            "leader": leader.name,
+            "gdp": nation.gdp,
+            "military_power": nation.military_power,
+            "stability": nation.stability if hasattr(nation, 'stability') else 70
+        }
+        for nation, leader in nations_with_leaders
+    ]
+
+# Queue a client command for a room; reply is called with its response once applied or rejected
+async def submit_command(room: Room, command: Dict[str, Any], reply: Reply):
+    action = command.get("action")
+    # Registered actions are counted under their own name; anything else is "other"
+    metrics.commands.inc(action if action in command_registry else "other")
+    await command_queue.submit(room, command, reply)
+
+# Get a hosted room, bringing a released one back from its checkpoint
+async def open_room(room_id: str) -> Optional[Room]:
+    room = rooms.get(room_id)
+    if room is None and checkpointer and rooms.is_valid_id(room_id):
+        room = await checkpointer.restore(room_id)
+        if room is not None:
+            # A restored campaign that was running keeps ticking
+            scheduler.update(room)
+    return room or rooms.get_or_create(room_id)
+
+# Queue a command forwarded by a gateway over the Redis command stream
+async def handle_stream_command(room_id: str, command: Dict[str, Any], reply: Reply):
+    room = await open_room(room_id)
+    if room is None:
+        reply(command_response(command, False, f"Room {room_id} is not available"))
+        return
+    
+    # Anything a gateway sends shows clients are still in the room
+    room.touch()
+    if command.get("action") == KEEPALIVE:
+        return
+    
+    # A gateway lost track of the frames and needs a snapshot to rebuild its mirror
+    if command.get("action") == "resync":
+        room.manager.publish_snapshot()
+        return
+    
+    await submit_command(room, command, reply)
+
+# Stop hosting a room
+def release_room(room: Room):
+    if rooms.remove(room.id):
+        scheduler.remove(room)
+        if checkpointer:
+            # The checkpoint is kept, so the campaign comes back when a client rejoins
+            asyncio.create_task(checkpointer.release(room.id, room.state))
+        if publisher:
+            # Gateways stop mirroring the room
+            publisher.publish(room.id, ROOM_CLOSED_MESSAGE)
+        if gateway:
+            gateway.untrack(room)
+
+# Release rooms that stayed idle for ROOM_IDLE_TTL seconds
+async def release_idle_rooms():
+    while True:
+        await asyncio.sleep(min(ROOM_IDLE_TTL, 30.0))
+        for room in rooms.idle(ROOM_IDLE_TTL):
+            print(f"Releasing room {room.id} after {ROOM_IDLE_TTL:.0f}s idle")
+            release_room(room)
+
 # WebSocket endpoint
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     print("New WebSocket connection received")
+    
+    # Clients pick their game with ?room=<id>; unknown rooms are created on demand
+    room = await open_room(websocket.query_params.get("room", DEFAULT_ROOM))
+    if room is None:
+        await websocket.close(code=1008)
+        return
+    if gateway:
+        gateway.track(room)
+    
+    manager = room.manager
+    room.touch()
     await manager.connect(websocket)
+    client_id = manager.get_connection(websocket).id
+    if gateway:
+        gateway.register(client_id, manager, websocket)
+    
+    def reply(response: Dict[str, Any]):
+        manager.send_personal_message(response, websocket)
+    
     try:
         while True:
-            data = await websocket.receive_text()
-            # Process commands from the client
+            message = await websocket.receive()
+            if message["type"] == "websocket.disconnect":
+                raise WebSocketDisconnect(message.get("code", 1000))
+            # Text frames carry JSON commands, binary frames MessagePack
+            data = message.get("text")
+            if data is None:
+                data = message.get("bytes")
+            
+            # Process commands from the client; a frame holds one command or an array of them
             try:
-                command = json.loads(data)
-                print(f"Received command: {command}")
-                
-                # Prepare a response
-                response = {
-                    "response_type": "command_response",
-                    "command": command.get("action", "unknown"),
-                    "success": True,
-                    "message": ""
-                }
+                commands = decode(data)
+                if not isinstance(commands, list):
+                    commands = [commands]
+                if len(commands) > MAX_COMMANDS_PER_FRAME:
+                    raise CodecError(f"At most {MAX_COMMANDS_PER_FRAME} commands per frame")
+                if not all(isinstance(command, dict) for command in commands):
+                    raise CodecError("Command must be an object")
                 
-                if "action" in command:
-                    if command["action"] == "pause":
-                        GAME_STATE["paused"] = True
-                        response["message"] = "Game paused"
-                        print("Game paused")
+                for command in commands:
+                    print(f"Received command for room {room.id}: {command}")
                     
-                    elif command["action"] == "resume":
-                        GAME_STATE["paused"] = False
-                        response["message"] = "Game resumed"
-                        print("Game resumed")
+                    # Client missed a frame and needs a full snapshot
+                    if command.get("action") == "resync":
+                        manager.send_snapshot(websocket)
+                        continue
                     
-                    elif command["action"] == "set_speed":
-                        GAME_STATE["speed"] = command.get("speed", "normal")
-                        response["message"] = f"Game speed set to: {GAME_STATE['speed']}"
-                        print(f"Game speed set to: {GAME_STATE['speed']}")
-                    
-                    elif command["action"] == "new_game":
-                        # Reset game state to default
-                        GAME_STATE.clear()
-                        GAME_STATE.update(DEFAULT_GAME_STATE.copy())
-                        
-                        # Reload fresh nation data from database to ensure clean state
-                        session = Session(engine)
+                    # Client narrows or widens the nations and fields it receives
+                    if command.get("action") in (SUBSCRIBE, UNSUBSCRIBE):
                         try:
-                            # Get all nations and their leaders from database
-                            nations_with_leaders = (
-                                session.query(Nation, Leader)
-                                .join(Leader, Nation.leader_id == Leader.id)
-                                .all()
-                            )
-                            
-                            # Format the nations data
-                            fresh_nations = []
-                            for nation, leader in nations_with_leaders:
-                                fresh_nations.append({
-                                    "name": nation.name,
-                                    "leader": leader.name,
-                                    "gdp": nation.gdp,
-                                    "military_power": nation.military_power,
-                                    "stability": nation.stability if hasattr(nation, 'stability') else 70
-                                })
-                            
-                            # Update game state with fresh nation data
-                            GAME_STATE["nations"] = fresh_nations
-                            print(f"Reloaded {len(fresh_nations)} nations from database for new game")
-                        except Exception as e:
-                            print(f"Error loading nations from database: {str(e)}")
-                        finally:
-                            session.close()
-                        
-                        response["message"] = "New game started with fresh data"
-                        print("New game started with default state and fresh nation data")
-                    
-                    elif command["action"] == "load_save":
-                        # Load game state from client
-                        if command.get("gameState"):
-                            GAME_STATE.clear()
-                            GAME_STATE.update(command["gameState"])
-                            response["message"] = "Saved game loaded"
-                            print("Game state loaded from client save")
-                        else:
-                            response["success"] = False
-                            response["message"] = "No game state provided"
+                            interest = manager.subscribe(websocket, command)
+                        except CodecError as e:
+                            reply(command_response(command, False, str(e)))
+                            continue
+                        if interest is not None:
+                            subscription = {"response_type": "subscription", **interest.describe()}
+                            if "request_id" in command:
+                                subscription["request_id"] = command["request_id"]
+                            manager.send_personal_message(subscription, websocket)
+                        continue
                     
-                    # Send command response to the client
-                    await manager.send_personal_message(json.dumps(response), websocket)
+                    # Gateways forward commands to the simulation process, which replies over Redis
+                    if gateway:
+                        await gateway.forward_command(room.id, command, client_id)
+                        continue
                     
-                    # Broadcast updated state after command
-                    await manager.broadcast_game_state()
-            except json.JSONDecodeError:
-                print(f"Failed to parse WebSocket message: {data}")
+                    # Applied between ticks; the response comes back then and the state change with the next frame
+                    await submit_command(room, command, reply)
+            except CodecError:
+                print(f"Failed to parse WebSocket message: {data!r}")
                 pass
     except WebSocketDisconnect:
         print("WebSocket disconnected")
-        manager.disconnect(websocket)
     except Exception as e:
         print(f"WebSocket error: {str(e)}")
+    finally:
         manager.disconnect(websocket)
+        if gateway:
+            gateway.unregister(client_id)
+        room.touch()
+        # Gateway mirrors hold no state of their own, so they go as soon as they are empty
+        if gateway and not room.connection_count:
+            release_room(room)
 
 # Playable nations endpoint
 @app.get("/playable-nations")
-async def get_playable_nations():
+async def get_playable_nations(request: Request):
     """Get all playable nations with their details and difficulty levels"""
-    session = Session(engine)
+    cached = playable_nations.fresh()
+    if cached is None:
+        cached = await run_in_db_thread(playable_nations.get)
+    body, etag = cached
+
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+# Look up a room for an HTTP request
+def get_room_or_404(room_id: str) -> Room:
+    room = rooms.get(room_id)
+    if room is None:
+        raise HTTPException(status_code=404, detail=f"Room {room_id} not found")
+    return room
+
+# Rooms endpoint
+@app.get("/rooms")
+async def list_rooms():
+    return [
+        {
+            "id": room.id,
+            "connections": room.connection_count,
+            "paused": room.paused,
+            "speed": room.state.get("speed"),
+            "date": room.state.get("date")
+        }
+        for room in rooms.rooms.values()
+    ]
+
+# Runtime statistics endpoint
+@app.get("/stats")
+async def get_stats():
+    return {
+        "scheduler": scheduler.stats(),
+        "event_loop": loop_monitor.stats(),
+        "compression": compression_stats.stats(),
+        "checkpoint": checkpointer.stats() if checkpointer else None,
+        "state_cache": state_cache.stats() if state_cache else None,
+        "event_log": event_log.stats() if event_log else None
+    }
+
+# Prometheus metrics endpoint
+@app.get("/metrics")
+async def get_metrics():
+    return PlainTextResponse(metrics.registry.render(), media_type=metrics.CONTENT_TYPE)
+
+# Preset dictionary for the "+deflate" wire formats; clients inflate frames with it
+@app.get("/ws/dictionary")
+async def get_compression_dictionary():
+    return Response(
+        content=compression_dictionary(),
+        media_type="application/octet-stream",
+        headers={"Cache-Control": "no-cache"}
+    )
+
+# Event history endpoint: newest first, keyset-paginated via next_cursor
+@app.get("/events")
+async def get_events(room: Optional[str] = None, nation: Optional[str] = None, type: Optional[str] = None,
+                     since: Optional[datetime.date] = None, until: Optional[datetime.date] = None,
+                     cursor: Optional[str] = None, limit: int = Query(100, ge=1, le=500)):
+    start = datetime.datetime.combine(since, datetime.time.min) if since else None
+    end = datetime.datetime.combine(until, datetime.time.max) if until else None
     try:
-        # Get all nations and their leaders
-        nations_with_leaders = (
-            session.query(Nation, Leader)
-            .join(Leader, Nation.leader_id == Leader.id)
-            .all()
+        return await run_with_session(
+            lambda session: query_events(session, room, nation, type, start, end, cursor, limit)
         )
-        
-        # Format the response
-        result = []
-        for nation, leader in nations_with_leaders:
-            # Determine difficulty level based on factors like military power, economy, etc.
-            difficulty = "medium"  # default
-            
-            # Simple algorithm: higher military power and GDP = easier
-            if nation.military_power >= 90 and nation.gdp >= 20000:
-                difficulty = "easy"
-            elif nation.military_power < 60 or nation.gdp < 3000:
-                difficulty = "hard"
-                
-            # Format description based on nation's attributes
-            description = f"{'Nuclear power with ' if nation.has_nuclear_weapons else ''}"
-            
-            if nation.military_power > 80:
-                description += "powerful military and "
-            elif nation.military_power > 60:
-                description += "strong military and "
-            else:
-                description += "developing military and "
-                
-            if nation.gdp > 15000:
-                description += "massive economy."
-            elif nation.gdp > 5000:
-                description += "substantial economy."
-            else:
-                description += "growing economy."
-            
-            result.append({
-                "name": nation.name,
-                "leader": leader.name,
-                "difficulty": difficulty,
-                "description": description,
-            })
-        
-        return result
-    finally:
-        session.close()
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
 
 # Game state endpoint (HTTP)
 @app.get("/game-state")
-async def get_game_state():
-    return GAME_STATE
+async def get_game_state(room: str = DEFAULT_ROOM):
+    # Served from the state cache, already encoded, so readers never encode the live
+    # state; gateways fall back to their mirror, the simulation to its hosted rooms
+    if state_cache and (gateway or rooms.get(room) is not None):
+        snapshot = await state_cache.snapshot(room)
+        if snapshot is not None:
+            return Response(content=snapshot, media_type="application/json")
+    return get_room_or_404(room).state
+
+# Game state summary endpoint: tick number, date and derived aggregates
+@app.get("/game-state/summary")
+async def get_game_state_summary(room: str = DEFAULT_ROOM):
+    if state_cache and (gateway or rooms.get(room) is not None):
+        summary = await state_cache.summary(room)
+        if summary is not None:
+            return summary
+    game_room = get_room_or_404(room)
+    return {
+        "tick": game_room.ticks,
+        "date": game_room.state.get("date"),
+        "global_tension": global_tension(game_room.state)
+    }
 
 # Update game state endpoint (for admin/testing purposes)
 @app.post("/game-state/update")
-async def update_game_state(data: Dict[str, Any]):
-    global GAME_STATE
+async def update_game_state(data: Dict[str, Any], room: str = DEFAULT_ROOM):
+    # Gateways only hold a mirror; the simulation process owns the state
+    if gateway:
+        raise HTTPException(status_code=409, detail="Game state is owned by the simulation process")
+    
+    game_room = get_room_or_404(room)
     
-    # Update specific fields of the game state
-    for key, value in data.items():
-        if key in GAME_STATE:
-            GAME_STATE[key] = value
+    # Update specific fields of the game state; replacing it keeps the room's relations in step
+    state = dict(game_room.state)
+    state.update((key, value) for key, value in data.items() if key in state)
+    game_room.replace_state(state)
+    state = game_room.state
     
-    # Broadcast updated state
-    await manager.broadcast_game_state()
-    return {"message": "Game state updated", "state": GAME_STATE}
+    # Broadcast updated state with the next frame
+    scheduler.update(game_room)
+    scheduler.mark_dirty(game_room)
+    return {"message": "Game state updated", "state": state}
+
+# Admin endpoints require this token in the X-Admin-Token header; unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN", "")
+
+def require_admin(request: Request):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not hmac.compare_digest(request.headers.get("x-admin-token", ""), ADMIN_TOKEN):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+# Sampling profiler covering the simulation task and the WebSocket handlers
+profiler = SamplingProfiler([simulate_game_progression, websocket_endpoint, ClientConnection._writer])
+
+# Start recording a profile for a fixed window
+@app.post("/admin/profile")
+async def start_profile(request: Request, seconds: float = Query(10.0, gt=0, le=60),
+                        interval_ms: float = Query(DEFAULT_SAMPLE_INTERVAL * 1000, ge=1, le=1000)):
+    require_admin(request)
+    try:
+        profiler.start(seconds, interval_ms / 1000)
+    except RuntimeError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    return profiler.report()
+
+# Status of the current or last profile, with per-phase wall and CPU timers
+@app.get("/admin/profile")
+async def get_profile(request: Request):
+    require_admin(request)
+    return profiler.report()
+
+# Stacks of the current or last profile in the folded format (flamegraph.pl, speedscope)
+@app.get("/admin/profile/folded")
+async def get_profile_folded(request: Request):
+    require_admin(request)
+    return PlainTextResponse(profiler.folded())
 
 # Run the app
 if __name__ == "__main__":
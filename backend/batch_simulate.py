@@ -0,0 +1,157 @@
+"""
+Headless batch simulation for scenario balancing.
+
+Runs many independent, seeded games through the same tick logic as the live
+server (SimulationEngine), with no WebSocket or sleeping, spread across a
+process pool. --economy adds a yearly EconomySystem GDP update, which live
+games do not have, to try out economy changes before they ship. Per-nation outcomes are
+written to a compressed .npz file and summarized on stdout.
+
+Usage:
+    python batch_simulate.py --games 1000 --years 10 --output results.npz
+    python batch_simulate.py --games 1000 --years 10 --economy
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Tuple
+
+from game_logic.economy import EconomySystem
+from game_logic.game_state import new_game_state
+from game_logic.relations import RelationshipIndex
+from game_logic.simulation import SimulationEngine, SPEED_MULTIPLIERS, EVENT_TYPES
+
+# Simulated days (ticks) per year
+DAYS_PER_YEAR = 365
+
+
+def run_game(state: Dict[str, Any], seed: int, years: int, multiplier: float,
+             economy: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Run one game to completion.
+
+    Args:
+        state: Initial game state
+        seed: Seed for the game's random number generators
+        years: Number of simulated years
+        multiplier: Game speed multiplier
+        economy: Also apply the EconomySystem GDP update at each year
+            boundary; off by default so results match live play
+
+    Returns:
+        Tuple: Final GDP, final military power and per-nation event counts by type
+    """
+    engine = SimulationEngine(seed=seed)
+    engine.load_nations(state["nations"])
+    economy_system = EconomySystem(RelationshipIndex.from_world(state))
+    random.seed(seed)
+
+    events = np.zeros((engine.size, len(EVENT_TYPES)), dtype=np.int32)
+    event_type_index = {event_type: i for i, event_type in enumerate(EVENT_TYPES)}
+
+    for day in range(1, years * DAYS_PER_YEAR + 1):
+        engine.step(multiplier)
+        rolled = engine.roll_event(multiplier)
+        if rolled is not None:
+            event_type, nation_index, _ = rolled
+            events[nation_index, event_type_index[event_type]] += 1
+
+        if economy and day % DAYS_PER_YEAR == 0:
+            world_state = dict(state, nations=engine.nations())
+            engine.columns["gdp"] *= 1 + economy_system.calculate_all(world_state)
+
+    return engine.columns["gdp"].copy(), engine.columns["military_power"].copy(), events
+
+
+def run_chunk(state: Dict[str, Any], seeds: List[int], years: int, multiplier: float,
+              economy: bool = False) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Run a chunk of games in one worker process and stack their outcomes"""
+    results = [run_game(state, seed, years, multiplier, economy) for seed in seeds]
+    return tuple(np.stack(column) for column in zip(*results))
+
+
+def summarize(names: List[str], gdp: np.ndarray, military: np.ndarray):
+    """Print per-nation outcome percentiles across all games"""
+    gdp_pct = np.percentile(gdp, [5, 50, 95], axis=0)
+    military_pct = np.percentile(military, [5, 50, 95], axis=0)
+
+    print(f"\n{'Nation':<24}{'GDP p5':>12}{'GDP p50':>12}{'GDP p95':>12}{'Mil p5':>9}{'Mil p50':>9}{'Mil p95':>9}")
+    for i, name in enumerate(names):
+        print(
+            f"{name[:23]:<24}"
+            f"{gdp_pct[0, i]:>12.1f}{gdp_pct[1, i]:>12.1f}{gdp_pct[2, i]:>12.1f}"
+            f"{military_pct[0, i]:>9.1f}{military_pct[1, i]:>9.1f}{military_pct[2, i]:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless Geopolitics 2025 simulations")
+    parser.add_argument("--games", type=int, default=100, help="Number of independent games")
+    parser.add_argument("--years", type=int, default=5, help="Simulated years per game")
+    parser.add_argument("--seed", type=int, default=0, help="Base seed; game i uses seed + i")
+    parser.add_argument("--speed", default="normal", choices=list(SPEED_MULTIPLIERS.keys()),
+                        help="Game speed whose multiplier is applied to every tick")
+    parser.add_argument("--scenario", help="JSON game state to start from (default: built-in state)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="Worker processes")
+    parser.add_argument("--economy", action="store_true",
+                        help="Add a yearly EconomySystem GDP update (not part of live play)")
+    parser.add_argument("--output", default="batch_results.npz", help="Output .npz file")
+    args = parser.parse_args()
+
+    if args.scenario:
+        with open(args.scenario, encoding="utf-8") as f:
+            state = json.load(f)
+    else:
+        state = new_game_state()
+
+    names = [nation["name"] for nation in state["nations"]]
+    multiplier = SPEED_MULTIPLIERS[args.speed]
+    seeds = [args.seed + i for i in range(args.games)]
+
+    # A few chunks per worker keeps the pool busy without per-game overhead
+    workers = max(1, min(args.workers, args.games))
+    chunk_size = max(1, -(-args.games // (workers * 4)))
+    chunks = [seeds[i:i + chunk_size] for i in range(0, len(seeds), chunk_size)]
+
+    print(f"Running {args.games} games x {args.years} years over {len(names)} nations on {workers} workers...")
+    started = time.perf_counter()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(run_chunk, state, chunk, args.years, multiplier, args.economy)
+            for chunk in chunks
+        ]
+        results = [future.result() for future in futures]
+    elapsed = time.perf_counter() - started
+
+    gdp = np.concatenate([result[0] for result in results])
+    military = np.concatenate([result[1] for result in results])
+    events = np.concatenate([result[2] for result in results])
+
+    np.savez_compressed(
+        args.output,
+        names=np.array(names),
+        event_types=np.array(EVENT_TYPES),
+        seeds=np.array(seeds, dtype=np.int64),
+        gdp=gdp.astype(np.float32),
+        military_power=military.astype(np.float32),
+        events=events
+    )
+
+    ticks = args.games * args.years * DAYS_PER_YEAR
+    print(f"Simulated {ticks} game ticks in {elapsed:.2f}s ({ticks / elapsed:,.0f} ticks/s)")
+    summarize(names, gdp, military)
+    print(f"\nWrote per-game outcomes to {args.output}")
+
+
+if __name__ == "__main__":
+    # Fix encoding for Windows
+    if sys.platform.startswith('win'):
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    main()
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# Tests import the backend modules the way app.py does ("from game_logic.x import ...")
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+# Nothing under test needs a real database; importing the models must not require Postgres
+os.environ.setdefault("DATABASE_URL", "sqlite://")
@@ -0,0 +1,50 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, TypeVar
+from sqlalchemy.orm import Session
+
+from .db_config import engine, DB_POOL_SIZE
+
+T = TypeVar("T")
+
+# Bounded pool running blocking database work off the event loop. One thread
+# per pooled connection, so queries queue here instead of on the pool
+_executor = ThreadPoolExecutor(max_workers=DB_POOL_SIZE, thread_name_prefix="db")
+
+
+async def run_in_db_thread(fn: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Run a blocking database call on the database thread pool.
+
+    Args:
+        fn: Function doing the blocking work
+        *args: Positional arguments for fn
+        **kwargs: Keyword arguments for fn
+
+    Returns:
+        The function's return value
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(fn, *args, **kwargs))
+
+
+async def run_with_session(fn: Callable[[Session], T]) -> T:
+    """
+    Open a session on the database thread pool, run fn(session) there and
+    close the session again, all without blocking the event loop.
+
+    Args:
+        fn: Function receiving the open session
+
+    Returns:
+        The function's return value
+    """
+    def call() -> T:
+        session = Session(engine)
+        try:
+            return fn(session)
+        finally:
+            session.close()
+
+    return await run_in_db_thread(call)
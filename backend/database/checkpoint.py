@@ -0,0 +1,226 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+# Redis hash holding a room's latest checkpoint ("game:checkpoint:<room id>").
+# Field "meta" holds every top-level state field except the nations,
+# "roster" the nation names in order, and "nation:<name>" each nation
+CHECKPOINT_KEY_PREFIX = "game:checkpoint:"
+
+# Redis set of room ids that have a checkpoint
+CHECKPOINT_ROOMS_KEY = "game:checkpoint:rooms"
+
+META_FIELD = "meta"
+ROSTER_FIELD = "roster"
+NATION_FIELD_PREFIX = "nation:"
+
+
+def _encode_nations(nations: List[Dict[str, Any]]) -> Dict[str, str]:
+    return {NATION_FIELD_PREFIX + nation["name"]: json.dumps(nation) for nation in nations}
+
+
+class Checkpointer:
+    """
+    Periodically writes every room's game state to Redis so a crash or a
+    reload does not wipe running campaigns.
+
+    Runs as its own task, never inside a tick. Each room's state is stored
+    as a hash with one field per nation, and only fields whose encoding
+    changed since the room's last checkpoint are written, so paused rooms
+    cost nothing and static data is written once. Each checkpoint is applied
+    in a MULTI transaction, so a crash mid-write never leaves a torn state.
+    """
+
+    # Hash fields fetched per HSCAN round trip while restoring
+    RESTORE_CHUNK = 500
+
+    def __init__(self, redis, rooms, interval: float = 5.0, restore_timeout: float = 10.0,
+                 idle_ttl: float = 7 * 24 * 3600):
+        self.redis = redis
+        self.rooms = rooms
+        self.interval = interval
+        self.restore_timeout = restore_timeout
+        # Seconds a released room's checkpoint is kept before Redis expires it (0 keeps it forever)
+        self.idle_ttl = idle_ttl
+        # Room id -> field -> encoded value as of the last successful checkpoint
+        self._written: Dict[str, Dict[str, str]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+        # Checkpoint metrics
+        self.checkpoints = 0
+        self.fields_written = 0
+        self.last_duration = 0.0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.checkpoint_all()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error writing checkpoint: {str(e)}")
+
+    async def checkpoint_all(self):
+        started = time.monotonic()
+        for room in list(self.rooms.rooms.values()):
+            await self.checkpoint(room.id, room.state)
+        self.last_duration = time.monotonic() - started
+
+    async def checkpoint(self, room_id: str, state: Dict[str, Any]):
+        """
+        Write the fields of a room's state that changed since its last checkpoint.
+
+        Args:
+            room_id: Room identifier
+            state: The room's game state
+        """
+        # The tick replaces the nations list rather than mutating it, so holding
+        # on to the current list is enough to encode it off the event loop
+        nations = state.get("nations", [])
+        meta = {key: value for key, value in state.items() if key != "nations"}
+        fields = {
+            META_FIELD: json.dumps(meta),
+            ROSTER_FIELD: json.dumps([nation["name"] for nation in nations]),
+        }
+        fields.update(await asyncio.to_thread(_encode_nations, nations))
+
+        written = self._written.get(room_id, {})
+        changed = {field: value for field, value in fields.items() if written.get(field) != value}
+        removed = [field for field in written if field not in fields]
+        if not changed and not removed:
+            return
+
+        key = CHECKPOINT_KEY_PREFIX + room_id
+        async with self.redis.pipeline(transaction=True) as pipe:
+            if room_id not in self._written:
+                # First checkpoint of this room by this process: drop whatever an older run left
+                pipe.delete(key)
+            if changed:
+                pipe.hset(key, mapping=changed)
+            if removed:
+                pipe.hdel(key, *removed)
+            pipe.sadd(CHECKPOINT_ROOMS_KEY, room_id)
+            await pipe.execute()
+
+        self._written[room_id] = fields
+        self.checkpoints += 1
+        self.fields_written += len(changed)
+
+    async def release(self, room_id: str, state: Dict[str, Any]):
+        """
+        Write the last checkpoint of a room that is no longer hosted. The
+        checkpoint is kept, so the campaign comes back when a client rejoins
+        the room, and expires after idle_ttl seconds if nobody does.
+        """
+        try:
+            await self.checkpoint(room_id, state)
+            if self.rooms.get(room_id) is None:
+                self._written.pop(room_id, None)
+                if self.idle_ttl > 0:
+                    await self.redis.expire(CHECKPOINT_KEY_PREFIX + room_id, int(self.idle_ttl))
+        except Exception as e:
+            print(f"Error writing final checkpoint for room {room_id}: {str(e)}")
+
+    async def restore(self, room_id: str):
+        """
+        Host a room that is not hosted yet, restored from its checkpoint if
+        it has one and fresh otherwise.
+
+        Returns:
+            Room: The hosted room, or None if the id is invalid or the room limit is reached
+        """
+        try:
+            state, fields = await self.load(room_id)
+        except Exception as e:
+            print(f"Error reading checkpoint for room {room_id}: {str(e)}")
+            state, fields = None, {}
+        if self.rooms.get(room_id) is not None:
+            # Another client brought the room back while the checkpoint was read
+            return self.rooms.get(room_id)
+        room = self.rooms.get_or_create(room_id)
+        if room is not None and state is not None:
+            await self._restore_room(room, state, fields)
+        return room
+
+    async def _restore_room(self, room, state: Dict[str, Any], fields: Dict[str, str]):
+        room.replace_state(state)
+        self._written[room.id] = fields
+        print(f"Restored room {room.id} at {state.get('date')} ({len(state.get('nations', []))} nations)")
+        # Hosted again: the checkpoint no longer expires
+        try:
+            await self.redis.persist(CHECKPOINT_KEY_PREFIX + room.id)
+        except Exception as e:
+            print(f"Error keeping checkpoint for room {room.id}: {str(e)}")
+
+    async def restore_all(self) -> List[str]:
+        """
+        Restore every checkpointed room into the registry, giving up after
+        restore_timeout seconds so startup time stays bounded; rooms not
+        restored by then start from a fresh state.
+
+        Returns:
+            List: Ids of the restored rooms
+        """
+        restored: List[str] = []
+        try:
+            await asyncio.wait_for(self._restore_rooms(restored), self.restore_timeout)
+        except asyncio.TimeoutError:
+            print(f"Checkpoint restore timed out after {self.restore_timeout}s; "
+                  f"restored {len(restored)} rooms, the rest start fresh")
+        except Exception as e:
+            print(f"Error restoring checkpoints: {str(e)}")
+        return restored
+
+    async def _restore_rooms(self, restored: List[str]):
+        room_ids = sorted(member.decode() for member in await self.redis.smembers(CHECKPOINT_ROOMS_KEY))
+        # The default room first, so the main campaign is back even if time runs out
+        room_ids.sort(key=lambda room_id: room_id != self.rooms.default.id)
+        for room_id in room_ids:
+            state, fields = await self.load(room_id)
+            if not fields:
+                # The checkpoint of a released room expired
+                await self.redis.srem(CHECKPOINT_ROOMS_KEY, room_id)
+                continue
+            room = self.rooms.get_or_create(room_id)
+            if state is None or room is None:
+                continue
+            await self._restore_room(room, state, fields)
+            restored.append(room_id)
+
+    async def load(self, room_id: str) -> Tuple[Optional[Dict[str, Any]], Dict[str, str]]:
+        """
+        Read a room's checkpoint in HSCAN chunks, so a large world never
+        needs one huge reply.
+
+        Returns:
+            Tuple: (restored state or None if there is no usable checkpoint, raw fields)
+        """
+        fields: Dict[str, str] = {}
+        async for field, value in self.redis.hscan_iter(CHECKPOINT_KEY_PREFIX + room_id, count=self.RESTORE_CHUNK):
+            fields[field.decode()] = value.decode()
+
+        if META_FIELD not in fields or ROSTER_FIELD not in fields:
+            return None, fields
+
+        state = json.loads(fields[META_FIELD])
+        nations = []
+        for name in json.loads(fields[ROSTER_FIELD]):
+            encoded = fields.get(NATION_FIELD_PREFIX + name)
+            if encoded is None:
+                return None, fields
+            nations.append(json.loads(encoded))
+        state["nations"] = nations
+        return state, fields
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "interval": self.interval,
+            "checkpoints": self.checkpoints,
+            "fields_written": self.fields_written,
+            "last_duration_ms": round(self.last_duration * 1000, 3)
+        }
@@ -0,0 +1,205 @@
+import asyncio
+import datetime
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+from sqlalchemy import inspect, insert, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from .async_db import run_in_db_thread
+from .db_config import engine
+from .models import GameEvent, Nation
+
+# Date format of in-game event dates ("January 20, 2025")
+GAME_DATE_FORMAT = "%B %d, %Y"
+
+
+def ensure_event_schema():
+    """
+    Bring an existing game_events table up to date: create it if missing,
+    add the room_id column and create the history indexes. create_all only
+    does this for tables that do not exist yet.
+    """
+    table = GameEvent.__table__
+    table.create(engine, checkfirst=True)
+
+    columns = {column["name"] for column in inspect(engine).get_columns(table.name)}
+    if "room_id" not in columns:
+        with engine.begin() as connection:
+            connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN room_id VARCHAR"))
+
+    for index in table.indexes:
+        index.create(engine, checkfirst=True)
+
+
+class EventLogWriter:
+    """
+    Appends generated game events to the game_events table.
+
+    record() only queues the event, so the tick never waits on the
+    database. A background task drains the queue in batches, each written
+    with one multi-row INSERT on the database thread pool. If the database
+    falls too far behind, the oldest queued events are dropped and counted.
+    """
+
+    # Events written per INSERT
+    BATCH_SIZE = 500
+
+    # Events queued before the oldest are dropped
+    MAX_QUEUED_EVENTS = 100000
+
+    # Seconds nation name -> id lookups are cached
+    NATION_IDS_TTL = 60.0
+
+    def __init__(self, flush_interval: float = 1.0):
+        self.flush_interval = flush_interval
+        self.queue: Deque[Dict[str, Any]] = deque(maxlen=self.MAX_QUEUED_EVENTS)
+        self._nation_ids: Dict[str, int] = {}
+        self._nation_ids_loaded = 0.0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+        # Writer metrics
+        self.written = 0
+        self.dropped = 0
+        self.batches = 0
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def record(self, room_id: str, event: Dict[str, Any]):
+        """Queue an event generated in a room"""
+        if len(self.queue) == self.queue.maxlen:
+            self.dropped += 1
+        self.queue.append({"room_id": room_id, **event})
+        if len(self.queue) >= self.BATCH_SIZE:
+            self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if len(self.queue) < self.BATCH_SIZE:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), self.flush_interval)
+                except asyncio.TimeoutError:
+                    pass
+            await self.flush()
+
+    async def flush(self):
+        """Write everything queued so far, one batch per INSERT"""
+        while self.queue:
+            batch = [self.queue.popleft() for _ in range(min(self.BATCH_SIZE, len(self.queue)))]
+            try:
+                await run_in_db_thread(self._insert, batch)
+            except Exception as e:
+                # Put the batch back for the next flush, keeping the order
+                self.queue.extendleft(reversed(batch))
+                print(f"Error writing game events: {str(e)}")
+                return
+            self.written += len(batch)
+            self.batches += 1
+
+    def _insert(self, batch: List[Dict[str, Any]]):
+        """Runs on the database thread pool"""
+        with Session(engine) as session:
+            nation_ids = self._lookup_nation_ids(session)
+            rows = [
+                {
+                    "event_type": event["type"],
+                    "description": event["text"],
+                    "date": parse_game_date(event["date"]),
+                    "room_id": event["room_id"],
+                    "primary_nation_id": nation_ids.get(event.get("nation"))
+                }
+                for event in batch
+            ]
+            session.execute(insert(GameEvent), rows)
+            session.commit()
+
+    def _lookup_nation_ids(self, session: Session) -> Dict[str, int]:
+        if time.monotonic() - self._nation_ids_loaded > self.NATION_IDS_TTL:
+            self._nation_ids = dict(session.execute(select(Nation.name, Nation.id)).all())
+            self._nation_ids_loaded = time.monotonic()
+        return self._nation_ids
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "queued": len(self.queue),
+            "written": self.written,
+            "dropped": self.dropped,
+            "batches": self.batches
+        }
+
+
+def parse_game_date(value: str) -> datetime.datetime:
+    return datetime.datetime.strptime(value, GAME_DATE_FORMAT)
+
+
+def encode_cursor(event: GameEvent) -> str:
+    return f"{event.date.isoformat()}_{event.id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime.datetime, int]:
+    """Parse a cursor from query_events; raises ValueError if it is malformed"""
+    date, _, event_id = cursor.rpartition("_")
+    return datetime.datetime.fromisoformat(date), int(event_id)
+
+
+def query_events(session: Session, room_id: Optional[str] = None, nation: Optional[str] = None,
+                 event_type: Optional[str] = None, since: Optional[datetime.datetime] = None,
+                 until: Optional[datetime.datetime] = None, cursor: Optional[str] = None,
+                 limit: int = 100) -> Dict[str, Any]:
+    """
+    One page of event history, newest first.
+
+    Pages are keyset-paginated on (date, id), so each page is an index range
+    scan that starts where the previous page ended, however deep it is.
+
+    Args:
+        session: Open database session
+        room_id: Only events from this room
+        nation: Only events whose primary nation has this name
+        event_type: Only events of this type
+        since: Only events on or after this in-game date
+        until: Only events on or before this in-game date
+        cursor: next_cursor of the previous page
+        limit: Maximum number of events returned
+
+    Returns:
+        Dict: {"events": [...], "next_cursor": cursor of the next page or None}
+    """
+    query = select(GameEvent, Nation.name).outerjoin(Nation, GameEvent.primary_nation_id == Nation.id)
+    if room_id is not None:
+        query = query.where(GameEvent.room_id == room_id)
+    if nation is not None:
+        nation_id = session.execute(select(Nation.id).where(Nation.name == nation)).scalar()
+        if nation_id is None:
+            return {"events": [], "next_cursor": None}
+        query = query.where(GameEvent.primary_nation_id == nation_id)
+    if event_type is not None:
+        query = query.where(GameEvent.event_type == event_type)
+    if since is not None:
+        query = query.where(GameEvent.date >= since)
+    if until is not None:
+        query = query.where(GameEvent.date <= until)
+    if cursor is not None:
+        date, event_id = decode_cursor(cursor)
+        # A row-value comparison, which the (date, id) index can seek on
+        query = query.where(tuple_(GameEvent.date, GameEvent.id) < tuple_(date, event_id))
+
+    rows = session.execute(query.order_by(GameEvent.date.desc(), GameEvent.id.desc()).limit(limit + 1)).all()
+    page = rows[:limit]
+    return {
+        "events": [
+            {
+                "id": event.id,
+                "date": event.date.strftime(GAME_DATE_FORMAT),
+                "type": event.event_type,
+                "text": event.description,
+                "nation": nation_name,
+                "room": event.room_id
+            }
+            for event, nation_name in page
+        ],
+        "next_cursor": encode_cursor(page[-1][0]) if len(rows) > limit else None
+    }
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, DateTime
+from sqlalchemy import Column, Integer, String, Float, Boolean, ForeignKey, Table, DateTime, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import relationship
 import datetime
@@ -109,12 +109,21 @@ class GameEvent(Base):
     id = Column(Integer, primary_key=True)
     event_type = Column(String, nullable=False)  # war, alliance, disaster, breakthrough
     description = Column(String, nullable=False)
-    date = Column(DateTime, default=datetime.datetime.utcnow)
+    date = Column(DateTime, default=datetime.datetime.utcnow)  # In-game date
+    room_id = Column(String, nullable=True)  # Game room the event happened in
     
     # Foreign keys for involved nations
     primary_nation_id = Column(Integer, ForeignKey('nations.id'), nullable=True)
     secondary_nation_id = Column(Integer, ForeignKey('nations.id'), nullable=True)
     
+    # History is read newest first by keyset on (date, id), filtered by one of these
+    __table_args__ = (
+        Index('ix_game_events_date', 'date', 'id'),
+        Index('ix_game_events_type_date', 'event_type', 'date', 'id'),
+        Index('ix_game_events_nation_date', 'primary_nation_id', 'date', 'id'),
+        Index('ix_game_events_room_date', 'room_id', 'date', 'id'),
+    )
+    
     def __repr__(self):
         return f"<GameEvent(type='{self.event_type}', date='{self.date}')>"
 
@@ -129,4 +138,15 @@ class ResearchProgress(Base):
     completed = Column(Boolean, default=False)
     
     def __repr__(self):
-        return f"<ResearchProgress(tech='{self.technology_name}', progress={self.progress})>" 
\ No newline at end of file
+        return f"<ResearchProgress(tech='{self.technology_name}', progress={self.progress})>"
+
+class SeedVersion(Base):
+    __tablename__ = 'seed_version'
+    
+    # Single row, bumped whenever the seed data (nations, leaders, alliances) is rewritten
+    id = Column(Integer, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow)
+    
+    def __repr__(self):
+        return f"<SeedVersion(version={self.version}, updated_at='{self.updated_at}')>"
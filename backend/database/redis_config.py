@@ -0,0 +1,23 @@
+import os
+from typing import Optional
+import redis.asyncio as aioredis
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Get Redis URL from environment variable or use default
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Maximum number of pooled connections per process
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+
+_client: Optional[aioredis.Redis] = None
+
+# Shared async Redis client backed by a connection pool
+def get_redis() -> aioredis.Redis:
+    global _client
+    if _client is None:
+        pool = aioredis.ConnectionPool.from_url(REDIS_URL, max_connections=REDIS_MAX_CONNECTIONS)
+        _client = aioredis.Redis(connection_pool=pool)
+    return _client
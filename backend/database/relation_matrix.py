@@ -0,0 +1,136 @@
+from typing import Dict, Iterable, List, Optional, Tuple
+
+# Redis string holding the relation matrix, one byte per ordered pair of
+# nations, row-major: the relation of nation i towards nation j is the byte
+# at offset i * size + j
+MATRIX_KEY = "relations:matrix"
+
+# Redis hash of nation name -> row index, plus the "__size__" field
+INDEX_KEY = "relations:index"
+SIZE_FIELD = "__size__"
+
+# Relations range from 0 (hostile) to 100 (allied)
+MIN_RELATION = 0
+MAX_RELATION = 100
+NEUTRAL_RELATION = 50
+
+
+def _clamp(value: int) -> int:
+    return max(MIN_RELATION, min(MAX_RELATION, int(value)))
+
+
+class RelationMatrix:
+    """
+    Relations between nations stored as a packed matrix in one Redis string.
+
+    A single pair is read with GETRANGE and written with SETRANGE on its
+    byte, a whole row is one GETRANGE, and several rows are fetched in one
+    pipelined round trip. The name -> row index mapping is loaded once and
+    kept in memory; it only changes when the matrix is re-initialized.
+    """
+
+    def __init__(self, redis):
+        self.redis = redis
+        self._index: Optional[Dict[str, int]] = None
+        self._names: List[str] = []
+
+    async def initialize(self, nations: List[str], relations: Optional[Dict[Tuple[str, str], int]] = None,
+                         default: int = NEUTRAL_RELATION):
+        """
+        Replace the matrix, writing it and its index in one pipelined transaction.
+
+        Args:
+            nations: Nation names, in row order
+            relations: Relation values by (nation, other nation); unlisted pairs get the default
+            default: Relation between nations not listed in relations
+        """
+        size = len(nations)
+        index = {name: i for i, name in enumerate(nations)}
+        matrix = bytearray([_clamp(default)]) * (size * size)
+        for (nation, other), value in (relations or {}).items():
+            matrix[index[nation] * size + index[other]] = _clamp(value)
+        # A nation's relation with itself is meaningless; keep the diagonal at the maximum
+        for i in range(size):
+            matrix[i * size + i] = MAX_RELATION
+
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.delete(MATRIX_KEY, INDEX_KEY)
+            pipe.set(MATRIX_KEY, bytes(matrix))
+            pipe.hset(INDEX_KEY, mapping={**index, SIZE_FIELD: size})
+            await pipe.execute()
+
+        self._index = index
+        self._names = list(nations)
+
+    async def load_index(self) -> Dict[str, int]:
+        """Fetch the name -> row index mapping (once; cached afterwards)"""
+        if self._index is None:
+            raw = await self.redis.hgetall(INDEX_KEY)
+            fields = {field.decode(): int(value) for field, value in raw.items()}
+            fields.pop(SIZE_FIELD, None)
+            self._index = fields
+            self._names = sorted(fields, key=fields.get)
+        return self._index
+
+    @property
+    def size(self) -> int:
+        return len(self._names)
+
+    async def _offset(self, nation: str, other: str) -> int:
+        index = await self.load_index()
+        if nation not in index or other not in index:
+            raise KeyError(f"Unknown nation: {nation if nation not in index else other}")
+        return index[nation] * self.size + index[other]
+
+    async def get(self, nation: str, other: str) -> int:
+        """Relation of nation towards other"""
+        offset = await self._offset(nation, other)
+        value = await self.redis.getrange(MATRIX_KEY, offset, offset)
+        return value[0] if value else NEUTRAL_RELATION
+
+    async def set(self, nation: str, other: str, value: int, symmetric: bool = True):
+        """
+        Write the relation of nation towards other.
+
+        Args:
+            nation: Nation name
+            other: Other nation name
+            value: Relation between 0 and 100
+            symmetric: Also write the relation of other towards nation
+        """
+        value = bytes([_clamp(value)])
+        offset = await self._offset(nation, other)
+        if not symmetric:
+            await self.redis.setrange(MATRIX_KEY, offset, value)
+            return
+        reverse = await self._offset(other, nation)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.setrange(MATRIX_KEY, offset, value)
+            pipe.setrange(MATRIX_KEY, reverse, value)
+            await pipe.execute()
+
+    async def rows(self, nations: Iterable[str]) -> Dict[str, Dict[str, int]]:
+        """
+        Relations of several nations towards every other nation, one
+        GETRANGE per row sent in a single pipelined round trip.
+
+        Returns:
+            Dict: nation -> other nation -> relation
+        """
+        index = await self.load_index()
+        nations = [nation for nation in nations if nation in index]
+        size = self.size
+        async with self.redis.pipeline(transaction=False) as pipe:
+            for nation in nations:
+                start = index[nation] * size
+                pipe.getrange(MATRIX_KEY, start, start + size - 1)
+            results = await pipe.execute()
+
+        return {
+            nation: {other: row[i] for i, other in enumerate(self._names) if other != nation}
+            for nation, row in zip(nations, results)
+        }
+
+    async def row(self, nation: str) -> Dict[str, int]:
+        """Relations of one nation towards every other nation"""
+        return (await self.rows([nation])).get(nation, {})
@@ -0,0 +1,43 @@
+import datetime
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from .models import SeedVersion
+
+# Id of the single seed version row
+SEED_VERSION_ID = 1
+
+
+def bump_seed_version(session: Session) -> int:
+    """
+    Mark the seed data as changed, so caches built from it are rebuilt.
+
+    Call it inside the transaction that rewrites the seed data; the new
+    version becomes visible when that transaction commits.
+
+    Args:
+        session: Open database session
+
+    Returns:
+        int: The new seed version
+    """
+    row = session.get(SeedVersion, SEED_VERSION_ID)
+    if row is None:
+        row = SeedVersion(id=SEED_VERSION_ID, version=0)
+        session.add(row)
+    row.version = (row.version or 0) + 1
+    row.updated_at = datetime.datetime.utcnow()
+    return row.version
+
+
+def get_seed_version(session: Session) -> int:
+    """
+    Current seed version, or 0 if the data was seeded before versions were
+    tracked (no row, or no table yet).
+    """
+    try:
+        row = session.get(SeedVersion, SEED_VERSION_ID)
+    except SQLAlchemyError:
+        session.rollback()
+        return 0
+    return row.version if row is not None else 0
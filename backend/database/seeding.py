@@ -0,0 +1,233 @@
+import csv
+import io
+import json
+import os
+import time
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+from sqlalchemy import Table, insert, text
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from .models import Base, Leader, Nation, Alliance, alliance_members
+from .seed_version import bump_seed_version
+
+# Built-in scenarios shipped with the backend, by name
+SCENARIOS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scenarios")
+DEFAULT_SCENARIO = "default"
+
+# Rows buffered per table before they are sent in one bulk round trip
+BATCH_SIZE = 5000
+
+# Tables holding seed data, children first so they can be cleared in order
+SEED_TABLES = [
+    "alliance_members", "treaty_participants", "alliances", "treaties",
+    "game_events", "research_progress", "nations", "leaders",
+]
+
+
+def scenario_path(scenario: str) -> str:
+    """Resolve a built-in scenario name or a path to a scenario file"""
+    if os.path.exists(scenario):
+        return scenario
+    return os.path.join(SCENARIOS_DIR, f"{scenario}.jsonl")
+
+
+def read_scenario(f: IO[str]) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    Stream the records of a JSON Lines scenario file, one per line:
+
+        {"type": "nation", "nation": {...Nation columns}, "leader": {...Leader columns}}
+        {"type": "alliance", "name": ..., "alliance_type": ..., "members": [nation names]}
+
+    Blank lines and lines starting with "#" are skipped.
+
+    Yields:
+        Tuple: (line number, record)
+    """
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        try:
+            yield line_number, json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Line {line_number}: invalid JSON ({e})")
+
+
+class _TableLoader:
+    """
+    Buffers rows for one table and writes them in bulk: Postgres COPY when
+    available, otherwise one multi-row executemany per batch. Ids are
+    assigned here, so rows can reference each other without a round trip
+    per row to learn generated keys.
+    """
+
+    def __init__(self, connection: Connection, table: Table, use_copy: bool,
+                 parents: Optional[List["_TableLoader"]] = None):
+        self.connection = connection
+        self.table = table
+        self.use_copy = use_copy
+        # Loaders of tables this one references; their rows are written first
+        self.parents = parents or []
+        self.columns = [column.name for column in table.columns]
+        self.rows: List[Dict[str, Any]] = []
+        self.next_id = 1
+        self.written = 0
+
+    def add(self, values: Dict[str, Any], line_number: int) -> Optional[int]:
+        unknown = set(values) - set(self.columns)
+        if unknown:
+            raise ValueError(f"Line {line_number}: unknown {self.table.name} fields: {', '.join(sorted(unknown))}")
+
+        row = {}
+        for column in self.table.columns:
+            if column.name in values:
+                row[column.name] = values[column.name]
+            elif column.primary_key and column.name == "id":
+                row["id"] = self.next_id
+                self.next_id += 1
+            elif column.default is not None:
+                default = column.default.arg
+                row[column.name] = default(None) if callable(default) else default
+            else:
+                row[column.name] = None
+
+        self.rows.append(row)
+        if len(self.rows) >= BATCH_SIZE:
+            self.flush()
+        return row.get("id")
+
+    def flush(self):
+        if not self.rows:
+            return
+        for parent in self.parents:
+            parent.flush()
+        if self.use_copy:
+            self._copy()
+        else:
+            self.connection.execute(insert(self.table), self.rows)
+        self.written += len(self.rows)
+        self.rows = []
+
+    def _copy(self):
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        for row in self.rows:
+            # Empty unquoted CSV fields are NULL for COPY
+            writer.writerow(["" if row[column] is None else row[column] for column in self.columns])
+        buffer.seek(0)
+        cursor = self.connection.connection.driver_connection.cursor()
+        try:
+            cursor.copy_expert(
+                f"COPY {self.table.name} ({', '.join(self.columns)}) FROM STDIN WITH (FORMAT csv)",
+                buffer
+            )
+        finally:
+            cursor.close()
+
+
+def _supports_copy(connection: Connection) -> bool:
+    return connection.dialect.name == "postgresql" and connection.dialect.driver == "psycopg2"
+
+
+def _clear_seed_tables(connection: Connection):
+    if connection.dialect.name == "postgresql":
+        connection.execute(text(f"TRUNCATE {', '.join(SEED_TABLES)} RESTART IDENTITY"))
+    else:
+        for table in SEED_TABLES:
+            connection.execute(text(f"DELETE FROM {table}"))
+
+
+def _reset_sequences(connection: Connection, tables: List[Table]):
+    # Ids were assigned by the loader, so move the serial sequences past them
+    if connection.dialect.name != "postgresql":
+        return
+    for table in tables:
+        connection.execute(text(
+            f"SELECT setval(pg_get_serial_sequence('{table.name}', 'id'), "
+            f"COALESCE((SELECT MAX(id) FROM {table.name}), 0) + 1, false)"
+        ))
+
+
+def seed_scenario(engine: Engine, scenario: str = DEFAULT_SCENARIO, verbose: bool = True) -> Dict[str, Any]:
+    """
+    Replace the seed data with a scenario, streaming the file and loading
+    leaders, nations, alliances and alliance memberships in bulk, all in
+    one transaction.
+
+    Args:
+        engine: SQLAlchemy engine
+        scenario: Built-in scenario name or path to a JSON Lines scenario file
+        verbose: Print progress and throughput
+
+    Returns:
+        Dict: Row counts per table, total rows, elapsed seconds and rows per second
+    """
+    path = scenario_path(scenario)
+    Base.metadata.create_all(bind=engine)
+
+    started = time.perf_counter()
+    with engine.begin() as connection:
+        use_copy = _supports_copy(connection)
+        _clear_seed_tables(connection)
+
+        leaders = _TableLoader(connection, Leader.__table__, use_copy)
+        nations = _TableLoader(connection, Nation.__table__, use_copy, [leaders])
+        alliances = _TableLoader(connection, Alliance.__table__, use_copy)
+        members = _TableLoader(connection, alliance_members, use_copy, [nations, alliances])
+
+        nation_ids: Dict[str, int] = {}
+        pending_alliances: List[Tuple[int, int, List[str]]] = []  # (line, alliance id, member names)
+
+        with open(path, encoding="utf-8") as f:
+            for line_number, record in read_scenario(f):
+                record_type = record.get("type", "nation")
+                if record_type == "nation":
+                    nation = dict(record["nation"])
+                    if record.get("leader"):
+                        nation["leader_id"] = leaders.add(record["leader"], line_number)
+                    nation_ids[nation["name"]] = nations.add(nation, line_number)
+                elif record_type == "alliance":
+                    alliance = {key: value for key, value in record.items() if key not in ("type", "members")}
+                    alliance_id = alliances.add(alliance, line_number)
+                    pending_alliances.append((line_number, alliance_id, record.get("members", [])))
+                else:
+                    raise ValueError(f"Line {line_number}: unknown record type {record_type!r}")
+
+        # Memberships last: alliances may list nations defined further down the file
+        for line_number, alliance_id, member_names in pending_alliances:
+            for name in member_names:
+                if name in nation_ids:
+                    members.add({"alliance_id": alliance_id, "nation_id": nation_ids[name]}, line_number)
+                elif verbose:
+                    print(f"Line {line_number}: skipping unknown alliance member {name}")
+        for loader in (leaders, nations, alliances, members):
+            loader.flush()
+
+        _reset_sequences(connection, [Leader.__table__, Nation.__table__, Alliance.__table__])
+
+        # Invalidate caches built from the previous seed data (e.g. /playable-nations)
+        with Session(bind=connection) as session:
+            bump_seed_version(session)
+            session.flush()
+
+    elapsed = time.perf_counter() - started
+    counts = {
+        "leaders": leaders.written,
+        "nations": nations.written,
+        "alliances": alliances.written,
+        "alliance_members": members.written,
+    }
+    total = sum(counts.values())
+    report = {
+        **counts,
+        "rows": total,
+        "seconds": round(elapsed, 3),
+        "rows_per_second": round(total / elapsed) if elapsed > 0 else total,
+        "method": "copy" if use_copy else "insert"
+    }
+    if verbose:
+        print(f"Seeded scenario {scenario}: {counts['nations']} nations, {counts['leaders']} leaders, "
+              f"{counts['alliances']} alliances, {counts['alliance_members']} memberships")
+        print(f"Loaded {total} rows in {elapsed:.2f}s ({report['rows_per_second']:,} rows/s via {report['method']})")
+    return report
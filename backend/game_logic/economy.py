@@ -1,5 +1,9 @@
 import random
-from typing import Dict, List, Any
+import numpy as np
+from collections import Counter
+from typing import Dict, List, Any, Optional, Set, Tuple
+
+from game_logic.relations import RelationshipIndex, nation_key
 
 class EconomySystem:
     """
@@ -7,7 +11,10 @@ class EconomySystem:
     This includes GDP growth, trade relationships, sanctions, and financial markets.
     """
     
-    def __init__(self):
+    def __init__(self, relations: Optional[RelationshipIndex] = None):
+        # Trade, sanction, alliance and treaty relationships between nations
+        self.relations = relations if relations is not None else RelationshipIndex()
+
         self.base_growth_rate = 0.025  # 2.5% annual growth
         self.max_growth_rate = 0.10    # 10% max growth
         self.min_growth_rate = -0.05   # -5% recession
@@ -83,6 +90,73 @@ class EconomySystem:
         
         return updated_nation
     
+    def calculate_all(self, world_state: Dict[str, Any], rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Calculate the GDP growth of every nation in one batched pass.
+
+        Trade and sanction relationships are resolved once for the whole
+        world instead of once per nation. With the default rng the random
+        draws come from the `random` module in the same order as calling
+        calculate_gdp_growth on each nation in turn, so the results match
+        the per-nation path exactly for the same seed.
+
+        Args:
+            world_state: Dictionary containing global game state
+            rng: Optional NumPy generator for faster, vectorized draws
+
+        Returns:
+            np.ndarray: Growth rate per nation, in world_state["nations"] order
+        """
+        nations = world_state.get('nations', [])
+        n = len(nations)
+        if n == 0:
+            return np.zeros(0)
+
+        tax_rate = np.array([nation.get('tax_rate', 0.25) for nation in nations], dtype=np.float64)
+        research_spending = np.array([nation.get('research_spending', 0.05) for nation in nations], dtype=np.float64)
+        trade_partners, sanctions = self._relationship_counts(world_state)
+
+        # Uniform [0, 1) samples: trade factor, sanction factor and random factor per nation
+        if rng is None:
+            samples = np.array([random.random() for _ in range(3 * n)]).reshape(n, 3)
+        else:
+            samples = rng.random((n, 3))
+        trade_draw = 0.5 + 0.5 * samples[:, 0]
+        sanction_draw = 0.7 + (1.0 - 0.7) * samples[:, 1]
+        random_factor = -0.01 + (0.01 - -0.01) * samples[:, 2]
+
+        # Same operations, in the same order, as calculate_gdp_growth
+        growth_rate = np.full(n, self.base_growth_rate)
+        growth_rate -= (tax_rate - 0.25) * 0.1
+        growth_rate += research_spending * 0.2
+        growth_rate += trade_partners * self.trade_boost_factor * trade_draw
+        growth_rate -= sanctions * self.sanction_penalty_factor * sanction_draw
+        growth_rate += random_factor
+
+        return np.clip(growth_rate, self.min_growth_rate, self.max_growth_rate)
+
+    def update_all(self, world_state: Dict[str, Any], rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """
+        Update every nation's GDP in place from one batched growth calculation.
+
+        Args:
+            world_state: Dictionary containing global game state
+            rng: Optional NumPy generator for faster, vectorized draws
+
+        Returns:
+            np.ndarray: Growth rate applied to each nation
+        """
+        nations = world_state.get('nations', [])
+        growth_rates = self.calculate_all(world_state, rng)
+        current_gdp = np.array([nation.get('gdp', 0) for nation in nations], dtype=np.float64)
+        new_gdp = current_gdp * (1 + growth_rates)
+
+        for nation, gdp, growth_rate in zip(nations, new_gdp.tolist(), growth_rates.tolist()):
+            nation['gdp'] = gdp
+            nation['gdp_growth_rate'] = growth_rate
+
+        return growth_rates
+
     def calculate_trade_impact(self, nation1: Dict[str, Any], nation2: Dict[str, Any]) -> Dict[str, float]:
         """
         Calculate the economic impact of trade between two nations.
@@ -144,21 +218,43 @@ class EconomySystem:
             'sanction_impact': sanction_impact
         }
     
+    def _relationship_counts(self, world_state: Dict[str, Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Number of trade partners and sanctions of every nation, with the same
+        semantics as _get_trade_partners and _get_sanctions but resolved from
+        one pass over the world and set lookups in the relationship index.
+        """
+        nations = world_state.get('nations', [])
+        id_counts = Counter(nation_key(n) for n in nations)
+        total = len(nations)
+
+        trade_partners = np.empty(total)
+        sanctions = np.empty(total)
+        for i, nation in enumerate(nations):
+            sanctioning_ids = self._sanctioning_ids(nation)
+            trade_partners[i] = sum(id_counts.get(p, 0) for p in self._trade_partner_ids(nation, sanctioning_ids))
+            sanctions[i] = sum(id_counts.get(s, 0) for s in sanctioning_ids)
+
+        return trade_partners, sanctions
+
     def _get_trade_partners(self, nation: Dict[str, Any], world_state: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get all trade partners for a nation"""
-        # This would normally check treaties and alliances
-        # For now, return a simple placeholder
-        nation_id = nation.get('id', 0)
-        all_nations = world_state.get('nations', [])
-        
-        # Filter out the current nation and any nations with sanctions
-        sanctions = self._get_sanctions(nation, world_state)
-        sanctioned_ids = [s.get('id', -1) for s in sanctions]
-        
-        return [n for n in all_nations if n.get('id', -1) != nation_id and n.get('id', -1) not in sanctioned_ids]
+        partner_ids = self._trade_partner_ids(nation, self._sanctioning_ids(nation))
+        if not partner_ids:
+            return []
+        return [n for n in world_state.get('nations', []) if nation_key(n) in partner_ids]
     
     def _get_sanctions(self, nation: Dict[str, Any], world_state: Dict[str, Any]) -> List[Dict[str, Any]]:
         """Get all nations imposing sanctions on this nation"""
-        # This would normally check treaties and diplomatic status
-        # For now, return a simple placeholder
-        return [] 
\ No newline at end of file
+        sanctioning_ids = self._sanctioning_ids(nation)
+        if not sanctioning_ids:
+            return []
+        return [n for n in world_state.get('nations', []) if nation_key(n) in sanctioning_ids]
+
+    def _sanctioning_ids(self, nation: Dict[str, Any]) -> Set[Any]:
+        """Ids of the nations imposing sanctions on this nation, from the relationship index"""
+        return self.relations.sanctions_on(nation_key(nation))
+
+    def _trade_partner_ids(self, nation: Dict[str, Any], sanctioning_ids: Set[Any]) -> Set[Any]:
+        """Ids of the nations sharing a trade treaty with this nation, except those sanctioning it"""
+        return self.relations.trade_partners(nation_key(nation)) - sanctioning_ids
\ No newline at end of file
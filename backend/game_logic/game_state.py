@@ -0,0 +1,58 @@
+import copy
+from typing import Dict, Any
+
+# Initial default game state - used when resetting
+DEFAULT_GAME_STATE = {
+    "date": "January 20, 2025",
+    "speed": "normal",
+    "paused": True,
+    "nations": [
+        {"name": "United States", "leader": "Donald Trump", "gdp": 25000, "military_power": 100},
+        {"name": "China", "leader": "Li Qiang", "gdp": 18000, "military_power": 85},
+        {"name": "Russia", "leader": "Vladimir Putin", "gdp": 4000, "military_power": 70},
+        {"name": "India", "leader": "Narendra Modi", "gdp": 3500, "military_power": 65},
+        {"name": "France", "leader": "Emmanuel Macron", "gdp": 3000, "military_power": 60},
+        {"name": "Germany", "leader": "Friedrich Merz", "gdp": 4500, "military_power": 55},
+        {"name": "United Kingdom", "leader": "Keir Starmer", "gdp": 3200, "military_power": 58},
+        {"name": "Poland", "leader": "Sławomir Mentzen", "gdp": 800, "military_power": 30},
+        {"name": "Ukraine", "leader": "Volodymyr Zelenskyy", "gdp": 350, "military_power": 25},
+        {"name": "North Korea", "leader": "Kim Jong-un", "gdp": 30, "military_power": 20}
+    ],
+    "alliances": [
+        {
+            "name": "NATO",
+            "members": ["United States", "United Kingdom", "France", "Germany", "Poland"]
+        },
+        {
+            "name": "Shanghai Cooperation",
+            "members": ["China", "Russia"]
+        }
+    ],
+    "events": []
+}
+
+# Fresh game state for a new game or a new room
+def new_game_state() -> Dict[str, Any]:
+    return copy.deepcopy(DEFAULT_GAME_STATE)
+
+# Baseline global tension (0-100) and how much each recent event type adds to it
+BASE_TENSION = 50.0
+EVENT_TENSION = {
+    "military": 5.0,
+    "political": 2.5,
+    "disaster": 1.0,
+    "economic": -1.0
+}
+
+def global_tension(state: Dict[str, Any]) -> float:
+    """
+    World tension derived from the recent event log, from 0 (peaceful) to 100.
+
+    Args:
+        state: Game state dictionary
+
+    Returns:
+        float: Global tension
+    """
+    tension = BASE_TENSION + sum(EVENT_TENSION.get(event.get("type"), 0.0) for event in state.get("events", []))
+    return round(max(0.0, min(100.0, tension)), 1)
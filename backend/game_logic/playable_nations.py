@@ -0,0 +1,134 @@
+import hashlib
+import json
+import threading
+import time
+from typing import Dict, List, Any, Optional, Tuple
+from sqlalchemy.orm import Session
+
+from database.models import Nation, Leader
+from database.seed_version import get_seed_version
+
+
+def describe_nation(nation: Nation, leader: Leader) -> Dict[str, Any]:
+    """
+    Build the nation-select entry for a nation.
+
+    Args:
+        nation: Nation row
+        leader: The nation's leader row
+
+    Returns:
+        Dict: Name, leader, difficulty level and description
+    """
+    # Determine difficulty level based on factors like military power, economy, etc.
+    difficulty = "medium"  # default
+
+    # Simple algorithm: higher military power and GDP = easier
+    if nation.military_power >= 90 and nation.gdp >= 20000:
+        difficulty = "easy"
+    elif nation.military_power < 60 or nation.gdp < 3000:
+        difficulty = "hard"
+
+    # Format description based on nation's attributes
+    description = f"{'Nuclear power with ' if nation.has_nuclear_weapons else ''}"
+
+    if nation.military_power > 80:
+        description += "powerful military and "
+    elif nation.military_power > 60:
+        description += "strong military and "
+    else:
+        description += "developing military and "
+
+    if nation.gdp > 15000:
+        description += "massive economy."
+    elif nation.gdp > 5000:
+        description += "substantial economy."
+    else:
+        description += "growing economy."
+
+    return {
+        "name": nation.name,
+        "leader": leader.name,
+        "difficulty": difficulty,
+        "description": description,
+    }
+
+
+def load_playable_nations(session: Session) -> List[Dict[str, Any]]:
+    """Get all playable nations with their details and difficulty levels"""
+    nations_with_leaders = (
+        session.query(Nation, Leader)
+        .join(Leader, Nation.leader_id == Leader.id)
+        .all()
+    )
+    return [describe_nation(nation, leader) for nation, leader in nations_with_leaders]
+
+
+class PlayableNationsCache:
+    """
+    In-memory cache of the /playable-nations response.
+
+    The list is built once per seed version and kept pre-encoded together
+    with its ETag. Seed data is rewritten by other processes
+    (initialize_all_nations, reset), so the cache checks the seed version
+    stamp at most once every `revalidate_interval` seconds and rebuilds only
+    when it changed.
+    """
+
+    def __init__(self, engine, revalidate_interval: float = 5.0):
+        self.engine = engine
+        self.revalidate_interval = revalidate_interval
+        self.version: Optional[int] = None
+        self.body: Optional[bytes] = None
+        self.etag: Optional[str] = None
+        self._checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def fresh(self) -> Optional[Tuple[bytes, str]]:
+        """Cached (body, etag) if it was validated recently enough, without touching the database"""
+        if self.body is not None and time.monotonic() - self._checked_at < self.revalidate_interval:
+            return self.body, self.etag
+        return None
+
+    def get(self) -> Tuple[bytes, str]:
+        """
+        Cached (body, etag), revalidated against the seed version first if
+        due. Blocks on the database, so call it from a worker thread.
+        """
+        with self._lock:
+            # Another thread may have revalidated while we waited for the lock
+            cached = self.fresh()
+            if cached is not None:
+                return cached
+
+            session = Session(self.engine)
+            try:
+                version = get_seed_version(session)
+                # Version 0 means the seed data predates version stamps, so it is always reloaded
+                if self.body is None or version != self.version or version == 0:
+                    nations = load_playable_nations(session)
+                    self.body = json.dumps(nations, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                    digest = hashlib.sha1(self.body).hexdigest()[:16]
+                    self.etag = f'W/"{version}-{digest}"'
+                    self.version = version
+                self._checked_at = time.monotonic()
+            finally:
+                session.close()
+
+            return self.body, self.etag
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
@@ -0,0 +1,192 @@
+from collections import Counter, defaultdict
+from typing import Any, Dict, FrozenSet, Hashable, Iterable, Set, Tuple
+
+# Treaty type that makes its participants trade partners
+TRADE_TREATY = "trade"
+
+
+def nation_key(nation: Dict[str, Any]) -> Hashable:
+    """Key a nation is indexed under: its id, or its name if it has none"""
+    return nation.get('id', nation.get('name'))
+
+
+def _pairs(members: FrozenSet[Hashable]) -> Iterable[Tuple[Hashable, Hashable]]:
+    """Both orderings of every pair of distinct members"""
+    for a in members:
+        for b in members:
+            if a != b:
+                yield a, b
+
+
+class RelationshipIndex:
+    """
+    Incrementally maintained index of relationships between nations, keyed
+    by nation id.
+
+    Holds trade partners, sanctions, alliances and treaties as sets so every
+    membership check is O(1). Each mutation (a treaty signed or dissolved, a
+    sanction imposed or lifted, ...) updates only the entries it touches, so
+    nothing has to be rebuilt when growth is calculated.
+    """
+
+    def __init__(self):
+        # Sanctions: target -> imposers, and imposer -> targets
+        self._sanctions_on: Dict[Hashable, Set[Hashable]] = defaultdict(set)
+        self._sanctions_by: Dict[Hashable, Set[Hashable]] = defaultdict(set)
+
+        # Alliances: alliance -> members, nation -> alliances
+        self._alliances: Dict[Hashable, FrozenSet[Hashable]] = {}
+        self._nation_alliances: Dict[Hashable, Set[Hashable]] = defaultdict(set)
+
+        # Treaties: treaty -> (type, participants), nation -> treaties
+        self._treaties: Dict[Hashable, Tuple[str, FrozenSet[Hashable]]] = {}
+        self._nation_treaties: Dict[Hashable, Set[Hashable]] = defaultdict(set)
+
+        # Ordered pair -> number of alliances / trade treaties linking it,
+        # so a link survives until the last thing creating it goes away
+        self._ally_links: Counter = Counter()
+        self._trade_links: Counter = Counter()
+        self._allies: Dict[Hashable, Set[Hashable]] = defaultdict(set)
+        self._trade_partners: Dict[Hashable, Set[Hashable]] = defaultdict(set)
+
+    # Queries
+
+    def sanctions_on(self, nation_id: Hashable) -> Set[Hashable]:
+        """Ids of the nations imposing sanctions on this nation"""
+        return self._sanctions_on.get(nation_id, set())
+
+    def sanctions_by(self, nation_id: Hashable) -> Set[Hashable]:
+        """Ids of the nations this nation sanctions"""
+        return self._sanctions_by.get(nation_id, set())
+
+    def is_sanctioning(self, from_id: Hashable, to_id: Hashable) -> bool:
+        return from_id in self._sanctions_on.get(to_id, ())
+
+    def trade_partners(self, nation_id: Hashable) -> Set[Hashable]:
+        """Ids of the nations sharing a trade treaty with this nation"""
+        return self._trade_partners.get(nation_id, set())
+
+    def are_trade_partners(self, a: Hashable, b: Hashable) -> bool:
+        return (a, b) in self._trade_links
+
+    def allies(self, nation_id: Hashable) -> Set[Hashable]:
+        """Ids of the nations sharing an alliance with this nation"""
+        return self._allies.get(nation_id, set())
+
+    def are_allied(self, a: Hashable, b: Hashable) -> bool:
+        return (a, b) in self._ally_links
+
+    def alliances_of(self, nation_id: Hashable) -> Set[Hashable]:
+        return self._nation_alliances.get(nation_id, set())
+
+    def treaties_of(self, nation_id: Hashable) -> Set[Hashable]:
+        return self._nation_treaties.get(nation_id, set())
+
+    # Sanctions
+
+    def add_sanction(self, from_id: Hashable, to_id: Hashable):
+        if from_id == to_id or self.is_sanctioning(from_id, to_id):
+            return
+        self._sanctions_on[to_id].add(from_id)
+        self._sanctions_by[from_id].add(to_id)
+
+    def remove_sanction(self, from_id: Hashable, to_id: Hashable):
+        if not self.is_sanctioning(from_id, to_id):
+            return
+        self._discard(self._sanctions_on, to_id, from_id)
+        self._discard(self._sanctions_by, from_id, to_id)
+
+    # Alliances
+
+    def add_alliance(self, alliance_id: Hashable, members: Iterable[Hashable]):
+        """Add an alliance, or replace its member list if it already exists"""
+        self.remove_alliance(alliance_id)
+        members = frozenset(members)
+        self._alliances[alliance_id] = members
+        for member in members:
+            self._nation_alliances[member].add(alliance_id)
+        self._link(self._ally_links, self._allies, members)
+
+    def remove_alliance(self, alliance_id: Hashable):
+        members = self._alliances.pop(alliance_id, None)
+        if members is None:
+            return
+        for member in members:
+            self._discard(self._nation_alliances, member, alliance_id)
+        self._unlink(self._ally_links, self._allies, members)
+
+    def join_alliance(self, alliance_id: Hashable, nation_id: Hashable):
+        members = self._alliances.get(alliance_id, frozenset())
+        if nation_id not in members:
+            self.add_alliance(alliance_id, members | {nation_id})
+
+    def leave_alliance(self, alliance_id: Hashable, nation_id: Hashable):
+        members = self._alliances.get(alliance_id)
+        if members is not None and nation_id in members:
+            self.add_alliance(alliance_id, members - {nation_id})
+
+    # Treaties
+
+    def add_treaty(self, treaty_id: Hashable, treaty_type: str, participants: Iterable[Hashable]):
+        """Add a treaty, or replace it if it already exists"""
+        self.remove_treaty(treaty_id)
+        participants = frozenset(participants)
+        self._treaties[treaty_id] = (treaty_type, participants)
+        for participant in participants:
+            self._nation_treaties[participant].add(treaty_id)
+        if treaty_type == TRADE_TREATY:
+            self._link(self._trade_links, self._trade_partners, participants)
+
+    def remove_treaty(self, treaty_id: Hashable):
+        treaty = self._treaties.pop(treaty_id, None)
+        if treaty is None:
+            return
+        treaty_type, participants = treaty
+        for participant in participants:
+            self._discard(self._nation_treaties, participant, treaty_id)
+        if treaty_type == TRADE_TREATY:
+            self._unlink(self._trade_links, self._trade_partners, participants)
+
+    # Bulk loading
+
+    @classmethod
+    def from_world(cls, world_state: Dict[str, Any]) -> "RelationshipIndex":
+        """
+        Build an index from a world state's optional "alliances", "treaties"
+        and "sanctions" entries. Alliance members and treaty participants may
+        be given as nation ids or names; names are resolved through the
+        nations' "id" field and kept as-is when a nation has no id.
+        """
+        ids = {nation.get('name'): nation_key(nation) for nation in world_state.get('nations', [])}
+        index = cls()
+        for i, alliance in enumerate(world_state.get('alliances', [])):
+            index.add_alliance(alliance.get('id', alliance.get('name', i)),
+                               [ids.get(member, member) for member in alliance.get('members', [])])
+        for i, treaty in enumerate(world_state.get('treaties', [])):
+            index.add_treaty(treaty.get('id', treaty.get('name', i)), treaty.get('type', ''),
+                             [ids.get(p, p) for p in treaty.get('participants', [])])
+        for sanction in world_state.get('sanctions', []):
+            index.add_sanction(ids.get(sanction['from'], sanction['from']), ids.get(sanction['to'], sanction['to']))
+        return index
+
+    # Helpers
+
+    @staticmethod
+    def _discard(mapping: Dict[Hashable, Set[Hashable]], key: Hashable, value: Hashable):
+        values = mapping.get(key)
+        if values is not None:
+            values.discard(value)
+            if not values:
+                del mapping[key]
+
+    def _link(self, links: Counter, neighbours: Dict[Hashable, Set[Hashable]], members: FrozenSet[Hashable]):
+        for a, b in _pairs(members):
+            links[(a, b)] += 1
+            neighbours[a].add(b)
+
+    def _unlink(self, links: Counter, neighbours: Dict[Hashable, Set[Hashable]], members: FrozenSet[Hashable]):
+        for a, b in _pairs(members):
+            links[(a, b)] -= 1
+            if links[(a, b)] <= 0:
+                del links[(a, b)]
+                self._discard(neighbours, a, b)
@@ -0,0 +1,246 @@
+import numpy as np
+from datetime import datetime, timedelta
+from typing import Dict, List, Any, Optional, Tuple
+
+# Date format used by the game state ("January 20, 2025")
+DATE_FORMAT = "%B %d, %Y"
+
+# Speed multipliers for each game speed setting
+SPEED_MULTIPLIERS = {
+    "very_slow": 0.5,
+    "slow": 0.8,
+    "normal": 1.0,
+    "fast": 1.5,
+    "very_fast": 2.0
+}
+
+# Number of events kept in the game state event log
+MAX_EVENTS = 20
+
+# Random event templates by event type
+EVENT_TEMPLATES = {
+    "political": [
+        "Election announced in {nation}",
+        "Political unrest in {nation}",
+        "New policy announced by {nation}"
+    ],
+    "economic": [
+        "Economic boom in {nation}",
+        "Recession hitting {nation}",
+        "New trade deal involving {nation}"
+    ],
+    "military": [
+        "{nation} increases military spending",
+        "{nation} reduces nuclear arsenal",
+        "Military exercise by {nation}"
+    ],
+    "disaster": [
+        "Natural disaster in {nation}",
+        "Infrastructure failure in {nation}",
+        "Public health crisis in {nation}"
+    ]
+}
+EVENT_TYPES = list(EVENT_TEMPLATES.keys())
+
+
+class SimulationEngine:
+    """
+    Vectorized tick engine for nation metrics.
+
+    Numeric nation metrics are held as struct-of-arrays NumPy buffers (one
+    float64 array per column), so a tick draws its randomness in one batch
+    and updates every nation with a few array operations. Non-numeric nation
+    fields (name, leader, ...) are kept aside and merged back when the
+    dict-shaped nations list is materialized for clients.
+    """
+
+    # Nation fields held in NumPy buffers
+    NUMERIC_COLUMNS = ("gdp", "military_power")
+
+    # Per-tick percentage change ranges (before the speed multiplier)
+    GDP_CHANGE_RANGE = (-0.2, 0.5)
+    MILITARY_CHANGE_RANGE = (-0.1, 0.2)
+
+    # Bounds for nation metrics
+    MIN_GDP = 10
+    MIN_MILITARY_POWER = 10
+    MAX_MILITARY_POWER = 100
+
+    # Base probability of a random event per tick
+    EVENT_PROBABILITY = 0.01
+
+    def __init__(self, seed: Optional[int] = None):
+        self.rng = np.random.default_rng(seed)
+        self.columns: Dict[str, np.ndarray] = {}
+        self.names: List[str] = []
+        self._static: List[Dict[str, Any]] = []
+        self._nations: Optional[List[Dict[str, Any]]] = None
+        # Event generated by the last advance(), if any
+        self.last_event: Optional[Dict[str, str]] = None
+
+        # Low/high bounds of one tick's draws, stacked so a single call covers all columns
+        self._change_low = np.array([[self.GDP_CHANGE_RANGE[0]], [self.MILITARY_CHANGE_RANGE[0]]])
+        self._change_high = np.array([[self.GDP_CHANGE_RANGE[1]], [self.MILITARY_CHANGE_RANGE[1]]])
+
+    @property
+    def size(self) -> int:
+        return len(self.names)
+
+    def load_nations(self, nations: List[Dict[str, Any]]):
+        """
+        Load nation dicts into the engine's column buffers.
+
+        Args:
+            nations: List of nation dictionaries as found in the game state
+        """
+        self.names = [nation["name"] for nation in nations]
+        self.columns = {
+            column: np.array([nation.get(column, 0.0) for nation in nations], dtype=np.float64)
+            for column in self.NUMERIC_COLUMNS
+        }
+        self._static = [
+            {key: value for key, value in nation.items() if key not in self.NUMERIC_COLUMNS}
+            for nation in nations
+        ]
+        self._nations = nations
+
+    def is_loaded(self, nations: List[Dict[str, Any]]) -> bool:
+        """Check whether the buffers were loaded from (or produced) this nations list"""
+        return nations is self._nations
+
+    def step(self, multiplier: float = 1.0):
+        """
+        Advance every nation's metrics by one tick.
+
+        Args:
+            multiplier: Game speed multiplier applied to the change rates
+        """
+        if not self.names:
+            return
+
+        # One batch of draws for the whole world: row 0 is GDP, row 1 is military
+        changes = self.rng.uniform(self._change_low, self._change_high, size=(2, self.size))
+        changes *= multiplier / 100
+        changes += 1
+
+        gdp = self.columns["gdp"]
+        np.multiply(gdp, changes[0], out=gdp)
+        np.maximum(gdp, self.MIN_GDP, out=gdp)
+        np.round(gdp, 1, out=gdp)
+
+        military = self.columns["military_power"]
+        np.multiply(military, changes[1], out=military)
+        np.clip(military, self.MIN_MILITARY_POWER, self.MAX_MILITARY_POWER, out=military)
+        np.round(military, 1, out=military)
+
+    def nations(self) -> List[Dict[str, Any]]:
+        """
+        Materialize the dict-shaped nations list expected by clients.
+
+        Returns:
+            List: Fresh nation dictionaries built from the column buffers
+        """
+        values = [self.columns[column].tolist() for column in self.NUMERIC_COLUMNS]
+        nations = []
+        for static, row in zip(self._static, zip(*values)):
+            nation = dict(static)
+            nation.update(zip(self.NUMERIC_COLUMNS, row))
+            nations.append(nation)
+        self._nations = nations
+        return nations
+
+    def roll_event(self, multiplier: float = 1.0) -> Optional[Tuple[str, int, int]]:
+        """
+        Roll for a random world event.
+
+        Args:
+            multiplier: Game speed multiplier applied to the event probability
+
+        Returns:
+            Tuple: (event type, affected nation index, template index), or None
+            if no event happened this tick
+        """
+        if not self.names or self.rng.random() >= self.EVENT_PROBABILITY * multiplier:
+            return None
+
+        event_type = EVENT_TYPES[self.rng.integers(len(EVENT_TYPES))]
+        nation_index = int(self.rng.integers(self.size))
+        template_index = int(self.rng.integers(len(EVENT_TEMPLATES[event_type])))
+        return event_type, nation_index, template_index
+
+    def random_event(self, date: str, multiplier: float = 1.0) -> Optional[Dict[str, str]]:
+        """
+        Roll for a random world event and format it for the game state.
+
+        Args:
+            date: Current game date string
+            multiplier: Game speed multiplier applied to the event probability
+
+        Returns:
+            Dict: The generated event, or None if no event happened this tick
+        """
+        rolled = self.roll_event(multiplier)
+        if rolled is None:
+            return None
+
+        event_type, nation_index, template_index = rolled
+        template = EVENT_TEMPLATES[event_type][template_index]
+        return {
+            "date": date,
+            "type": event_type,
+            "text": template.format(nation=self.names[nation_index]),
+            "nation": self.names[nation_index]
+        }
+
+    def advance(self, state: Dict[str, Any], multiplier: float = 1.0) -> Dict[str, Any]:
+        """
+        Run one full simulation tick against a game state.
+
+        Advances the date, updates every nation and rolls for a random event.
+        The state's nations list is replaced rather than mutated, and the
+        buffers are reloaded whenever the state carries a nations list the
+        engine did not produce (new game, loaded save, admin update).
+
+        Args:
+            state: Game state dictionary
+            multiplier: Game speed multiplier
+
+        Returns:
+            Dict: The same state dictionary, updated in place
+        """
+        self.advance_nations(state, multiplier)
+        self.advance_events(state, multiplier)
+        return state
+
+    def advance_nations(self, state: Dict[str, Any], multiplier: float = 1.0):
+        """
+        First half of a tick: advance the date and update every nation.
+
+        Args:
+            state: Game state dictionary
+            multiplier: Game speed multiplier
+        """
+        if not self.is_loaded(state["nations"]):
+            self.load_nations(state["nations"])
+
+        # Advance date
+        current_date = datetime.strptime(state["date"], DATE_FORMAT) + timedelta(days=1)
+        state["date"] = current_date.strftime(DATE_FORMAT)
+
+        # Update nation data
+        self.step(multiplier)
+        state["nations"] = self.nations()
+
+    def advance_events(self, state: Dict[str, Any], multiplier: float = 1.0):
+        """
+        Second half of a tick: roll for a random event (very rare) and keep
+        only the last MAX_EVENTS in the state.
+
+        Args:
+            state: Game state dictionary
+            multiplier: Game speed multiplier
+        """
+        event = self.random_event(state["date"], multiplier)
+        self.last_event = event
+        if event:
+            state["events"] = [event] + state["events"][:MAX_EVENTS - 1]
@@ -1,14 +1,45 @@
+import asyncio
 import os
 import redis
+import redis.asyncio as aioredis
 import json
 from dotenv import load_dotenv
 
+try:
+    from backend.database.relation_matrix import RelationMatrix
+except ModuleNotFoundError:
+    # We're in Docker, use relative imports
+    from database.relation_matrix import RelationMatrix
+
 # Load environment variables
 load_dotenv()
 
 # Get Redis URL from environment variable or use default
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Predefined relations, applied in both directions
+INITIAL_RELATIONS = {
+    ("United States", "Russia"): 20,  # Tense relations
+    ("China", "United States"): 30,  # Somewhat tense relations
+    ("Russia", "Ukraine"): 10,  # Very tense relations
+    ("United States", "United Kingdom"): 90,  # Strong allies
+    ("Russia", "China"): 75,  # Good relations
+}
+
+async def _initialize_relations(nations, relations):
+    client = aioredis.from_url(REDIS_URL)
+    try:
+        await RelationMatrix(client).initialize(nations, relations)
+    finally:
+        await client.aclose()
+
+async def _read_relations(nation):
+    client = aioredis.from_url(REDIS_URL)
+    try:
+        return await RelationMatrix(client).row(nation)
+    finally:
+        await client.aclose()
+
 def initialize_redis():
     try:
         # Connect to Redis
@@ -47,61 +78,40 @@ def initialize_redis():
             "active_conflicts": []
         }
         
-        # Store data in Redis
-        r.set("game_state", json.dumps(game_state))
-        r.set("ai_behavior", json.dumps(ai_behavior))
-        r.set("cached_data", json.dumps(cached_data))
-        
         # Set some nation-specific data
         nations = ["United States", "China", "Russia", "India", "France", 
                   "Germany", "United Kingdom", "Poland", "Ukraine", "North Korea"]
         
+        # Store the static game data and the nation blobs in one round trip
+        pipe = r.pipeline(transaction=False)
+        pipe.set("game_state", json.dumps(game_state))
+        pipe.set("ai_behavior", json.dumps(ai_behavior))
+        pipe.set("cached_data", json.dumps(cached_data))
         for nation in nations:
             nation_key = f"nation:{nation.lower().replace(' ', '_')}"
             nation_data = {
                 "last_action": "none",
                 "ai_state": "neutral",
-                "current_focus": "balanced",
-                "relations": {}
+                "current_focus": "balanced"
             }
-            
-            # Set initial relations between nations
-            for other_nation in nations:
-                if nation != other_nation:
-                    # Default neutral relations (50)
-                    relation_value = 50
-                    
-                    # Set some predefined relations
-                    if (nation == "United States" and other_nation == "Russia") or \
-                       (nation == "Russia" and other_nation == "United States"):
-                        relation_value = 20  # Tense relations
-                    
-                    elif (nation == "China" and other_nation == "United States") or \
-                         (nation == "United States" and other_nation == "China"):
-                        relation_value = 30  # Somewhat tense relations
-                    
-                    elif (nation == "Russia" and other_nation == "Ukraine") or \
-                         (nation == "Ukraine" and other_nation == "Russia"):
-                        relation_value = 10  # Very tense relations
-                    
-                    elif (nation == "United States" and other_nation == "United Kingdom") or \
-                         (nation == "United Kingdom" and other_nation == "United States"):
-                        relation_value = 90  # Strong allies
-                    
-                    elif (nation == "Russia" and other_nation == "China") or \
-                         (nation == "China" and other_nation == "Russia"):
-                        relation_value = 75  # Good relations
-                    
-                    nation_data["relations"][other_nation.lower().replace(' ', '_')] = relation_value
-            
-            r.set(nation_key, json.dumps(nation_data))
-            
+            pipe.set(nation_key, json.dumps(nation_data))
+        pipe.execute()
+        
+        # Relations live in a packed matrix (one byte per pair), not in the nation blobs;
+        # every pair not listed here starts neutral (50)
+        relations = {}
+        for (nation, other_nation), relation_value in INITIAL_RELATIONS.items():
+            relations[(nation, other_nation)] = relation_value
+            relations[(other_nation, nation)] = relation_value
+        asyncio.run(_initialize_relations(nations, relations))
+        
         print(f"Initialized Redis with game state and nation data")
         
         # Verify data was stored correctly
         print("\nVerifying stored data:")
         print(f"Game State: {r.get('game_state').decode('utf-8')}")
         print(f"Sample Nation Data (US): {r.get('nation:united_states').decode('utf-8')}")
+        print(f"Sample Relations (US): {asyncio.run(_read_relations('United States'))}")
         
         return True
         
@@ -0,0 +1,191 @@
+import functools
+import json
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from game_logic.game_state import new_game_state
+
+try:
+    import msgpack
+except ImportError:  # msgpack is optional; clients fall back to JSON
+    msgpack = None
+
+# Wire formats a client can negotiate when it connects to /ws
+JSON = "json"
+MSGPACK = "msgpack"
+
+# Suffix for wire formats whose frames are compressed with a shared dictionary
+DEFLATE_SUFFIX = "+deflate"
+
+# WebSocket subprotocol selecting each wire format
+SUBPROTOCOLS = {
+    "geo.json": JSON,
+    "geo.msgpack": MSGPACK,
+    "geo.json+deflate": JSON + DEFLATE_SUFFIX,
+    "geo.msgpack+deflate": MSGPACK + DEFLATE_SUFFIX,
+}
+
+# Compressed wire formats send binary frames starting with one flag byte:
+# the rest is either the plain encoded frame, or raw deflate of it using the
+# dictionary served by /ws/dictionary. Small frames are not worth compressing
+FLAG_PLAIN = b"\x00"
+FLAG_DEFLATE = b"\x01"
+COMPRESSION_THRESHOLD = 256
+COMPRESSION_LEVEL = 6
+
+Message = Union[str, bytes]
+
+
+class CodecError(ValueError):
+    """Raised when an incoming message cannot be decoded into a command"""
+
+
+def available_codecs() -> List[str]:
+    codecs = [JSON, MSGPACK] if msgpack is not None else [JSON]
+    return codecs + [codec + DEFLATE_SUFFIX for codec in codecs]
+
+
+@functools.lru_cache(maxsize=None)
+def compression_dictionary() -> bytes:
+    """
+    Preset deflate dictionary trained on the shape of our frames: the keys,
+    nation names and leader strings of a default game, in every encoding.
+    Deflate favours matches near the end of the dictionary, so the most
+    common material (frame keys) comes last.
+    """
+    state = new_game_state()
+    samples = [{"response_type": "state_snapshot", "seq": 0, "state": state}]
+    samples.append({
+        "changes": {"date": state["date"], "events": state["events"]},
+        "removed": [],
+        "nations": {nation["name"]: {"gdp": 0.0, "military_power": 0.0} for nation in state["nations"]},
+        "response_type": "state_delta",
+        "seq": 1
+    })
+    parts = [json.dumps(sample).encode("utf-8") for sample in samples]
+    if msgpack is not None:
+        parts += [msgpack.packb(sample, use_bin_type=True) for sample in samples]
+    return b"".join(parts)[-32768:]
+
+
+class CompressionStats:
+    """Running totals for shared frame compression, reported by /stats"""
+
+    def __init__(self):
+        self.frames = 0
+        self.compressed_frames = 0
+        self.raw_bytes = 0
+        self.wire_bytes = 0
+        self.cpu_seconds = 0.0
+
+    def record(self, raw_bytes: int, wire_bytes: int, cpu_seconds: float, compressed: bool):
+        self.frames += 1
+        self.compressed_frames += compressed
+        self.raw_bytes += raw_bytes
+        self.wire_bytes += wire_bytes
+        self.cpu_seconds += cpu_seconds
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "frames": self.frames,
+            "compressed_frames": self.compressed_frames,
+            "raw_bytes": self.raw_bytes,
+            "wire_bytes": self.wire_bytes,
+            "ratio": round(self.wire_bytes / self.raw_bytes, 4) if self.raw_bytes else 1.0,
+            "cpu_ms": round(self.cpu_seconds * 1000, 3),
+            "cpu_us_per_frame": round(self.cpu_seconds * 1e6 / self.frames, 1) if self.frames else 0.0
+        }
+
+
+compression_stats = CompressionStats()
+
+
+def compress(payload: Message) -> bytes:
+    """Wrap an encoded frame for a compressed wire format (flag byte + payload)"""
+    if isinstance(payload, str):
+        payload = payload.encode("utf-8")
+    if len(payload) < COMPRESSION_THRESHOLD:
+        compression_stats.record(len(payload), len(payload) + 1, 0.0, False)
+        return FLAG_PLAIN + payload
+
+    started = time.process_time()
+    compressor = zlib.compressobj(COMPRESSION_LEVEL, zlib.DEFLATED, -15, zdict=compression_dictionary())
+    compressed = compressor.compress(payload) + compressor.flush()
+    elapsed = time.process_time() - started
+
+    # Incompressible frames go out as they are
+    if len(compressed) >= len(payload):
+        compression_stats.record(len(payload), len(payload) + 1, elapsed, False)
+        return FLAG_PLAIN + payload
+    compression_stats.record(len(payload), len(compressed) + 1, elapsed, True)
+    return FLAG_DEFLATE + compressed
+
+
+def negotiate(requested: List[str]) -> Tuple[str, Optional[str]]:
+    """
+    Pick the wire format for a connection from the subprotocols the client
+    offered, in the client's order of preference.
+
+    Args:
+        requested: Subprotocols from the WebSocket handshake
+
+    Returns:
+        Tuple: (codec, subprotocol to accept, or None if none was offered)
+    """
+    codecs = available_codecs()
+    for subprotocol in requested:
+        codec = SUBPROTOCOLS.get(subprotocol)
+        if codec in codecs:
+            return codec, subprotocol
+    return JSON, None
+
+
+def encode(frame: Dict[str, Any], codec: str = JSON) -> Message:
+    """
+    Encode a frame for the wire: JSON text, or MessagePack bytes where
+    nation metrics travel as binary doubles and ints instead of decimal text.
+    """
+    if codec.endswith(DEFLATE_SUFFIX):
+        return compress(encode(frame, codec[:-len(DEFLATE_SUFFIX)]))
+    if codec == MSGPACK:
+        return msgpack.packb(frame, use_bin_type=True)
+    return json.dumps(frame)
+
+
+def decode(data: Message) -> Any:
+    """Decode a client message: text frames are JSON, binary frames MessagePack"""
+    try:
+        if isinstance(data, str):
+            return json.loads(data)
+        if msgpack is None:
+            raise CodecError("Binary messages are not supported (msgpack is not installed)")
+        return msgpack.unpackb(data, raw=False)
+    except CodecError:
+        raise
+    except Exception as e:
+        raise CodecError(str(e)) from e
+
+
+class EncodedFrame:
+    """
+    A frame shared by many clients, encoded at most once per wire format
+    no matter how many clients use that format.
+    """
+
+    def __init__(self, frame: Dict[str, Any], json_message: Optional[str] = None):
+        self.frame = frame
+        self._encoded: Dict[str, Message] = {}
+        if json_message is not None:
+            self._encoded[JSON] = json_message
+
+    def get(self, codec: str = JSON) -> Message:
+        message = self._encoded.get(codec)
+        if message is None:
+            if codec.endswith(DEFLATE_SUFFIX):
+                # Compress the shared uncompressed encoding, once for every client
+                message = compress(self.get(codec[:-len(DEFLATE_SUFFIX)]))
+            else:
+                message = encode(self.frame, codec)
+            self._encoded[codec] = message
+        return message
@@ -0,0 +1,224 @@
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+from game_logic.game_state import new_game_state
+from game_logic.simulation import SPEED_MULTIPLIERS
+
+# Most commands a client may batch in one WebSocket frame
+MAX_COMMANDS_PER_FRAME = 32
+
+# Sends a command's response back to whoever submitted it
+Reply = Callable[[Dict[str, Any]], None]
+
+
+class CommandError(ValueError):
+    """A command that failed validation; the message goes back to its sender"""
+
+
+def command_response(command: Dict[str, Any], success: bool = True, message: str = "") -> Dict[str, Any]:
+    """Response to a command, echoing its request_id so clients can match it"""
+    action = command.get("action", "unknown")
+    response = {
+        "response_type": "command_response",
+        "command": action if isinstance(action, str) else "unknown",
+        "success": success,
+        "message": message
+    }
+    if "request_id" in command:
+        response["request_id"] = command["request_id"]
+    return response
+
+
+class CommandHandler:
+    """
+    How one action is checked and applied.
+
+    validate runs when the command arrives and raises CommandError to reject
+    it. prepare runs next and may await slow work (database reads); whatever
+    it returns is passed to apply. apply runs in the tick loop, must not
+    await, and returns the message sent back to the client.
+    """
+
+    def __init__(self, action: str, apply: Callable, validate: Optional[Callable] = None,
+                 prepare: Optional[Callable] = None):
+        self.action = action
+        self.apply = apply
+        self.validate = validate
+        self.prepare = prepare
+
+
+class CommandRegistry:
+    """Handlers by action name, used instead of an if/elif chain"""
+
+    def __init__(self):
+        self._handlers: Dict[str, CommandHandler] = {}
+
+    def __contains__(self, action: Any) -> bool:
+        return isinstance(action, str) and action in self._handlers
+
+    @property
+    def actions(self) -> List[str]:
+        return list(self._handlers)
+
+    def get(self, action: Any) -> Optional[CommandHandler]:
+        return self._handlers.get(action) if action in self else None
+
+    def handler(self, action: str, validate: Optional[Callable] = None, prepare: Optional[Callable] = None):
+        """Decorator registering apply(room, command, payload) -> message for an action"""
+        def register(apply: Callable) -> Callable:
+            self._handlers[action] = CommandHandler(action, apply, validate, prepare)
+            return apply
+        return register
+
+
+class PendingCommand:
+    __slots__ = ("room", "command", "handler", "payload", "reply")
+
+    def __init__(self, room, command: Dict[str, Any], handler: CommandHandler, payload: Any, reply: Reply):
+        self.room = room
+        self.command = command
+        self.handler = handler
+        self.payload = payload
+        self.reply = reply
+
+
+class CommandQueue:
+    """
+    The single queue of validated commands for every room.
+
+    Sockets and the gateway command stream only submit; nothing touches a
+    room's state until the tick scheduler drains the queue, at the tick
+    boundary or at the next frame for paused rooms. Commands are applied in
+    the order they were queued, and a command never sees a half-finished
+    tick or another command's awaits.
+    """
+
+    def __init__(self, registry: CommandRegistry):
+        self.registry = registry
+        self._pending: Deque[PendingCommand] = deque()
+        # Called when the queue goes from empty to non-empty (set by the scheduler)
+        self.on_queued: Optional[Callable[[], None]] = None
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+    async def submit(self, room, command: Dict[str, Any], reply: Reply):
+        """
+        Validate and prepare a command, then queue it for the tick loop.
+        Rejected commands are answered right away; accepted ones when they
+        are applied.
+
+        Args:
+            room: Room the command applies to
+            command: Decoded command, {"action": ..., ...}
+            reply: Called with the command's response once it is applied or rejected
+        """
+        handler = self.registry.get(command.get("action"))
+        try:
+            if handler is None:
+                raise CommandError(f"Unknown action: {command.get('action')}")
+            if handler.validate:
+                handler.validate(command)
+            payload = await handler.prepare(command) if handler.prepare else None
+        except CommandError as e:
+            reply(command_response(command, False, str(e)))
+            return
+        except Exception as e:
+            print(f"Error preparing {handler.action}: {str(e)}")
+            reply(command_response(command, False, "Command failed"))
+            return
+
+        self._pending.append(PendingCommand(room, command, handler, payload, reply))
+        if len(self._pending) == 1 and self.on_queued:
+            self.on_queued()
+
+    def drain(self) -> List[Any]:
+        """
+        Apply every queued command in order and answer its sender.
+
+        Returns:
+            List: Rooms whose state the commands changed, each once
+        """
+        pending, self._pending = self._pending, deque()
+        changed = {}
+        for item in pending:
+            try:
+                message = item.handler.apply(item.room, item.command, item.payload)
+                response = command_response(item.command, True, message)
+            except CommandError as e:
+                response = command_response(item.command, False, str(e))
+            except Exception as e:
+                print(f"Error applying {item.handler.action} in room {item.room.id}: {str(e)}")
+                response = command_response(item.command, False, "Command failed")
+            changed[item.room.id] = item.room
+            try:
+                item.reply(response)
+            except Exception as e:
+                print(f"Error replying to {item.handler.action}: {str(e)}")
+        return list(changed.values())
+
+
+def create_registry(load_new_game_nations: Callable[[], Awaitable[Optional[List[Dict[str, Any]]]]]) -> CommandRegistry:
+    """
+    The game's commands.
+
+    Args:
+        load_new_game_nations: Coroutine function returning fresh nations for
+            new games, or None to keep the default ones
+    """
+    registry = CommandRegistry()
+
+    @registry.handler("pause")
+    def pause(room, command, payload) -> str:
+        room.state["paused"] = True
+        print(f"Game paused in room {room.id}")
+        return "Game paused"
+
+    @registry.handler("resume")
+    def resume(room, command, payload) -> str:
+        room.state["paused"] = False
+        print(f"Game resumed in room {room.id}")
+        return "Game resumed"
+
+    def validate_speed(command):
+        if command.get("speed", "normal") not in SPEED_MULTIPLIERS:
+            raise CommandError(f"Unknown speed: {command.get('speed')}")
+
+    @registry.handler("set_speed", validate=validate_speed)
+    def set_speed(room, command, payload) -> str:
+        room.state["speed"] = command.get("speed", "normal")
+        print(f"Game speed set to: {room.state['speed']} in room {room.id}")
+        return f"Game speed set to: {room.state['speed']}"
+
+    async def load_nations(command):
+        # Reload fresh nation data from database before the command is queued
+        try:
+            nations = await load_new_game_nations()
+            print(f"Reloaded {len(nations)} nations from database for new game")
+            return nations
+        except Exception as e:
+            print(f"Error loading nations from database: {str(e)}")
+            return None
+
+    @registry.handler("new_game", prepare=load_nations)
+    def new_game(room, command, fresh_nations) -> str:
+        state = new_game_state()
+        if fresh_nations is not None:
+            state["nations"] = fresh_nations
+        room.replace_state(state)
+        print(f"New game started in room {room.id}")
+        return "New game started with fresh data"
+
+    def validate_save(command):
+        if not command.get("gameState"):
+            raise CommandError("No game state provided")
+        if not isinstance(command["gameState"], dict):
+            raise CommandError("Game state must be an object")
+
+    @registry.handler("load_save", validate=validate_save)
+    def load_save(room, command, payload) -> str:
+        room.replace_state(command["gameState"])
+        print(f"Game state loaded from client save in room {room.id}")
+        return "Saved game loaded"
+
+    return registry
@@ -0,0 +1,283 @@
+import asyncio
+import json
+import uuid
+from collections import Counter, deque
+from typing import Deque, Dict, Any, List, Optional, Tuple
+from fastapi import WebSocket
+
+from realtime.codecs import JSON, EncodedFrame, Message, encode, negotiate
+from realtime.delta import StateDeltaEncoder, SNAPSHOT, apply_delta
+from realtime.metrics import broadcast_bytes, broadcast_payload_bytes, tick_phase
+from realtime.subscriptions import EVERYTHING, SUBSCRIBE, Interest, parse_names
+
+
+class ClientConnection:
+    """
+    A WebSocket client with its own bounded outbound queue and writer task.
+
+    Producers only enqueue; the writer task is the only place that awaits the
+    socket, so a slow client delays nobody but itself. When a client falls
+    behind, its queued state frames are dropped and replaced by a single
+    snapshot of the latest state, built when the writer gets to it.
+    """
+
+    def __init__(self, websocket: WebSocket, manager: "ConnectionManager", max_queued_frames: int,
+                 codec: str = JSON):
+        self.id = uuid.uuid4().hex
+        self.websocket = websocket
+        self.manager = manager
+        self.max_queued_frames = max_queued_frames
+        # Wire format negotiated in the handshake (see realtime/codecs.py)
+        self.codec = codec
+        # Nations and fields the client subscribed to (see realtime/subscriptions.py)
+        self.interest = EVERYTHING
+        self.queue: Deque[Tuple[bool, Message]] = deque()  # (is_state_frame, message)
+        self.needs_snapshot = False
+        self.dropped_frames = 0
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._writer())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def send(self, message: Dict[str, Any]):
+        """Queue a personal message (command responses); these are never dropped"""
+        self.queue.append((False, encode(message, self.codec)))
+        self._wakeup.set()
+
+    def send_state(self, frame: EncodedFrame):
+        """Queue a state frame, collapsing the backlog if the client fell behind"""
+        if self.needs_snapshot:
+            # A snapshot of the latest state is already on its way
+            return
+        if len(self.queue) >= self.max_queued_frames:
+            kept = deque(item for item in self.queue if not item[0])
+            self.dropped_frames += len(self.queue) - len(kept) + 1
+            self.queue = kept
+            self.request_snapshot()
+            return
+        self.queue.append((True, frame.get(self.codec)))
+        self._wakeup.set()
+
+    def request_snapshot(self):
+        """Send a full snapshot of the latest state ahead of any queued frames"""
+        self.needs_snapshot = True
+        self._wakeup.set()
+
+    async def _writer(self):
+        try:
+            while True:
+                if not self.queue and not self.needs_snapshot:
+                    self._wakeup.clear()
+                    await self._wakeup.wait()
+                    continue
+
+                if self.needs_snapshot:
+                    message = self.manager.snapshot_message(self.codec, self.interest)
+                    if message is None:
+                        # No state yet (relay waiting for its first snapshot)
+                        self._wakeup.clear()
+                        await self._wakeup.wait()
+                        continue
+                    self.needs_snapshot = False
+                else:
+                    message = self.queue.popleft()[1]
+
+                if isinstance(message, bytes):
+                    await self.websocket.send_bytes(message)
+                else:
+                    await self.websocket.send_text(message)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"WebSocket send error: {str(e)}")
+            self.manager.disconnect(self.websocket)
+
+
+# WebSocket connection manager
+class ConnectionManager:
+    # Outbound frames a client may have queued before its backlog is collapsed
+    MAX_QUEUED_FRAMES = 8
+
+    def __init__(self, state: Dict[str, Any], publisher=None, room_id: str = "default"):
+        self.state = state
+        self.room_id = room_id
+        self.active_connections: Dict[WebSocket, ClientConnection] = {}
+        self.encoder = StateDeltaEncoder()
+        # Optional sink that forwards every frame to other processes
+        self.publisher = publisher
+        # False while a relaying manager has not received its first snapshot
+        self.ready = True
+        self._snapshot: Optional[EncodedFrame] = None
+        # Snapshots cut down to a subscription, built on demand from _snapshot
+        self._filtered_snapshots: Dict[Interest, EncodedFrame] = {}
+        # Connections grouped by subscription, rebuilt when a client joins, leaves or resubscribes
+        self._groups: Optional[Dict[Interest, List[ClientConnection]]] = None
+
+    async def connect(self, websocket: WebSocket):
+        # The client offers wire formats as subprotocols; JSON is the fallback
+        codec, subprotocol = negotiate(websocket.scope.get("subprotocols", []))
+        await websocket.accept(subprotocol=subprotocol)
+        connection = ClientConnection(websocket, self, self.MAX_QUEUED_FRAMES, codec)
+        self.active_connections[websocket] = connection
+        self._groups = None
+        connection.start()
+        # Send a full snapshot of the current game state upon connection
+        connection.request_snapshot()
+
+    def disconnect(self, websocket: WebSocket):
+        connection = self.active_connections.pop(websocket, None)
+        if connection:
+            self._groups = None
+            connection.stop()
+
+    def send_personal_message(self, message: Dict[str, Any], websocket: WebSocket):
+        connection = self.active_connections.get(websocket)
+        if connection:
+            connection.send(message)
+
+    def send_snapshot(self, websocket: WebSocket):
+        connection = self.active_connections.get(websocket)
+        if connection:
+            connection.request_snapshot()
+
+    def get_connection(self, websocket: WebSocket) -> Optional[ClientConnection]:
+        return self.active_connections.get(websocket)
+
+    def subscribe(self, websocket: WebSocket, command: Dict[str, Any]) -> Optional[Interest]:
+        """
+        Apply a subscribe/unsubscribe message to a client and send it a
+        snapshot of its new view of the state.
+
+        Args:
+            websocket: The client's socket
+            command: {"action": "subscribe" | "unsubscribe", "nations": [...], "fields": [...]}
+
+        Returns:
+            Interest: The client's new subscription, or None if it is not connected
+
+        Raises:
+            CodecError: If nations or fields are not lists of strings
+        """
+        connection = self.active_connections.get(websocket)
+        if connection is None:
+            return None
+        nations, fields = parse_names(command.get("nations")), parse_names(command.get("fields"))
+        if command.get("action") == SUBSCRIBE:
+            connection.interest = connection.interest.subscribe(nations, fields)
+        else:
+            connection.interest = connection.interest.unsubscribe(
+                nations, fields,
+                all_nations=[nation.get("name") for nation in self.state.get("nations", [])],
+                all_fields=self.state.keys()
+            )
+        self._groups = None
+        # Frames queued under the old subscription are superseded by the snapshot
+        connection.queue = deque(item for item in connection.queue if not item[0])
+        connection.request_snapshot()
+        return connection.interest
+
+    def snapshot_message(self, codec: str = JSON, interest: Interest = EVERYTHING) -> Optional[Message]:
+        """Encoded snapshot of the current state, shared by every client with the same subscription"""
+        if not self.ready:
+            return None
+        if self._snapshot is None:
+            self._snapshot = EncodedFrame(self.encoder.snapshot(self.state))
+        if interest.everything:
+            return self._snapshot.get(codec)
+        filtered = self._filtered_snapshots.get(interest)
+        if filtered is None:
+            filtered = self._filtered_snapshots[interest] = EncodedFrame(interest.filter_frame(self._snapshot.frame))
+        return filtered.get(codec)
+
+    def _clear_snapshots(self, snapshot: Optional[EncodedFrame] = None):
+        self._snapshot = snapshot
+        self._filtered_snapshots = {}
+
+    def _frames_by_interest(self, frame: EncodedFrame) -> List[Tuple[EncodedFrame, List[ClientConnection]]]:
+        """The frame cut down once per distinct subscription, with the clients that get it"""
+        if self._groups is None:
+            groups: Dict[Interest, List[ClientConnection]] = {}
+            for connection in self.active_connections.values():
+                groups.setdefault(connection.interest, []).append(connection)
+            self._groups = groups
+        return [
+            (frame if interest.everything else EncodedFrame(interest.filter_frame(frame.frame)), connections)
+            for interest, connections in self._groups.items()
+        ]
+
+    def broadcast(self, frame: EncodedFrame):
+        for group_frame, connections in self._frames_by_interest(frame):
+            for connection in connections:
+                connection.send_state(group_frame)
+
+    def broadcast_game_state(self):
+        # Every caller mutates the state just before broadcasting
+        self._clear_snapshots()
+        if self.active_connections or self.publisher:
+            with tick_phase("serialization"):
+                # Only the fields that changed since the last frame are sent
+                delta = self.encoder.delta(self.state)
+                if not delta:
+                    return
+                # Encoded once per subscription and wire format in use, whatever the number of clients
+                frame = EncodedFrame(delta)
+                groups = self._frames_by_interest(frame)
+                for group_frame, connections in groups:
+                    for codec, clients in Counter(connection.codec for connection in connections).items():
+                        size = len(group_frame.get(codec))
+                        broadcast_payload_bytes.observe(size, codec)
+                        broadcast_bytes.inc(codec, amount=size * clients)
+
+            with tick_phase("broadcast"):
+                for group_frame, connections in groups:
+                    for connection in connections:
+                        connection.send_state(group_frame)
+                if self.publisher:
+                    self.publisher.publish(self.room_id, frame.get(JSON))
+
+    def publish_snapshot(self):
+        """Send a full snapshot to other processes so they can (re)build their mirror"""
+        if self.publisher:
+            self.publisher.publish(self.room_id, self.snapshot_message())
+
+    def relay(self, message: str) -> bool:
+        """
+        Fan out a frame encoded by another process's manager, keeping this
+        manager's state as a mirror so it can serve snapshots of its own.
+
+        Args:
+            message: Encoded snapshot or delta frame
+
+        Returns:
+            bool: False if a frame was missed and the mirror needs a snapshot
+        """
+        frame = json.loads(message)
+        if frame["response_type"] == SNAPSHOT:
+            self.state.clear()
+            self.state.update(frame["state"])
+            self.encoder.seq = frame["seq"]
+            self._clear_snapshots(EncodedFrame(frame, message))
+            if not self.ready:
+                # Mirror rebuilt: every client restarts from this snapshot
+                self.ready = True
+                for connection in self.active_connections.values():
+                    connection.request_snapshot()
+            return True
+
+        if not self.ready:
+            return True
+        if frame["seq"] != self.encoder.seq + 1:
+            self.ready = False
+            return False
+
+        apply_delta(self.state, frame)
+        self.encoder.seq = frame["seq"]
+        self._clear_snapshots()
+        self.broadcast(EncodedFrame(frame, message))
+        return True
@@ -0,0 +1,156 @@
+import copy
+import time
+from typing import Dict, List, Any, Optional
+
+# Message types of the state protocol
+SNAPSHOT = "state_snapshot"
+DELTA = "state_delta"
+
+
+class StateDeltaEncoder:
+    """
+    Produces sequence-numbered state frames for WebSocket clients.
+
+    A snapshot carries the whole game state; a delta carries only the
+    top-level fields that changed since the previous frame, plus per-nation
+    patches keyed by nation name. Patches hold absolute values, so a delta
+    can be applied to any snapshot taken at or after the previous sequence
+    number. Clients that see a gap in sequence numbers ask for a resync.
+    """
+
+    def __init__(self):
+        self.seq = 0
+        self._previous: Optional[Dict[str, Any]] = None
+        self._previous_nations: Dict[str, Dict[str, Any]] = {}
+        self._previous_names: List[str] = []
+
+    def snapshot(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Build a full snapshot frame at the current sequence number.
+
+        Args:
+            state: Game state dictionary
+
+        Returns:
+            Dict: Snapshot message
+        """
+        # The first snapshot becomes the base for the first delta
+        if self._previous is None:
+            names = [nation.get("name") for nation in state.get("nations", [])]
+            self._remember(state, state, names)
+
+        return {
+            "response_type": SNAPSHOT,
+            "seq": self.seq,
+            "ts": round(time.time(), 3),
+            "state": state
+        }
+
+    def delta(self, state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Diff the state against the previous frame and advance the sequence.
+
+        Args:
+            state: Game state dictionary
+
+        Returns:
+            Dict: Delta message, or None if nothing changed
+        """
+        previous = self._previous or {}
+        message: Dict[str, Any] = {}
+
+        # Top-level fields (date, speed, paused, alliances, events, ...)
+        changes = {
+            key: value for key, value in state.items()
+            if key != "nations" and (key not in previous or previous[key] != value)
+        }
+        removed = [key for key in previous if key not in state]
+
+        # Nations are patched field by field when the roster is unchanged
+        nations = state.get("nations", [])
+        names = [nation.get("name") for nation in nations]
+        if names == self._previous_names and len(self._previous_nations) == len(names):
+            patches = self._diff_nations(nations)
+            if patches is None:
+                changes["nations"] = nations
+            elif patches:
+                message["nations"] = patches
+        else:
+            changes["nations"] = nations
+
+        if changes:
+            message["changes"] = changes
+        if removed:
+            message["removed"] = removed
+
+        self._remember(state, changes, names)
+
+        if not message:
+            return None
+
+        self.seq += 1
+        message["response_type"] = DELTA
+        message["seq"] = self.seq
+        # Server time the frame was built, so clients can measure delivery latency
+        message["ts"] = round(time.time(), 3)
+        return message
+
+    def reset(self):
+        """Forget the previous frame so the next delta carries everything"""
+        self._previous = None
+        self._previous_nations = {}
+        self._previous_names = []
+
+    def _diff_nations(self, nations: List[Dict[str, Any]]) -> Optional[Dict[str, Dict[str, Any]]]:
+        """Per-nation patches, or None if a nation lost a field and must be resent whole"""
+        patches = {}
+        for nation in nations:
+            old = self._previous_nations[nation.get("name")]
+            if old is nation:
+                continue
+            if len(old) > len(nation) or any(key not in nation for key in old):
+                return None
+            patch = {key: value for key, value in nation.items() if old.get(key) != value}
+            if patch:
+                patches[nation.get("name")] = patch
+        return patches
+
+    def _remember(self, state: Dict[str, Any], changes: Dict[str, Any], names: List[str]):
+        """Keep the state just sent as the base for the next diff"""
+        # Nation dicts are replaced rather than mutated by the tick engine, so
+        # references are enough; other values are copied when they change so
+        # in-place edits (e.g. inserting into the events list) are detected.
+        previous = dict(self._previous or {})
+        for key in [key for key in previous if key not in state]:
+            del previous[key]
+        for key, value in changes.items():
+            if key != "nations":
+                previous[key] = copy.deepcopy(value)
+        self._previous = previous
+        self._previous_nations = {nation.get("name"): nation for nation in state.get("nations", [])}
+        self._previous_names = names
+
+
+def apply_delta(state: Dict[str, Any], message: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Apply a delta frame to a state in place (the server-side mirror of the
+    frontend's GameStateSync, used by processes relaying another's frames).
+
+    Args:
+        state: Game state dictionary to patch
+        message: Delta message produced by StateDeltaEncoder.delta
+
+    Returns:
+        Dict: The patched state
+    """
+    state.update(message.get("changes", {}))
+    for key in message.get("removed", []):
+        state.pop(key, None)
+
+    patches = message.get("nations")
+    if patches:
+        state["nations"] = [
+            {**nation, **patches[nation.get("name")]} if nation.get("name") in patches else nation
+            for nation in state.get("nations", [])
+        ]
+    return state
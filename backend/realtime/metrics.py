@@ -0,0 +1,202 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import event
+
+# Content type of the Prometheus text exposition format
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Histogram buckets (upper bounds) for durations in seconds and sizes in bytes
+DURATION_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+SIZE_BUCKETS = (64, 256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+Labels = Tuple[str, ...]
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Iterable[str], values: Iterable[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    """Monotonic counter, one value per label combination"""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels: str, amount: float = 1.0):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self._values.items()]
+
+
+class Gauge:
+    """
+    Value read when metrics are scraped, so keeping it current costs nothing:
+    the callback returns (label values, value) pairs.
+    """
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, callback: Callable[[], Iterable[Tuple[Labels, float]]],
+                 labels: Tuple[str, ...] = ()):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.callback = callback
+
+    def samples(self) -> List[str]:
+        return [f"{self.name}{_format_labels(self.labels, key)} {value}" for key, value in self.callback()]
+
+
+class Histogram:
+    """
+    Fixed-bucket histogram, one per label combination. Observing is a
+    bisect and two additions under an uncontended lock (observations also
+    come from the database threads).
+    """
+
+    kind = "histogram"
+
+    def __init__(self, name: str, help: str, labels: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.name = name
+        self.help = help
+        self.labels = labels
+        self.buckets = buckets
+        # Label values -> [count per bucket (plus +Inf), sum]
+        self._series: Dict[Labels, Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, *labels: str):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, *labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        for key, (counts, total) in list(self._series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                bucket_label = f'le="{le}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, bucket_label)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {total[0]}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Every metric of the process, rendered in the Prometheus text format"""
+
+    def __init__(self):
+        self.metrics: Dict[str, object] = {}
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self.metrics.values():
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+
+# Shared registry and the metrics updated from the hot paths
+registry = MetricsRegistry()
+
+tick_duration = registry.register(Histogram(
+    "geo_tick_duration_seconds", "Duration of a room tick"
+))
+tick_jitter = registry.register(Histogram(
+    "geo_tick_jitter_seconds", "How late a room tick started after its deadline"
+))
+tick_phase_duration = registry.register(Histogram(
+    "geo_tick_phase_duration_seconds",
+    "Duration of each tick phase (economy, events, serialization, broadcast)", ("phase",)
+))
+broadcast_payload_bytes = registry.register(Histogram(
+    "geo_broadcast_payload_bytes", "Size of each encoded broadcast frame, per wire format", ("codec",),
+    buckets=SIZE_BUCKETS
+))
+broadcast_bytes = registry.register(Counter(
+    "geo_broadcast_bytes_total", "Bytes of state frames queued to clients, per wire format", ("codec",)
+))
+commands = registry.register(Counter(
+    "geo_commands_total", "Client commands handled, per action", ("action",)
+))
+db_query_duration = registry.register(Histogram(
+    "geo_db_query_duration_seconds", "Latency of database queries"
+))
+
+# Called with (phase, wall seconds, CPU seconds) after every tick phase while
+# a profile is being recorded (see realtime/profiler.py); None otherwise
+phase_listener: Optional[Callable[[str, float, float], None]] = None
+
+
+@contextmanager
+def tick_phase(phase: str):
+    """Time one phase of a tick into the phase histogram (and the profiler, if recording)"""
+    listener = phase_listener
+    started = time.perf_counter()
+    cpu_started = time.thread_time() if listener else 0.0
+    try:
+        yield
+    finally:
+        wall = time.perf_counter() - started
+        tick_phase_duration.observe(wall, phase)
+        if listener:
+            listener(phase, wall, time.thread_time() - cpu_started)
+
+
+def instrument_engine(engine, histogram: Optional[Histogram] = None):
+    """Time every query run through a SQLAlchemy engine"""
+    histogram = histogram or db_query_duration
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after(conn, cursor, statement, parameters, context, executemany):
+        histogram.observe(time.perf_counter() - conn.info["query_started"].pop())
+
+    @event.listens_for(engine, "handle_error")
+    def _error(context):
+        # The failed query never reaches after_cursor_execute
+        started = context.connection.info.get("query_started") if context.connection else None
+        if started:
+            started.pop()
@@ -0,0 +1,148 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, defaultdict
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from realtime import metrics
+
+# Longest profile a single request may record, in seconds
+MAX_PROFILE_SECONDS = 60.0
+
+# Sampling interval bounds, in seconds
+MIN_SAMPLE_INTERVAL = 0.001
+DEFAULT_SAMPLE_INTERVAL = 0.005
+
+# Frames kept per sampled stack, innermost first
+MAX_STACK_DEPTH = 128
+
+
+def _frame_label(code) -> str:
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+class SamplingProfiler:
+    """
+    Statistical profiler for the event loop thread, recorded on demand for
+    a fixed window.
+
+    A background thread samples the loop thread's stack with
+    sys._current_frames() every interval and keeps the stacks that run
+    inside one of the target functions (the simulation task, the WebSocket
+    handlers), as folded stacks ready for flamegraph.pl or speedscope. While
+    recording, every tick phase also reports its wall and CPU time. When no
+    profile is being recorded there is no thread and the phase timers skip
+    the CPU clock, so the cost is one attribute check per phase.
+    """
+
+    def __init__(self, targets: Iterable[Callable]):
+        # Code objects of the functions whose stacks are kept
+        self.target_codes = {getattr(target, "__code__", None) for target in targets} - {None}
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._reset(0.0, DEFAULT_SAMPLE_INTERVAL)
+
+    def _reset(self, seconds: float, interval: float):
+        self.seconds = seconds
+        self.interval = interval
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self.other_samples = 0
+        # Phase -> [count, wall seconds, CPU seconds]
+        self.phases: Dict[str, List[float]] = defaultdict(lambda: [0, 0.0, 0.0])
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self, seconds: float, interval: float = DEFAULT_SAMPLE_INTERVAL):
+        """
+        Start recording a profile of the calling (event loop) thread.
+
+        Args:
+            seconds: Length of the window, capped at MAX_PROFILE_SECONDS
+            interval: Seconds between samples
+
+        Raises:
+            RuntimeError: If a profile is already being recorded
+        """
+        if self.running:
+            raise RuntimeError("A profile is already being recorded")
+        self._reset(min(max(seconds, 0.0), MAX_PROFILE_SECONDS), max(interval, MIN_SAMPLE_INTERVAL))
+        self._stop.clear()
+        self.started_at = time.time()
+        metrics.phase_listener = self._record_phase
+
+        self._thread = threading.Thread(
+            target=self._sample, args=(threading.get_ident(),), name="sampling-profiler", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _record_phase(self, phase: str, wall: float, cpu: float):
+        totals = self.phases[phase]
+        totals[0] += 1
+        totals[1] += wall
+        totals[2] += cpu
+
+    def _sample(self, thread_id: int):
+        deadline = time.monotonic() + self.seconds
+        try:
+            while not self._stop.wait(self.interval) and time.monotonic() < deadline:
+                frame = sys._current_frames().get(thread_id)
+                if frame is None:
+                    break
+                stack = self._stack(frame)
+                self.samples += 1
+                if stack is None:
+                    self.other_samples += 1
+                else:
+                    self.stacks[stack] += 1
+        finally:
+            metrics.phase_listener = None
+            self.finished_at = time.time()
+
+    def _stack(self, frame) -> Optional[Tuple[str, ...]]:
+        """Labels of a sampled stack from the outermost target down, or None if no target is on it"""
+        labels = []
+        in_target = False
+        while frame is not None and len(labels) < MAX_STACK_DEPTH:
+            labels.append(_frame_label(frame.f_code))
+            if frame.f_code in self.target_codes:
+                in_target = True
+                # Keep the outermost target as the root, dropping the event loop machinery above it
+                root = len(labels)
+            frame = frame.f_back
+        if not in_target:
+            return None
+        return tuple(reversed(labels[:root]))
+
+    def folded(self) -> str:
+        """Recorded stacks in the folded format: "root;child;leaf <samples>" per line"""
+        return "".join(f"{';'.join(stack)} {count}\n" for stack, count in self.stacks.most_common())
+
+    def report(self) -> Dict[str, Any]:
+        return {
+            "running": self.running,
+            "seconds": self.seconds,
+            "interval_ms": round(self.interval * 1000, 3),
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "samples": self.samples,
+            "samples_outside_targets": self.other_samples,
+            "distinct_stacks": len(self.stacks),
+            "phases": {
+                phase: {
+                    "count": count,
+                    "wall_ms": round(wall * 1000, 3),
+                    "cpu_ms": round(cpu * 1000, 3),
+                    "mean_wall_ms": round(wall * 1000 / count, 3) if count else 0.0
+                }
+                for phase, (count, wall, cpu) in list(self.phases.items())
+            }
+        }
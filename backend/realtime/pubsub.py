@@ -0,0 +1,272 @@
+import asyncio
+import json
+import time
+import uuid
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Set, Tuple
+
+# Redis channels carrying encoded state frames from the simulation process,
+# one per room ("game:frames:<room id>")
+FRAMES_CHANNEL_PREFIX = "game:frames:"
+
+# Redis stream carrying client commands to the simulation process
+COMMANDS_STREAM = "game:commands"
+
+# Per-gateway Redis channel carrying command responses back
+REPLIES_CHANNEL_PREFIX = "game:replies:"
+
+# Approximate cap on the command stream length
+COMMANDS_STREAM_MAXLEN = 10000
+
+# Stream command a gateway sends for each room its clients are watching, so
+# the simulation process does not evict the room as idle
+KEEPALIVE = "keepalive"
+
+# Published on a room's frames channel when the simulation process evicts it
+ROOM_CLOSED_MESSAGE = json.dumps({"response_type": "room_closed"})
+
+# Seconds to wait before retrying after a Redis error
+RETRY_DELAY = 1.0
+
+
+class FramePublisher:
+    """
+    Publishes encoded state frames from the simulation process to Redis.
+
+    publish() only enqueues, so the tick loop never waits on Redis. Frames
+    are published in order by a background task; if Redis falls too far
+    behind the backlog is dropped and replaced by one snapshot per room,
+    which subscribers use to rebuild their mirror.
+    """
+
+    # Frames queued before the backlog is collapsed into snapshots
+    MAX_QUEUED_FRAMES = 256
+
+    def __init__(self, redis, snapshot_source: Callable[[str], Optional[str]]):
+        self.redis = redis
+        self.snapshot_source = snapshot_source
+        self.queue: Deque[Tuple[str, str]] = deque()  # (room_id, message)
+        self.needs_snapshot: Set[str] = set()
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def publish(self, room_id: str, message: str):
+        if len(self.queue) >= self.MAX_QUEUED_FRAMES:
+            self.needs_snapshot.update(queued_room for queued_room, _ in self.queue)
+            self.needs_snapshot.add(room_id)
+            self.queue.clear()
+        elif room_id not in self.needs_snapshot:
+            self.queue.append((room_id, message))
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            if not self.queue and not self.needs_snapshot:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            if self.needs_snapshot:
+                room_id = self.needs_snapshot.pop()
+                message = self.snapshot_source(room_id)
+                if message is None:
+                    continue
+            else:
+                room_id, message = self.queue.popleft()
+
+            try:
+                await self.redis.publish(FRAMES_CHANNEL_PREFIX + room_id, message)
+            except Exception as e:
+                # Subscribers will notice the gap and ask for a resync
+                print(f"Error publishing frame: {str(e)}")
+                await asyncio.sleep(RETRY_DELAY)
+
+
+class CommandConsumer:
+    """
+    Reads client commands forwarded by gateway processes from the Redis
+    command stream and hands them to the simulation process, along with a
+    callback that routes the command's response back to its gateway.
+    """
+
+    def __init__(self, redis, handler: Callable[[str, Dict[str, Any], Callable], Awaitable[None]]):
+        self.redis = redis
+        self.handler = handler
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        # Only commands sent after startup are applied
+        last_id = "$"
+        while True:
+            try:
+                entries = await self.redis.xread({COMMANDS_STREAM: last_id}, block=5000, count=100)
+                for _, messages in entries or []:
+                    for message_id, fields in messages:
+                        last_id = message_id
+                        await self._handle(fields)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error reading command stream: {str(e)}")
+                await asyncio.sleep(RETRY_DELAY)
+
+    async def _handle(self, fields: Dict[bytes, bytes]):
+        try:
+            command = json.loads(fields[b"command"])
+            room_id = fields[b"room_id"].decode()
+        except (KeyError, json.JSONDecodeError):
+            print(f"Dropping malformed stream command: {fields}")
+            return
+
+        reply_to = fields.get(b"reply_to")
+        client_id = fields.get(b"client_id")
+
+        def reply(response: Dict[str, Any]):
+            # Route the response back to the gateway and client that sent the command
+            if reply_to and client_id:
+                message = json.dumps({"client_id": client_id.decode(), "response": response})
+                asyncio.create_task(self._publish_reply(reply_to.decode(), message))
+
+        await self.handler(room_id, command, reply)
+
+    async def _publish_reply(self, gateway_id: str, message: str):
+        try:
+            await self.redis.publish(REPLIES_CHANNEL_PREFIX + gateway_id, message)
+        except Exception as e:
+            print(f"Error publishing command response: {str(e)}")
+
+
+class GatewayRelay:
+    """
+    Runs in a stateless WebSocket worker: subscribes to the simulation's
+    frames and fans them out to this worker's clients through the local
+    room's ConnectionManager, and forwards client commands to the command
+    stream. Only rooms with local clients are mirrored.
+    """
+
+    # Seconds between resync requests while a room waits for a snapshot
+    RESYNC_INTERVAL = 2.0
+
+    # Seconds between keepalives for rooms with local clients
+    KEEPALIVE_INTERVAL = 30.0
+
+    def __init__(self, redis, rooms):
+        self.redis = redis
+        self.rooms = rooms
+        self.gateway_id = uuid.uuid4().hex
+        self.clients: Dict[str, Tuple[Any, Any]] = {}  # client id -> (manager, websocket)
+        self._tracked: Set[str] = set()
+        self._tasks = []
+
+    def start(self):
+        self._tasks = [
+            asyncio.create_task(self._subscribe()),
+            asyncio.create_task(self._keep_synced()),
+        ]
+
+    def track(self, room):
+        """Start mirroring a room; nothing is served until its first snapshot arrives"""
+        if room.id not in self._tracked:
+            self._tracked.add(room.id)
+            room.manager.ready = False
+            asyncio.create_task(self.request_resync(room.id))
+
+    def untrack(self, room):
+        self._tracked.discard(room.id)
+
+    def register(self, client_id: str, manager, websocket):
+        self.clients[client_id] = (manager, websocket)
+
+    def unregister(self, client_id: str):
+        self.clients.pop(client_id, None)
+
+    async def forward_command(self, room_id: str, command: Dict[str, Any], client_id: str):
+        """Append a client command to the simulation's command stream"""
+        await self.redis.xadd(
+            COMMANDS_STREAM,
+            {
+                "command": json.dumps(command),
+                "room_id": room_id,
+                "reply_to": self.gateway_id,
+                "client_id": client_id
+            },
+            maxlen=COMMANDS_STREAM_MAXLEN,
+            approximate=True
+        )
+
+    async def request_resync(self, room_id: str):
+        try:
+            await self.forward_command(room_id, {"action": "resync"}, "")
+        except Exception as e:
+            print(f"Error requesting resync for room {room_id}: {str(e)}")
+
+    async def _keep_synced(self):
+        last_keepalive = time.monotonic()
+        while True:
+            for room in list(self.rooms.rooms.values()):
+                if not room.manager.ready:
+                    await self.request_resync(room.id)
+
+            if time.monotonic() - last_keepalive >= self.KEEPALIVE_INTERVAL:
+                last_keepalive = time.monotonic()
+                for room in list(self.rooms.rooms.values()):
+                    if room.id in self._tracked and room.connection_count:
+                        try:
+                            await self.forward_command(room.id, {"action": KEEPALIVE}, "")
+                        except Exception as e:
+                            print(f"Error sending keepalive for room {room.id}: {str(e)}")
+            await asyncio.sleep(self.RESYNC_INTERVAL)
+
+    async def _room_closed(self, room):
+        """The simulation process evicted a room as idle"""
+        if room.connection_count:
+            # Clients joined since the last keepalive: the resync brings the room back
+            room.manager.ready = False
+            await self.request_resync(room.id)
+        else:
+            self.untrack(room)
+
+    async def _subscribe(self):
+        replies_channel = REPLIES_CHANNEL_PREFIX + self.gateway_id
+        while True:
+            pubsub = self.redis.pubsub()
+            try:
+                await pubsub.psubscribe(FRAMES_CHANNEL_PREFIX + "*")
+                await pubsub.subscribe(replies_channel)
+                async for message in pubsub.listen():
+                    if message["type"] not in ("message", "pmessage"):
+                        continue
+                    channel = message["channel"].decode()
+                    data = message["data"].decode()
+                    if channel == replies_channel:
+                        self._deliver_reply(data)
+                        continue
+
+                    room = self.rooms.get(channel[len(FRAMES_CHANNEL_PREFIX):])
+                    if room is not None and data == ROOM_CLOSED_MESSAGE:
+                        await self._room_closed(room)
+                    elif room is not None and not room.manager.relay(data):
+                        await self.request_resync(room.id)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Error in frame subscription: {str(e)}")
+                # Frames may have been missed while disconnected
+                for room in self.rooms.rooms.values():
+                    room.manager.ready = False
+                await asyncio.sleep(RETRY_DELAY)
+            finally:
+                await pubsub.close()
+
+    def _deliver_reply(self, data: str):
+        reply = json.loads(data)
+        client = self.clients.get(reply["client_id"])
+        if client is not None:
+            manager, websocket = client
+            manager.send_personal_message(reply["response"], websocket)
@@ -0,0 +1,169 @@
+import re
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from game_logic.relations import RelationshipIndex
+from game_logic.simulation import SimulationEngine, SPEED_MULTIPLIERS
+from realtime.connections import ConnectionManager
+from realtime.metrics import tick_phase
+
+# Room every client joins unless it asks for another one
+DEFAULT_ROOM = "default"
+
+# Allowed room identifiers
+ROOM_ID_PATTERN = re.compile(r"^[A-Za-z0-9_-]{1,64}$")
+
+
+class Room:
+    """
+    One independent game: its own state, tick engine, connections and speed.
+    """
+
+    def __init__(self, room_id: str, state: Dict[str, Any], publisher=None, event_log=None, state_cache=None):
+        self.id = room_id
+        self.state = state
+        self.engine = SimulationEngine()
+        self.manager = ConnectionManager(state, publisher=publisher, room_id=room_id)
+        # Alliances, treaties and sanctions in the state, rebuilt when it is replaced
+        self.relations = RelationshipIndex.from_world(state)
+        # Ticks run by this process
+        self.ticks = 0
+        # Optional sink persisting every generated event
+        self.event_log = event_log
+        # Optional shared cache of the latest state, written once per tick
+        self.state_cache = state_cache
+        # State changed outside a tick (commands) and not broadcast yet
+        self.dirty = False
+        # Monotonic time of the last connection, disconnection or command
+        self.last_active = time.monotonic()
+        # Set once the room is removed from its registry
+        self.closed = False
+
+    @property
+    def paused(self) -> bool:
+        return bool(self.state.get("paused", True))
+
+    @property
+    def multiplier(self) -> float:
+        return SPEED_MULTIPLIERS.get(self.state.get("speed"), 1.0)
+
+    @property
+    def period(self) -> float:
+        """Seconds between ticks at the room's current speed"""
+        return 1.0 / self.multiplier
+
+    @property
+    def connection_count(self) -> int:
+        return len(self.manager.active_connections)
+
+    def tick(self):
+        """Advance the room's game by one tick and broadcast the change"""
+        with tick_phase("economy"):
+            self.engine.advance_nations(self.state, self.multiplier)
+        with tick_phase("events"):
+            self.engine.advance_events(self.state, self.multiplier)
+        self.ticks += 1
+        if self.engine.last_event and self.event_log:
+            self.event_log.record(self.id, self.engine.last_event)
+        # The tick's frame also carries any changes commands made since the last one
+        self.dirty = False
+        self.manager.broadcast_game_state()
+        self.cache_state()
+
+    def flush(self):
+        """Broadcast changes made outside a tick, if the room has any"""
+        if self.dirty:
+            self.dirty = False
+            self.manager.broadcast_game_state()
+            self.cache_state()
+
+    def replace_state(self, state: Dict[str, Any]):
+        """
+        Swap in a whole new game state (new game, loaded save, restored
+        checkpoint), keeping the dict connections hold a reference to.
+
+        Args:
+            state: The new game state
+        """
+        # Index first, so a malformed state is rejected before anything changes
+        relations = RelationshipIndex.from_world(state)
+        self.state.clear()
+        self.state.update(state)
+        self.relations = relations
+        self.cache_state()
+
+    def touch(self):
+        """Record activity, which keeps the room from being evicted as idle"""
+        self.last_active = time.monotonic()
+
+    def cache_state(self):
+        """Hand the current state to the shared state cache, if there is one"""
+        if self.state_cache:
+            self.state_cache.record(self)
+
+
+class RoomRegistry:
+    """
+    All rooms hosted by this process, created on demand.
+    """
+
+    def __init__(self, default_state: Dict[str, Any], state_factory: Callable[[], Dict[str, Any]],
+                 publisher=None, max_rooms: int = 500, event_log=None, state_cache=None):
+        self.state_factory = state_factory
+        self.publisher = publisher
+        self.event_log = event_log
+        self.state_cache = state_cache
+        self.max_rooms = max_rooms
+        self.rooms: Dict[str, Room] = {
+            DEFAULT_ROOM: Room(DEFAULT_ROOM, default_state, publisher, event_log, state_cache)
+        }
+        # Replaces whatever an earlier process left in the cache
+        self.default.cache_state()
+
+    @property
+    def default(self) -> Room:
+        return self.rooms[DEFAULT_ROOM]
+
+    @staticmethod
+    def is_valid_id(room_id: str) -> bool:
+        return bool(room_id and ROOM_ID_PATTERN.match(room_id))
+
+    def get(self, room_id: str) -> Optional[Room]:
+        return self.rooms.get(room_id)
+
+    def get_or_create(self, room_id: str) -> Optional[Room]:
+        """
+        Get a room, creating it with a fresh game state if needed.
+
+        Returns:
+            Room: The room, or None if the id is invalid or the room limit is reached
+        """
+        room = self.rooms.get(room_id)
+        if room is not None:
+            return room
+        if not self.is_valid_id(room_id) or len(self.rooms) >= self.max_rooms:
+            return None
+
+        room = Room(room_id, self.state_factory(), self.publisher, self.event_log, self.state_cache)
+        self.rooms[room_id] = room
+        room.cache_state()
+        print(f"Created room {room_id} ({len(self.rooms)} rooms)")
+        return room
+
+    def remove(self, room_id: str) -> Optional[Room]:
+        """Drop a room; the default room is never removed"""
+        if room_id == DEFAULT_ROOM:
+            return None
+        room = self.rooms.pop(room_id, None)
+        if room is not None:
+            room.closed = True
+            print(f"Removed room {room_id} ({len(self.rooms)} rooms)")
+        return room
+
+    def idle(self, ttl: float) -> List[Room]:
+        """Rooms other than the default one with no connections and no activity for ttl seconds"""
+        cutoff = time.monotonic() - ttl
+        return [
+            room for room in self.rooms.values()
+            if room.id != DEFAULT_ROOM and not room.connection_count and room.last_active < cutoff
+        ]
@@ -0,0 +1,282 @@
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+from realtime.commands import CommandQueue
+from realtime.metrics import tick_duration, tick_jitter
+from realtime.rooms import Room
+
+# What to do when a room's tick starts after its next deadline has passed:
+# "catch_up" runs the missed ticks back to back (up to MAX_CATCH_UP_TICKS),
+# "skip" drops them and realigns to the next deadline on the grid,
+# "slow_down" restarts the grid from now, stretching game time
+MISSED_DEADLINE_POLICIES = ("catch_up", "skip", "slow_down")
+
+# Seconds a command's state change may wait for a frame, so every change in
+# the window goes out as one broadcast
+DEFAULT_FRAME_INTERVAL = 0.1
+
+
+class TickScheduler:
+    """
+    Fixed-timestep scheduler ticking every active room from a single task.
+
+    Rooms sit in a min-heap keyed by absolute deadlines on the monotonic
+    clock. A room's next deadline is its previous deadline plus its period,
+    not "now plus period", so tick and broadcast time do not accumulate as
+    drift. Paused rooms are not in the heap at all, so they cost nothing
+    until update() is called after they are resumed.
+
+    State changed between ticks (by commands) is not broadcast right away:
+    mark_dirty() flags the room and the run loop broadcasts every dirty room
+    once, at most one frame interval later. A room that ticks first sends
+    the change with its tick frame instead.
+
+    Queued commands are applied here too, in one batch: right before any
+    room's tick and at each frame, so they land between ticks whether or
+    not their room is running.
+    """
+
+    # Ticks a room may run back to back under "catch_up" before skipping ahead
+    MAX_CATCH_UP_TICKS = 5
+
+    # Number of recent ticks kept for jitter and duration percentiles
+    STATS_WINDOW = 1000
+
+    def __init__(self, policy: str = "catch_up", frame_interval: float = DEFAULT_FRAME_INTERVAL,
+                 commands: Optional[CommandQueue] = None):
+        if policy not in MISSED_DEADLINE_POLICIES:
+            raise ValueError(f"Unknown missed deadline policy: {policy}")
+        self.policy = policy
+        self.frame_interval = max(frame_interval, 0.0)
+        self._heap: List[Tuple[float, int, Room]] = []
+        self._tokens = itertools.count()
+        # Room id -> token of its live heap entry; older entries are stale
+        self._scheduled: Dict[str, int] = {}
+        # Room id -> ticks run back to back while catching up
+        self._behind: Dict[str, int] = {}
+        self._wakeup = asyncio.Event()
+        # Rooms with changes waiting for the next frame, and when that frame goes out
+        self._dirty: Dict[str, Room] = {}
+        self._flush_at: Optional[float] = None
+        # Commands waiting for the next tick or frame
+        self.commands = commands
+        if commands is not None:
+            commands.on_queued = self._request_frame
+
+        # Tick metrics
+        self.ticks = 0
+        self.overruns = 0
+        self.missed_deadlines = 0
+        self._jitter: Deque[float] = deque(maxlen=self.STATS_WINDOW)
+        self._durations: Deque[float] = deque(maxlen=self.STATS_WINDOW)
+        self.dirty_marks = 0
+        self.flushes = 0
+        self.commands_applied = 0
+
+    @property
+    def active_rooms(self) -> int:
+        return len(self._scheduled)
+
+    def update(self, room: Room):
+        """Schedule a room that should be ticking, or drop one that is paused or closed"""
+        if room.paused or room.closed:
+            self._scheduled.pop(room.id, None)
+            self._behind.pop(room.id, None)
+        elif room.id not in self._scheduled:
+            self._push(room, time.monotonic() + room.period)
+
+    def remove(self, room: Room):
+        self._scheduled.pop(room.id, None)
+        self._behind.pop(room.id, None)
+
+    def mark_dirty(self, room: Room):
+        """Broadcast a room's state change with the next frame instead of right away"""
+        room.dirty = True
+        self.dirty_marks += 1
+        self._dirty[room.id] = room
+        self._request_frame()
+
+    def _request_frame(self):
+        if self._flush_at is None:
+            self._flush_at = time.monotonic() + self.frame_interval
+            self._wakeup.set()
+
+    def _apply_commands(self):
+        """Apply the queued commands, then reschedule and mark dirty the rooms they changed"""
+        self.commands_applied += len(self.commands)
+        for room in self.commands.drain():
+            # Paused rooms leave the scheduler; resumed ones rejoin it
+            self.update(room)
+            self.mark_dirty(room)
+
+    def _flush_dirty(self):
+        dirty, self._dirty, self._flush_at = self._dirty, {}, None
+        for room in dirty.values():
+            if room.dirty:
+                self.flushes += 1
+            try:
+                room.flush()
+            except Exception as e:
+                print(f"Error broadcasting state for room {room.id}: {str(e)}")
+
+    def _push(self, room: Room, deadline: float):
+        token = next(self._tokens)
+        self._scheduled[room.id] = token
+        heapq.heappush(self._heap, (deadline, token, room))
+        # Wake the run loop in case this deadline is earlier than the one it sleeps on
+        self._wakeup.set()
+
+    def _next_deadline(self, room: Room, deadline: float, now: float) -> float:
+        """Deadline after `deadline`, applying the missed deadline policy if we are late"""
+        period = room.period
+        next_deadline = deadline + period
+        if next_deadline > now:
+            self._behind.pop(room.id, None)
+            return next_deadline
+
+        missed = math.floor((now - next_deadline) / period) + 1
+        if self.policy == "catch_up":
+            behind = self._behind.get(room.id, 0) + 1
+            if behind <= self.MAX_CATCH_UP_TICKS:
+                self._behind[room.id] = behind
+                return next_deadline
+            # Too far behind to ever catch up: fall back to skipping
+            self._behind.pop(room.id, None)
+
+        self.missed_deadlines += missed
+        if self.policy == "slow_down":
+            return now + period
+        return next_deadline + missed * period
+
+    async def run(self):
+        while True:
+            now = time.monotonic()
+            if self._flush_at is not None and now >= self._flush_at:
+                if self.commands:
+                    self._apply_commands()
+                self._flush_dirty()
+                await asyncio.sleep(0)
+                continue
+
+            if self._heap and self._scheduled.get(self._heap[0][2].id) != self._heap[0][1]:
+                # Room was paused or removed since this entry was pushed
+                heapq.heappop(self._heap)
+                continue
+
+            if not self._heap and self._flush_at is None:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            # Sleep until the next tick or the next frame of command changes, whichever is first
+            wake_at = min(self._heap[0][0] if self._heap else math.inf,
+                          self._flush_at if self._flush_at is not None else math.inf)
+            delay = wake_at - now
+            if delay > 0:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), delay)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            if self.commands:
+                # A tick is due: queued commands go first, then the heap is checked again
+                # since they may have paused or resumed rooms
+                self._apply_commands()
+                continue
+
+            deadline, token, room = heapq.heappop(self._heap)
+            del self._scheduled[room.id]
+
+            started = time.monotonic()
+            try:
+                room.tick()
+            except Exception as e:
+                print(f"Error in game simulation for room {room.id}: {str(e)}")
+            finished = time.monotonic()
+
+            self.ticks += 1
+            tick_duration.observe(finished - started)
+            tick_jitter.observe(started - deadline)
+            self._jitter.append(started - deadline)
+            self._durations.append(finished - started)
+            if finished - started > room.period:
+                self.overruns += 1
+
+            if room.paused:
+                self._behind.pop(room.id, None)
+            else:
+                self._push(room, self._next_deadline(room, deadline, finished))
+
+            # Let sockets and commands run between ticks even when every room is late
+            await asyncio.sleep(0)
+
+    def stats(self) -> Dict[str, Any]:
+        """Tick counters plus jitter (start minus deadline) and duration percentiles in ms"""
+        return {
+            "policy": self.policy,
+            "active_rooms": self.active_rooms,
+            "ticks": self.ticks,
+            "overruns": self.overruns,
+            "missed_deadlines": self.missed_deadlines,
+            "frame_interval_ms": round(self.frame_interval * 1000, 3),
+            "dirty_marks": self.dirty_marks,
+            "command_flushes": self.flushes,
+            "commands_applied": self.commands_applied,
+            "jitter_ms": _percentiles(self._jitter),
+            "tick_duration_ms": _percentiles(self._durations)
+        }
+
+
+class LoopLagMonitor:
+    """
+    Measures event loop lag: how late a short sleep wakes up compared to
+    when it asked to. Anything blocking the loop (a synchronous database
+    call, a slow tick) shows up directly as lag.
+    """
+
+    # Seconds between probes
+    INTERVAL = 0.1
+
+    def __init__(self, interval: float = INTERVAL):
+        self.interval = interval
+        self.max_lag = 0.0
+        self._lag: Deque[float] = deque(maxlen=TickScheduler.STATS_WINDOW)
+        self._task = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            expected = time.monotonic() + self.interval
+            await asyncio.sleep(self.interval)
+            lag = max(0.0, time.monotonic() - expected)
+            self._lag.append(lag)
+            self.max_lag = max(self.max_lag, lag)
+
+    def stats(self) -> Dict[str, Any]:
+        """Lag percentiles over recent probes, plus the worst lag seen, in ms"""
+        return {
+            "lag_ms": _percentiles(self._lag),
+            "max_lag_ms": round(self.max_lag * 1000, 3)
+        }
+
+
+def _percentiles(samples: Deque[float]) -> Dict[str, float]:
+    if not samples:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "p50": round(ordered[int(last * 0.50)] * 1000, 3),
+        "p95": round(ordered[int(last * 0.95)] * 1000, 3),
+        "p99": round(ordered[int(last * 0.99)] * 1000, 3),
+        "max": round(ordered[last] * 1000, 3)
+    }
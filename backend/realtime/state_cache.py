@@ -0,0 +1,157 @@
+import asyncio
+import json
+import time
+from typing import Any, Dict, Optional
+
+from game_logic.game_state import global_tension
+
+# Redis hash holding a room's hot state ("game:state:<room id>"): the
+# encoded state, the tick number, the game date and derived aggregates
+STATE_KEY_PREFIX = "game:state:"
+
+SNAPSHOT_FIELD = "snapshot"
+TICK_FIELD = "tick"
+DATE_FIELD = "date"
+TENSION_FIELD = "global_tension"
+UPDATED_FIELD = "updated_at"
+
+# Seconds to stop talking to Redis after an error
+RETRY_DELAY = 5.0
+
+
+def _encode(state: Dict[str, Any], tick: int) -> Dict[str, Any]:
+    return {
+        SNAPSHOT_FIELD: json.dumps(state),
+        TICK_FIELD: tick,
+        DATE_FIELD: state.get("date", ""),
+        TENSION_FIELD: global_tension(state),
+        UPDATED_FIELD: time.time()
+    }
+
+
+class StateCache:
+    """
+    Latest state of every room kept in Redis, so HTTP readers (and gateway
+    processes, which run no simulation) can be served without touching the
+    simulation.
+
+    record() only notes which rooms changed. A background task encodes their
+    state off the event loop and writes every changed room in one pipelined
+    round trip, so each room costs at most one write per tick. When Redis is
+    unavailable the cache stops writing for RETRY_DELAY seconds, keeping the
+    latest state of each room for when it is back, and readers get None, so
+    callers fall back to the in-process state.
+    """
+
+    def __init__(self, redis, ttl: float = 60.0):
+        self.redis = redis
+        # Entries of rooms that stop changing (paused, closed) expire after ttl seconds
+        self.ttl = ttl
+        # Room id -> (shallow copy of the state, tick number) waiting to be written
+        self._pending: Dict[str, Any] = {}
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+        self._retry_at = 0.0
+
+        # Cache metrics
+        self.writes = 0
+        self.flushes = 0
+        self.errors = 0
+        self.skipped = 0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._retry_at
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    def record(self, room):
+        """Note that a room's state changed; only its latest state is written"""
+        # The tick replaces the nations and events lists rather than mutating
+        # them, so a shallow copy is a consistent view to encode later
+        self._pending[room.id] = (dict(room.state), room.ticks)
+        self._wakeup.set()
+
+    async def _run(self):
+        while True:
+            # Only wait when nothing is pending: rooms recorded during a flush go out with the next one
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            if not self.available:
+                await asyncio.sleep(self._retry_at - time.monotonic())
+                continue
+            await self.flush()
+
+    async def flush(self):
+        if not self._pending or not self.available:
+            return
+        pending, self._pending = self._pending, {}
+
+        entries = await asyncio.to_thread(
+            lambda: {room_id: _encode(state, tick) for room_id, (state, tick) in pending.items()}
+        )
+        try:
+            async with self.redis.pipeline(transaction=False) as pipe:
+                for room_id, fields in entries.items():
+                    key = STATE_KEY_PREFIX + room_id
+                    pipe.hset(key, mapping=fields)
+                    if self.ttl > 0:
+                        pipe.expire(key, int(self.ttl))
+                await pipe.execute()
+        except Exception as e:
+            self._failed(e)
+            # Retried once Redis is back, unless the room was recorded again meanwhile
+            for room_id, item in pending.items():
+                self._pending.setdefault(room_id, item)
+            self.skipped += len(pending)
+            return
+        self.writes += len(entries)
+        self.flushes += 1
+
+    def _failed(self, error: Exception):
+        self.errors += 1
+        if self.available:
+            print(f"State cache unavailable, retrying in {RETRY_DELAY}s: {str(error)}")
+        self._retry_at = time.monotonic() + RETRY_DELAY
+
+    async def snapshot(self, room_id: str) -> Optional[bytes]:
+        """Encoded state of a room, or None if it is not cached or Redis is unavailable"""
+        if not self.available:
+            return None
+        try:
+            return await self.redis.hget(STATE_KEY_PREFIX + room_id, SNAPSHOT_FIELD)
+        except Exception as e:
+            self._failed(e)
+            return None
+
+    async def summary(self, room_id: str) -> Optional[Dict[str, Any]]:
+        """Tick number, date and aggregates of a room, without the state itself"""
+        if not self.available:
+            return None
+        try:
+            tick, date, tension, updated = await self.redis.hmget(
+                STATE_KEY_PREFIX + room_id, TICK_FIELD, DATE_FIELD, TENSION_FIELD, UPDATED_FIELD
+            )
+        except Exception as e:
+            self._failed(e)
+            return None
+        if tick is None:
+            return None
+        return {
+            "tick": int(tick),
+            "date": date.decode(),
+            "global_tension": float(tension),
+            "updated_at": float(updated)
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "available": self.available,
+            "pending": len(self._pending),
+            "writes": self.writes,
+            "flushes": self.flushes,
+            "errors": self.errors,
+            "skipped": self.skipped
+        }
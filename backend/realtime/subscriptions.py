@@ -0,0 +1,125 @@
+from typing import Any, Dict, Iterable, List, Optional, FrozenSet
+
+from realtime.codecs import CodecError
+from realtime.delta import SNAPSHOT
+
+# Top-level fields every client gets whatever it subscribed to, so its clock
+# and pause/speed controls keep working
+ALWAYS_SENT_FIELDS = frozenset({"date", "speed", "paused"})
+
+# Protocol messages that change a client's subscription (handled per connection)
+SUBSCRIBE = "subscribe"
+UNSUBSCRIBE = "unsubscribe"
+
+
+def parse_names(value: Any) -> Optional[List[str]]:
+    """Validate the "nations" or "fields" of a subscription message (a list of strings, or absent)"""
+    if value is None:
+        return None
+    if not isinstance(value, list) or not all(isinstance(name, str) for name in value):
+        raise CodecError("Subscription nations and fields must be lists of strings")
+    return value
+
+
+class Interest:
+    """
+    The part of the game state a client wants: a set of nation names and a
+    set of top-level fields, where None means everything. Immutable and
+    hashable, so clients with the same interest can share one frame.
+    """
+
+    __slots__ = ("nations", "fields")
+
+    def __init__(self, nations: Optional[Iterable[str]] = None, fields: Optional[Iterable[str]] = None):
+        self.nations: Optional[FrozenSet[str]] = frozenset(nations) if nations is not None else None
+        self.fields: Optional[FrozenSet[str]] = frozenset(fields) if fields is not None else None
+
+    @property
+    def everything(self) -> bool:
+        return self.nations is None and self.fields is None
+
+    def _key(self):
+        return self.nations, self.fields
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, Interest) and self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def subscribe(self, nations: Optional[List[str]] = None, fields: Optional[List[str]] = None) -> "Interest":
+        """
+        Narrow "everything" down to, or widen a subscription with, the given
+        nations and fields. Naming nations implies the "nations" field.
+        """
+        new_nations, new_fields = self.nations, self.fields
+        if nations is not None:
+            new_nations = (self.nations or frozenset()) | frozenset(nations)
+            if new_fields is not None:
+                new_fields = new_fields | {"nations"}
+        if fields is not None:
+            new_fields = (self.fields or frozenset()) | frozenset(fields)
+            if new_nations is not None:
+                new_fields = new_fields | {"nations"}
+        return Interest(new_nations, new_fields)
+
+    def unsubscribe(self, nations: Optional[List[str]] = None, fields: Optional[List[str]] = None,
+                    all_nations: Iterable[str] = (), all_fields: Iterable[str] = ()) -> "Interest":
+        """
+        Drop nations and fields from the subscription; with neither given,
+        go back to receiving everything. all_nations and all_fields are what
+        "everything" currently means, used when unsubscribing from it.
+        """
+        if nations is None and fields is None:
+            return Interest()
+        new_nations, new_fields = self.nations, self.fields
+        if nations is not None:
+            new_nations = (self.nations if self.nations is not None else frozenset(all_nations)) - set(nations)
+        if fields is not None:
+            new_fields = (self.fields if self.fields is not None else frozenset(all_fields)) - set(fields)
+        return Interest(new_nations, new_fields)
+
+    def describe(self) -> Dict[str, Optional[List[str]]]:
+        return {
+            "nations": sorted(self.nations) if self.nations is not None else None,
+            "fields": sorted(self.fields) if self.fields is not None else None
+        }
+
+    def _wants_field(self, field: str) -> bool:
+        return self.fields is None or field in self.fields or field in ALWAYS_SENT_FIELDS
+
+    def _filter_state(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        filtered = {key: value for key, value in state.items() if self._wants_field(key)}
+        if "nations" in filtered and self.nations is not None:
+            filtered["nations"] = [nation for nation in filtered["nations"] if nation.get("name") in self.nations]
+        return filtered
+
+    def filter_frame(self, frame: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        The part of a snapshot or delta frame this interest covers. Deltas
+        keep their sequence number even when nothing in them is of interest,
+        so the client's sequence stays contiguous.
+        """
+        if self.everything:
+            return frame
+        if frame["response_type"] == SNAPSHOT:
+            return dict(frame, state=self._filter_state(frame["state"]))
+
+        filtered = {key: value for key, value in frame.items() if key not in ("changes", "removed", "nations")}
+        changes = self._filter_state(frame.get("changes", {}))
+        if changes:
+            filtered["changes"] = changes
+        removed = [key for key in frame.get("removed", []) if self._wants_field(key)]
+        if removed:
+            filtered["removed"] = removed
+        patches = frame.get("nations")
+        if patches and self._wants_field("nations"):
+            if self.nations is not None:
+                patches = {name: patch for name, patch in patches.items() if name in self.nations}
+            if patches:
+                filtered["nations"] = patches
+        return filtered
+
+
+# Clients that did not subscribe to anything
+EVERYTHING = Interest()
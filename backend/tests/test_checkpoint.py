@@ -0,0 +1,132 @@
+import asyncio
+import json
+
+import fakeredis
+
+from database.checkpoint import CHECKPOINT_KEY_PREFIX, CHECKPOINT_ROOMS_KEY, NATION_FIELD_PREFIX, Checkpointer
+from game_logic.game_state import new_game_state
+from realtime.rooms import RoomRegistry
+
+KEY = CHECKPOINT_KEY_PREFIX + "r"
+
+
+def _checkpointer(redis=None, idle_ttl: float = 3600):
+    redis = redis if redis is not None else fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+    rooms = RoomRegistry(new_game_state(), new_game_state)
+    return Checkpointer(redis, rooms, idle_ttl=idle_ttl)
+
+
+def _grow(state, index: int, gdp: float):
+    """Change one nation the way a tick does: a new list holding a new dict"""
+    nations = list(state["nations"])
+    nations[index] = dict(nations[index], gdp=gdp)
+    state["nations"] = nations
+
+
+def test_only_changed_fields_are_written():
+    async def scenario():
+        checkpointer = _checkpointer()
+        state = new_game_state()
+        nations = len(state["nations"])
+
+        await checkpointer.checkpoint("r", state)
+        assert checkpointer.fields_written == nations + 2
+
+        # Nothing changed: no write at all
+        await checkpointer.checkpoint("r", state)
+        assert checkpointer.checkpoints == 1
+
+        _grow(state, 2, 4100.0)
+        state["date"] = "January 21, 2025"
+        await checkpointer.checkpoint("r", state)
+        assert checkpointer.checkpoints == 2
+        assert checkpointer.fields_written == nations + 2 + 2
+
+        stored = json.loads(await checkpointer.redis.hget(KEY, NATION_FIELD_PREFIX + "Russia"))
+        assert stored["gdp"] == 4100.0
+
+    asyncio.run(scenario())
+
+
+def test_removed_nations_are_deleted_from_the_hash():
+    async def scenario():
+        checkpointer = _checkpointer()
+        state = new_game_state()
+        await checkpointer.checkpoint("r", state)
+
+        state["nations"] = [nation for nation in state["nations"] if nation["name"] != "Poland"]
+        await checkpointer.checkpoint("r", state)
+
+        assert not await checkpointer.redis.hexists(KEY, NATION_FIELD_PREFIX + "Poland")
+        loaded, _ = await checkpointer.load("r")
+        assert loaded == state
+
+    asyncio.run(scenario())
+
+
+def test_restore_brings_back_state_and_skips_unchanged_fields():
+    async def scenario():
+        writer = _checkpointer()
+        state = new_game_state()
+        _grow(state, 0, 26000.0)
+        state["treaties"] = [{"id": "t", "type": "trade", "participants": ["China", "India"]}]
+        await writer.checkpoint("r", state)
+
+        # A new process with the same Redis
+        reader = _checkpointer(writer.redis)
+        room = await reader.restore("r")
+
+        assert room.state == state
+        assert room.relations.trade_partners("China") == {"India"}
+        await reader.checkpoint("r", room.state)
+        assert reader.checkpoints == 0
+
+    asyncio.run(scenario())
+
+
+def test_released_room_checkpoint_expires_and_is_kept_once_rejoined():
+    async def scenario():
+        checkpointer = _checkpointer(idle_ttl=3600)
+        room = checkpointer.rooms.get_or_create("r")
+        checkpointer.rooms.remove("r")
+
+        await checkpointer.release("r", room.state)
+
+        assert 0 < await checkpointer.redis.ttl(KEY) <= 3600
+        assert "r" not in checkpointer._written
+
+        await checkpointer.restore("r")
+
+        assert await checkpointer.redis.ttl(KEY) == -1
+
+    asyncio.run(scenario())
+
+
+def test_release_keeps_checkpoint_forever_without_idle_ttl_or_while_hosted():
+    async def scenario():
+        forever = _checkpointer(idle_ttl=0)
+        await forever.release("r", new_game_state())
+        assert await forever.redis.ttl(KEY) == -1
+
+        # Rejoined while the final checkpoint was written: still hosted, no expiry
+        hosted = _checkpointer(idle_ttl=3600)
+        room = hosted.rooms.get_or_create("r")
+        await hosted.release("r", room.state)
+        assert await hosted.redis.ttl(KEY) == -1
+        assert "r" in hosted._written
+
+    asyncio.run(scenario())
+
+
+def test_restore_all_forgets_expired_checkpoints():
+    async def scenario():
+        checkpointer = _checkpointer()
+        await checkpointer.checkpoint("kept", new_game_state())
+        await checkpointer.redis.sadd(CHECKPOINT_ROOMS_KEY, "expired")
+
+        restored = await _checkpointer(checkpointer.redis).restore_all()
+
+        assert restored == ["kept"]
+        assert await checkpointer.redis.smembers(CHECKPOINT_ROOMS_KEY) == {b"kept"}
+
+    asyncio.run(scenario())
@@ -0,0 +1,80 @@
+import json
+import os
+import re
+import zlib
+
+import msgpack
+import pytest
+
+from game_logic.game_state import new_game_state
+from realtime.codecs import (
+    COMPRESSION_THRESHOLD, DEFLATE_SUFFIX, FLAG_DEFLATE, FLAG_PLAIN, JSON, MSGPACK, SUBPROTOCOLS,
+    EncodedFrame, compression_dictionary, encode, negotiate
+)
+
+WEBSOCKET_JS = os.path.join(os.path.dirname(__file__), "..", "..", "frontend", "src", "services", "websocket.js")
+
+
+def _inflate(message: bytes) -> bytes:
+    """What the browser does: strip the flag byte, inflate raw deflate with the shared dictionary"""
+    flag, payload = message[:1], message[1:]
+    if flag == FLAG_PLAIN:
+        return payload
+    assert flag == FLAG_DEFLATE
+    decompressor = zlib.decompressobj(-15, zdict=compression_dictionary())
+    return decompressor.decompress(payload) + decompressor.flush()
+
+
+def _snapshot():
+    return {"response_type": "state_snapshot", "seq": 3, "state": new_game_state()}
+
+
+@pytest.mark.parametrize("codec,load", [
+    (JSON + DEFLATE_SUFFIX, lambda raw: json.loads(raw.decode("utf-8"))),
+    (MSGPACK + DEFLATE_SUFFIX, lambda raw: msgpack.unpackb(raw, raw=False))
+])
+def test_deflate_formats_round_trip_through_the_shared_dictionary(codec, load):
+    frame = _snapshot()
+
+    message = encode(frame, codec)
+
+    assert message[:1] == FLAG_DEFLATE
+    assert len(message) < len(encode(frame, codec[:-len(DEFLATE_SUFFIX)]))
+    assert load(_inflate(message)) == frame
+    # Clients sharing a frame get the same bytes
+    assert EncodedFrame(frame).get(codec) == message
+
+
+@pytest.mark.parametrize("codec", [JSON + DEFLATE_SUFFIX, MSGPACK + DEFLATE_SUFFIX])
+def test_small_frames_are_sent_plain(codec):
+    frame = {"response_type": "state_delta", "seq": 4, "changes": {"paused": False}}
+
+    message = encode(frame, codec)
+
+    assert len(message) <= COMPRESSION_THRESHOLD
+    assert message[:1] == FLAG_PLAIN
+    assert _inflate(message) == message[1:]
+
+
+def _frontend_constants():
+    with open(WEBSOCKET_JS, encoding="utf-8") as f:
+        source = f.read()
+    constants = dict(re.findall(r'(?:export )?const (\w+) = "([^"]*)";', source))
+    flag_deflate = int(re.search(r"const FLAG_DEFLATE = (\d+);", source).group(1))
+    return constants, flag_deflate
+
+
+def test_frontend_offers_only_subprotocols_the_server_negotiates():
+    constants, flag_deflate = _frontend_constants()
+    json_protocol, msgpack_protocol = constants["JSON_PROTOCOL"], constants["MSGPACK_PROTOCOL"]
+    # subprotocolsFor(dictionary): compressed MessagePack first, then the plain formats
+    offered = [msgpack_protocol + constants["DEFLATE_SUFFIX"], msgpack_protocol, json_protocol]
+
+    assert constants["DEFLATE_SUFFIX"] == DEFLATE_SUFFIX
+    assert bytes([flag_deflate]) == FLAG_DEFLATE
+    assert SUBPROTOCOLS[json_protocol] == JSON
+    assert SUBPROTOCOLS[msgpack_protocol] == MSGPACK
+    assert all(protocol in SUBPROTOCOLS for protocol in offered)
+    assert negotiate(offered) == (MSGPACK + DEFLATE_SUFFIX, offered[0])
+    assert negotiate(offered[1:]) == (MSGPACK, msgpack_protocol)
+    assert negotiate([]) == (JSON, None)
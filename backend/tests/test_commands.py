@@ -0,0 +1,180 @@
+import asyncio
+
+import pytest
+
+from game_logic.game_state import new_game_state
+from realtime.commands import CommandError, CommandQueue, CommandRegistry, create_registry
+from realtime.rooms import Room
+from realtime.scheduler import TickScheduler
+
+
+async def _no_nations():
+    return None
+
+
+def _room(room_id="r", **state):
+    return Room(room_id, dict(new_game_state(), **state))
+
+
+def _queue(load_nations=_no_nations):
+    return CommandQueue(create_registry(load_nations))
+
+
+def _submit(queue, room, command):
+    """Submit one command; returns the list its responses are appended to"""
+    replies = []
+    asyncio.run(queue.submit(room, command, replies.append))
+    return replies
+
+
+def test_commands_apply_in_queued_order_and_reply_when_applied():
+    queue = _queue()
+    room = _room()
+    replies = []
+    for command in ({"action": "set_speed", "speed": "fast"}, {"action": "resume"},
+                    {"action": "set_speed", "speed": "slow", "request_id": 3}):
+        asyncio.run(queue.submit(room, command, replies.append))
+
+    assert replies == []
+    assert len(queue) == 3
+    assert room.state["speed"] == "normal"
+
+    changed = queue.drain()
+
+    assert changed == [room]
+    assert len(queue) == 0
+    assert room.state["speed"] == "slow"
+    assert room.state["paused"] is False
+    assert [r["command"] for r in replies] == ["set_speed", "resume", "set_speed"]
+    assert all(r["success"] for r in replies)
+    assert replies[2]["request_id"] == 3
+
+
+def test_invalid_commands_are_rejected_at_submit():
+    queue = _queue()
+    room = _room()
+
+    unknown = _submit(queue, room, {"action": "launch", "request_id": 1})
+    bad_speed = _submit(queue, room, {"action": "set_speed", "speed": "warp"})
+    no_save = _submit(queue, room, {"action": "load_save"})
+
+    assert len(queue) == 0
+    assert unknown == [{"response_type": "command_response", "command": "launch", "success": False,
+                        "message": "Unknown action: launch", "request_id": 1}]
+    assert bad_speed[0]["success"] is False
+    assert no_save[0]["message"] == "No game state provided"
+
+
+def test_queue_calls_on_queued_only_when_it_becomes_non_empty():
+    queue = _queue()
+    room = _room()
+    calls = []
+    queue.on_queued = lambda: calls.append(len(queue))
+
+    _submit(queue, room, {"action": "pause"})
+    _submit(queue, room, {"action": "resume"})
+    queue.drain()
+    _submit(queue, room, {"action": "pause"})
+
+    assert calls == [1, 1]
+
+
+@pytest.mark.parametrize("error,message", [
+    (CommandError("Not now"), "Not now"),
+    (RuntimeError("database down"), "Command failed")
+])
+def test_prepare_failure_is_answered_and_not_queued(error, message):
+    registry = CommandRegistry()
+
+    async def prepare(command):
+        raise error
+
+    registry.handler("slow", prepare=prepare)(lambda room, command, payload: "done")
+    queue = CommandQueue(registry)
+
+    replies = _submit(queue, _room(), {"action": "slow"})
+
+    assert len(queue) == 0
+    assert replies[0]["success"] is False
+    assert replies[0]["message"] == message
+
+
+@pytest.mark.parametrize("error,message", [
+    (CommandError("Not allowed"), "Not allowed"),
+    (KeyError("nations"), "Command failed")
+])
+def test_apply_failure_is_answered_and_later_commands_still_apply(error, message):
+    registry = create_registry(_no_nations)
+
+    def broken(room, command, payload):
+        raise error
+
+    registry.handler("broken")(broken)
+    queue = CommandQueue(registry)
+    room = _room()
+    replies = []
+    asyncio.run(queue.submit(room, {"action": "broken"}, replies.append))
+    asyncio.run(queue.submit(room, {"action": "resume"}, replies.append))
+
+    assert queue.drain() == [room]
+    assert replies[0]["success"] is False
+    assert replies[0]["message"] == message
+    assert replies[1]["success"] is True
+    assert room.state["paused"] is False
+
+
+def test_new_game_hands_prepared_nations_to_apply():
+    loads = []
+
+    async def load_nations():
+        loads.append(True)
+        return [{"name": "Atlantis", "gdp": 1.0}]
+
+    queue = _queue(load_nations)
+    room = _room(date="March 1, 2030", events=[{"type": "military"}])
+
+    replies = _submit(queue, room, {"action": "new_game"})
+    # Loaded at submit, applied only at the drain
+    assert loads == [True]
+    assert room.state["date"] == "March 1, 2030"
+
+    queue.drain()
+
+    assert replies[0]["success"] is True
+    assert room.state["nations"] == [{"name": "Atlantis", "gdp": 1.0}]
+    assert room.state["date"] == new_game_state()["date"]
+    assert room.state["events"] == []
+
+
+def test_new_game_keeps_default_nations_when_loading_fails():
+    async def load_nations():
+        raise RuntimeError("database down")
+
+    queue = _queue(load_nations)
+    room = _room(nations=[])
+
+    replies = _submit(queue, room, {"action": "new_game"})
+    queue.drain()
+
+    assert replies[0]["success"] is True
+    assert room.state["nations"] == new_game_state()["nations"]
+
+
+def test_paused_rooms_leave_and_rejoin_the_scheduler():
+    queue = _queue()
+    scheduler = TickScheduler(commands=queue)
+    room = _room(paused=False)
+    scheduler.update(room)
+    assert scheduler.active_rooms == 1
+
+    _submit(queue, room, {"action": "pause"})
+    scheduler._apply_commands()
+
+    assert scheduler.active_rooms == 0
+    assert room.dirty
+
+    _submit(queue, room, {"action": "resume"})
+    scheduler._apply_commands()
+
+    assert scheduler.active_rooms == 1
+    assert scheduler.commands_applied == 2
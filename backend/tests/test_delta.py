@@ -0,0 +1,92 @@
+import copy
+import json
+import random
+
+from game_logic.game_state import new_game_state
+from game_logic.simulation import SimulationEngine
+from realtime.delta import DELTA, SNAPSHOT, StateDeltaEncoder, apply_delta
+
+
+def _over_the_wire(frame):
+    """Frames reach clients and relaying processes as JSON"""
+    return json.loads(json.dumps(frame))
+
+
+def _mirror(encoder, state):
+    snapshot = _over_the_wire(encoder.snapshot(state))
+    assert snapshot["response_type"] == SNAPSHOT
+    return snapshot["seq"], snapshot["state"]
+
+
+def _relay(encoder, state, mirror, seq):
+    """Send one delta to the mirror; returns the mirror's new sequence number"""
+    frame = encoder.delta(state)
+    if frame is None:
+        return seq
+    frame = _over_the_wire(frame)
+    assert frame["response_type"] == DELTA
+    assert frame["seq"] == seq + 1
+    apply_delta(mirror, frame)
+    return frame["seq"]
+
+
+def test_mirror_matches_source_after_many_ticks():
+    random.seed(0)
+    state = new_game_state()
+    state["paused"] = False
+    engine = SimulationEngine()
+    encoder = StateDeltaEncoder()
+    seq, mirror = _mirror(encoder, state)
+
+    for tick in range(200):
+        engine.advance(state)
+        if tick % 50 == 10:
+            state["speed"] = random.choice(["slow", "fast", "normal"])
+        seq = _relay(encoder, state, mirror, seq)
+        assert mirror == _over_the_wire(state)
+
+
+def test_structural_changes_reach_the_mirror():
+    state = new_game_state()
+    encoder = StateDeltaEncoder()
+    seq, mirror = _mirror(encoder, state)
+
+    # A nation loses a field: it is resent whole
+    nations = copy.deepcopy(state["nations"])
+    nations[0].pop("leader")
+    state["nations"] = nations
+    seq = _relay(encoder, state, mirror, seq)
+    assert mirror == _over_the_wire(state)
+
+    # The roster changes
+    state["nations"] = state["nations"][1:]
+    seq = _relay(encoder, state, mirror, seq)
+    assert mirror == _over_the_wire(state)
+
+    # A list edited in place, then a top-level field removed
+    state["events"].insert(0, {"type": "test", "text": "in place"})
+    seq = _relay(encoder, state, mirror, seq)
+    del state["speed"]
+    seq = _relay(encoder, state, mirror, seq)
+    assert mirror == _over_the_wire(state)
+
+
+def test_unchanged_state_sends_nothing():
+    state = new_game_state()
+    encoder = StateDeltaEncoder()
+    encoder.snapshot(state)
+
+    assert encoder.delta(state) is None
+    assert encoder.seq == 0
+
+
+def test_reset_resends_everything():
+    state = new_game_state()
+    encoder = StateDeltaEncoder()
+    encoder.snapshot(state)
+    encoder.reset()
+
+    frame = encoder.delta(state)
+
+    assert frame["seq"] == 1
+    assert frame["changes"] == state
@@ -0,0 +1,74 @@
+import random
+
+import numpy as np
+import pytest
+
+from game_logic.economy import EconomySystem
+from game_logic.relations import RelationshipIndex
+
+
+def _world(size: int, with_ids: bool = True, seed: int = 0):
+    rng = random.Random(seed)
+    nations = [
+        {
+            "name": f"Nation {i}",
+            "gdp": round(rng.uniform(10, 25000), 1),
+            "tax_rate": round(rng.uniform(0.15, 0.4), 2),
+            "research_spending": round(rng.uniform(0.01, 0.1), 3)
+        }
+        for i in range(size)
+    ]
+    if with_ids:
+        for i, nation in enumerate(nations):
+            nation["id"] = i + 1
+    names = [nation["name"] for nation in nations]
+    treaties = [
+        {"id": i, "type": "trade", "participants": rng.sample(names, min(size, 3))}
+        for i in range(size // 2)
+    ]
+    sanctions = [{"from": rng.choice(names), "to": rng.choice(names)} for _ in range(size // 2)]
+    return {"nations": nations, "treaties": treaties, "sanctions": sanctions}
+
+
+# Small worlds keep growth inside the clipping bounds; in 21-nation worlds some nations hit the cap
+WORLDS = [(3, True), (3, False), (21, True), (21, False)]
+
+
+@pytest.mark.parametrize("size,with_ids", WORLDS)
+def test_calculate_all_matches_calculate_gdp_growth(size, with_ids):
+    world = _world(size, with_ids)
+    economy = EconomySystem(RelationshipIndex.from_world(world))
+
+    random.seed(42)
+    expected = [economy.calculate_gdp_growth(nation, world) for nation in world["nations"]]
+    random.seed(42)
+    batched = economy.calculate_all(world)
+
+    assert batched.tolist() == expected
+
+
+@pytest.mark.parametrize("size,with_ids", WORLDS)
+def test_update_all_matches_update_gdp(size, with_ids):
+    world = _world(size, with_ids)
+    batched_world = _world(size, with_ids)
+    economy = EconomySystem(RelationshipIndex.from_world(world))
+
+    random.seed(7)
+    expected = [economy.update_gdp(nation, world) for nation in world["nations"]]
+    random.seed(7)
+    EconomySystem(RelationshipIndex.from_world(batched_world)).update_all(batched_world)
+
+    for updated, nation in zip(expected, batched_world["nations"]):
+        assert nation["gdp"] == updated["gdp"]
+        assert nation["gdp_growth_rate"] == updated["gdp_growth_rate"]
+
+
+def test_calculate_all_with_numpy_generator_stays_in_bounds():
+    world = _world(21)
+    economy = EconomySystem(RelationshipIndex.from_world(world))
+
+    growth = economy.calculate_all(world, np.random.default_rng(0))
+
+    assert growth.shape == (21,)
+    assert np.all(growth >= economy.min_growth_rate)
+    assert np.all(growth <= economy.max_growth_rate)
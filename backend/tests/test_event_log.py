@@ -0,0 +1,67 @@
+import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+
+from database.event_log import decode_cursor, query_events
+from database.models import Base, GameEvent
+
+
+@pytest.fixture
+def session():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    with Session(engine) as session:
+        yield session
+
+
+def _add_events(session, dates, room_id="r"):
+    for i, date in enumerate(dates):
+        session.add(GameEvent(event_type="political", description=f"Event {i}", date=date, room_id=room_id))
+    session.commit()
+
+
+def _all_pages(session, limit, **filters):
+    ids, cursor, pages = [], None, 0
+    while True:
+        page = query_events(session, cursor=cursor, limit=limit, **filters)
+        ids.extend(event["id"] for event in page["events"])
+        pages += 1
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, pages
+
+
+@pytest.mark.parametrize("limit", [1, 2, 3, 5, 10])
+def test_pages_across_equal_dates_neither_skip_nor_repeat(session, limit):
+    busy_day = datetime.datetime(2025, 3, 1)
+    _add_events(session, [datetime.datetime(2025, 1, 20)] + [busy_day] * 6 + [datetime.datetime(2025, 5, 9)])
+
+    ids, pages = _all_pages(session, limit)
+
+    expected = [event.id for event in session.query(GameEvent).order_by(GameEvent.date.desc(), GameEvent.id.desc())]
+    assert ids == expected
+    assert len(set(ids)) == 8
+    assert pages == -(-8 // limit)
+
+
+def test_pagination_keeps_filters_across_pages(session):
+    day = datetime.datetime(2025, 2, 2)
+    _add_events(session, [day] * 4, room_id="a")
+    _add_events(session, [day] * 4, room_id="b")
+
+    ids, _ = _all_pages(session, 3, room_id="a")
+
+    assert len(ids) == 4
+    assert {event.room_id for event in session.query(GameEvent).filter(GameEvent.id.in_(ids))} == {"a"}
+
+
+def test_cursor_round_trips_date_and_id(session):
+    _add_events(session, [datetime.datetime(2025, 1, 20)] * 2)
+
+    page = query_events(session, limit=1)
+
+    assert decode_cursor(page["next_cursor"]) == (datetime.datetime(2025, 1, 20), page["events"][0]["id"])
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
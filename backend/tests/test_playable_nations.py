@@ -0,0 +1,85 @@
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+import app as app_module
+from database.models import Base, Leader, Nation
+from database.seed_version import bump_seed_version
+from game_logic.playable_nations import PlayableNationsCache, etag_matches
+
+
+@pytest.fixture
+def engine():
+    # One shared in-memory database for the test and the endpoint's worker threads
+    engine = create_engine("sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    _seed(engine, [("France", 3000.0)])
+    return engine
+
+
+@pytest.fixture
+def client(engine, monkeypatch):
+    # Revalidate on every request so seed changes show up at once
+    monkeypatch.setattr(app_module, "playable_nations", PlayableNationsCache(engine, revalidate_interval=0))
+    return TestClient(app_module.app)
+
+
+def _seed(engine, nations):
+    """Rewrite the seed nations and bump the seed version, as the seeding tools do"""
+    with Session(engine) as session:
+        session.query(Nation).delete()
+        session.query(Leader).delete()
+        for name, gdp in nations:
+            leader = Leader(name=f"Leader of {name}", personality_type="diplomatic")
+            session.add(Nation(name=name, gdp=gdp, military_power=50.0, leader=leader))
+        bump_seed_version(session)
+        session.commit()
+
+
+def test_matching_if_none_match_returns_304(client):
+    first = client.get("/playable-nations")
+    etag = first.headers["etag"]
+
+    again = client.get("/playable-nations", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert [nation["name"] for nation in first.json()] == ["France"]
+    assert again.status_code == 304
+    assert again.headers["etag"] == etag
+    assert again.content == b""
+
+
+def test_new_seed_version_invalidates_body_and_etag(client, engine):
+    etag = client.get("/playable-nations").headers["etag"]
+
+    _seed(engine, [("France", 3000.0), ("Poland", 800.0)])
+    response = client.get("/playable-nations", headers={"If-None-Match": etag})
+
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+    assert [nation["name"] for nation in response.json()] == ["France", "Poland"]
+
+
+def test_cache_is_not_rebuilt_while_the_seed_version_holds(engine):
+    cache = PlayableNationsCache(engine, revalidate_interval=0)
+    body, etag = cache.get()
+
+    # Written without bumping the version: the cached body stays
+    with Session(engine) as session:
+        session.query(Nation).update({Nation.gdp: 1.0})
+        session.commit()
+
+    assert cache.get() == (body, etag)
+
+
+def test_etag_matching_is_weak_and_handles_lists_and_wildcards():
+    etag = 'W/"3-abc"'
+
+    assert etag_matches('W/"3-abc"', etag)
+    assert etag_matches('"3-abc"', etag)
+    assert etag_matches('"1-old", W/"3-abc"', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches('W/"2-abc"', etag)
+    assert not etag_matches(None, etag)
@@ -0,0 +1,96 @@
+import asyncio
+
+import fakeredis
+import pytest
+
+from database.relation_matrix import (
+    MATRIX_KEY, MAX_RELATION, MIN_RELATION, NEUTRAL_RELATION, RelationMatrix
+)
+
+NATIONS = ["France", "Germany", "Poland", "Ukraine"]
+
+
+def _run(scenario):
+    """Run scenario(matrix) against a fresh fake Redis holding the NATIONS matrix"""
+    async def main():
+        redis = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+        matrix = RelationMatrix(redis)
+        await matrix.initialize(NATIONS, {("France", "Germany"): 90, ("Ukraine", "Poland"): 120})
+        await scenario(matrix)
+
+    asyncio.run(main())
+
+
+def test_pair_offsets_are_row_major():
+    async def scenario(matrix):
+        size = len(NATIONS)
+        assert await matrix._offset("France", "France") == 0
+        assert await matrix._offset("France", "Ukraine") == size - 1
+        assert await matrix._offset("Germany", "France") == size
+        assert await matrix._offset("Ukraine", "Poland") == 3 * size + 2
+        assert await matrix._offset("Ukraine", "Ukraine") == size * size - 1
+
+        raw = await matrix.redis.get(MATRIX_KEY)
+        assert len(raw) == size * size
+        assert raw[await matrix._offset("France", "Germany")] == 90
+
+    _run(scenario)
+
+
+def test_initialize_clamps_defaults_and_fills_the_diagonal():
+    async def scenario(matrix):
+        # Listed pairs are one-way; values are clamped to the relation range
+        assert await matrix.get("France", "Germany") == 90
+        assert await matrix.get("Germany", "France") == NEUTRAL_RELATION
+        assert await matrix.get("Ukraine", "Poland") == MAX_RELATION
+        for nation in NATIONS:
+            assert await matrix.get(nation, nation) == MAX_RELATION
+
+    _run(scenario)
+
+
+def test_set_is_symmetric_unless_asked_otherwise():
+    async def scenario(matrix):
+        await matrix.set("Poland", "Germany", 70)
+        assert await matrix.get("Poland", "Germany") == 70
+        assert await matrix.get("Germany", "Poland") == 70
+
+        await matrix.set("Poland", "Germany", -5, symmetric=False)
+        assert await matrix.get("Poland", "Germany") == MIN_RELATION
+        assert await matrix.get("Germany", "Poland") == 70
+
+    _run(scenario)
+
+
+def test_rows_skip_self_and_unknown_nations():
+    async def scenario(matrix):
+        rows = await matrix.rows(["France", "Atlantis", "Ukraine"])
+
+        assert set(rows) == {"France", "Ukraine"}
+        assert rows["France"] == {"Germany": 90, "Poland": NEUTRAL_RELATION, "Ukraine": NEUTRAL_RELATION}
+        assert rows["Ukraine"]["Poland"] == MAX_RELATION
+        assert await matrix.row("Atlantis") == {}
+
+    _run(scenario)
+
+
+def test_index_is_reloaded_from_redis_in_row_order():
+    async def scenario(matrix):
+        fresh = RelationMatrix(matrix.redis)
+
+        assert await fresh.load_index() == {name: i for i, name in enumerate(NATIONS)}
+        assert fresh.size == len(NATIONS)
+        assert await fresh.get("France", "Germany") == 90
+        assert await fresh.row("Poland") == await matrix.row("Poland")
+
+    _run(scenario)
+
+
+def test_unknown_nations_raise():
+    async def scenario(matrix):
+        with pytest.raises(KeyError, match="Atlantis"):
+            await matrix.get("France", "Atlantis")
+        with pytest.raises(KeyError, match="Atlantis"):
+            await matrix.set("Atlantis", "France", 10)
+
+    _run(scenario)
@@ -0,0 +1,75 @@
+import pytest
+
+from game_logic.economy import EconomySystem
+from game_logic.relations import RelationshipIndex, nation_key
+from realtime.rooms import Room
+
+
+def _world(with_ids: bool):
+    nations = [{"name": name, "gdp": 100.0} for name in ("A", "B", "C")]
+    if with_ids:
+        for i, nation in enumerate(nations):
+            nation["id"] = i + 1
+    return {
+        "nations": nations,
+        "treaties": [{"id": "t1", "type": "trade", "participants": ["A", "B", "C"]}],
+        "sanctions": [{"from": "A", "to": "B"}]
+    }
+
+
+def test_nation_key_prefers_id_and_falls_back_to_name():
+    assert nation_key({"id": 7, "name": "A"}) == 7
+    assert nation_key({"name": "A"}) == "A"
+
+
+@pytest.mark.parametrize("with_ids", [True, False])
+def test_sanctions_by_name_are_found(with_ids):
+    world = _world(with_ids)
+    a, b, c = world["nations"]
+    economy = EconomySystem(RelationshipIndex.from_world(world))
+
+    assert economy._get_sanctions(b, world) == [a]
+    assert economy._get_sanctions(a, world) == []
+    assert economy._get_trade_partners(b, world) == [c]
+    assert economy._get_trade_partners(c, world) == [a, b]
+
+
+def test_trade_partners_come_from_trade_treaties():
+    world = _world(with_ids=True)
+    world["treaties"] = [
+        {"id": "t1", "type": "trade", "participants": ["A", "B"]},
+        {"id": "t2", "type": "defense", "participants": ["B", "C"]}
+    ]
+    a, b, c = world["nations"]
+    index = RelationshipIndex.from_world(world)
+    economy = EconomySystem(index)
+
+    assert economy._get_trade_partners(c, world) == []
+    assert economy._get_trade_partners(a, world) == [b]
+
+    index.remove_treaty("t1")
+
+    assert economy._get_trade_partners(a, world) == []
+
+
+def test_room_rebuilds_relations_when_state_is_replaced():
+    room = Room("r", {"nations": [{"name": "A"}, {"name": "B"}]})
+    assert room.relations.trade_partners("A") == set()
+
+    room.replace_state(_world(with_ids=False))
+
+    assert room.relations.trade_partners("A") == {"B", "C"}
+    assert room.relations.sanctions_on("B") == {"A"}
+    assert [n["name"] for n in room.state["nations"]] == ["A", "B", "C"]
+
+
+@pytest.mark.parametrize("with_ids", [True, False])
+def test_relationship_counts_match_per_nation_lookups(with_ids):
+    world = _world(with_ids)
+    economy = EconomySystem(RelationshipIndex.from_world(world))
+
+    trade_partners, sanctions = economy._relationship_counts(world)
+
+    for i, nation in enumerate(world["nations"]):
+        assert trade_partners[i] == len(economy._get_trade_partners(nation, world))
+        assert sanctions[i] == len(economy._get_sanctions(nation, world))
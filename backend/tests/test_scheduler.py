@@ -0,0 +1,113 @@
+import asyncio
+
+import pytest
+
+from game_logic.game_state import new_game_state
+from realtime import metrics
+from realtime.rooms import Room
+from realtime.scheduler import TickScheduler
+
+
+class _Room:
+    def __init__(self, period: float = 1.0):
+        self.id = "r"
+        self.period = period
+
+
+def test_on_time_ticks_keep_absolute_deadlines():
+    for policy in ("catch_up", "skip", "slow_down"):
+        scheduler = TickScheduler(policy)
+        room = _Room()
+
+        assert scheduler._next_deadline(room, 10.0, 10.2) == 11.0
+        assert scheduler.missed_deadlines == 0
+
+
+def test_skip_jumps_past_missed_deadlines_and_counts_them():
+    scheduler = TickScheduler("skip")
+
+    # Deadlines 11, 12 and 13 have all passed by 13.5
+    assert scheduler._next_deadline(_Room(), 10.0, 13.5) == 14.0
+    assert scheduler.missed_deadlines == 3
+
+
+def test_slow_down_restarts_from_now_and_counts_missed_deadlines():
+    scheduler = TickScheduler("slow_down")
+
+    assert scheduler._next_deadline(_Room(), 10.0, 13.5) == 14.5
+    assert scheduler.missed_deadlines == 3
+
+
+def test_catch_up_runs_missed_ticks_back_to_back_then_skips():
+    scheduler = TickScheduler("catch_up")
+    room = _Room()
+    deadline, now = 0.0, 100.0
+
+    for _ in range(TickScheduler.MAX_CATCH_UP_TICKS):
+        next_deadline = scheduler._next_deadline(room, deadline, now)
+        assert next_deadline == deadline + 1.0
+        deadline = next_deadline
+    assert scheduler.missed_deadlines == 0
+
+    # Still behind after the allowed burst: skip ahead like "skip" does
+    assert scheduler._next_deadline(room, deadline, now) == 101.0
+    assert scheduler.missed_deadlines == 95
+    assert room.id not in scheduler._behind
+
+
+def test_catch_up_burst_resets_once_back_on_time():
+    scheduler = TickScheduler("catch_up")
+    room = _Room()
+
+    scheduler._next_deadline(room, 0.0, 3.5)
+    assert scheduler._behind[room.id] == 1
+
+    assert scheduler._next_deadline(room, 1.0, 1.5) == 2.0
+    assert room.id not in scheduler._behind
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ValueError):
+        TickScheduler("rewind")
+
+
+def test_tick_jitter_is_exported():
+    metrics.tick_jitter.observe(0.003)
+
+    rendered = metrics.registry.render()
+
+    assert "# TYPE geo_tick_jitter_seconds histogram" in rendered
+    assert "geo_tick_jitter_seconds_count" in rendered
+
+
+def test_dirty_marks_within_one_frame_flush_once():
+    room = Room("r", new_game_state())
+    flushed = []
+    broadcast = room.flush
+
+    def flush():
+        flushed.append(room.dirty)
+        broadcast()
+
+    room.flush = flush
+
+    async def scenario():
+        scheduler = TickScheduler(frame_interval=0.02)
+        task = asyncio.create_task(scheduler.run())
+        try:
+            for _ in range(3):
+                scheduler.mark_dirty(room)
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0.1)
+            assert flushed == [True]
+            assert not room.dirty
+
+            scheduler.mark_dirty(room)
+            await asyncio.sleep(0.1)
+            assert flushed == [True, True]
+            assert scheduler.dirty_marks == 4
+            assert scheduler.flushes == 2
+        finally:
+            task.cancel()
+
+    asyncio.run(scenario())
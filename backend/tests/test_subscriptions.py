@@ -0,0 +1,93 @@
+import pytest
+
+from game_logic.game_state import new_game_state
+from realtime.codecs import CodecError
+from realtime.delta import DELTA, SNAPSHOT, StateDeltaEncoder
+from realtime.subscriptions import EVERYTHING, Interest, parse_names
+
+
+def _frames():
+    """A snapshot, then a delta that moves the date and two nations' GDP"""
+    state = new_game_state()
+    encoder = StateDeltaEncoder()
+    snapshot = encoder.snapshot(state)
+    state["date"] = "January 21, 2025"
+    state["events"] = [{"type": "economic", "description": "Boom"}]
+    # The engine replaces nation dicts rather than mutating them
+    for i, growth in ((0, 10), (1, 5)):
+        state["nations"][i] = dict(state["nations"][i], gdp=state["nations"][i]["gdp"] + growth)
+    return snapshot, encoder.delta(state)
+
+
+def test_everything_passes_frames_through_unchanged():
+    snapshot, delta = _frames()
+
+    assert snapshot["response_type"] == SNAPSHOT
+    assert EVERYTHING.everything
+    assert EVERYTHING.filter_frame(snapshot) is snapshot
+    assert EVERYTHING.filter_frame(delta) is delta
+
+
+def test_snapshot_keeps_subscribed_nations_and_fields():
+    snapshot, _ = _frames()
+    interest = EVERYTHING.subscribe(nations=["China"], fields=["nations"])
+
+    state = interest.filter_frame(snapshot)["state"]
+
+    assert [nation["name"] for nation in state["nations"]] == ["China"]
+    # The clock and controls always come along
+    assert set(state) == {"nations", "date", "speed", "paused"}
+
+
+def test_delta_keeps_subscribed_nation_patches_and_its_seq():
+    _, delta = _frames()
+    assert delta["response_type"] == DELTA
+
+    china = EVERYTHING.subscribe(nations=["China"], fields=["nations"]).filter_frame(delta)
+    events = EVERYTHING.subscribe(fields=["events"]).filter_frame(delta)
+
+    assert china["seq"] == delta["seq"]
+    assert set(china["nations"]) == {"China"}
+    assert "events" not in china.get("changes", {})
+    assert china["changes"]["date"] == "January 21, 2025"
+    assert "nations" not in events
+    assert events["changes"]["events"] == [{"type": "economic", "description": "Boom"}]
+
+
+def test_delta_with_nothing_of_interest_keeps_its_seq():
+    _, delta = _frames()
+
+    filtered = EVERYTHING.subscribe(nations=["Ukraine"]).filter_frame(delta)
+
+    assert filtered["seq"] == delta["seq"]
+    assert "nations" not in filtered
+
+
+def test_subscribe_widens_and_naming_nations_implies_the_nations_field():
+    interest = EVERYTHING.subscribe(fields=["events"]).subscribe(nations=["India"])
+
+    assert interest.describe() == {"nations": ["India"], "fields": ["events", "nations"]}
+    assert interest == Interest(["India"], ["events", "nations"])
+    assert hash(interest) == hash(Interest(["India"], ["nations", "events"]))
+
+
+def test_unsubscribe_narrows_and_bare_unsubscribe_resets():
+    names = [nation["name"] for nation in new_game_state()["nations"]]
+
+    interest = EVERYTHING.unsubscribe(nations=["Russia"], all_nations=names)
+
+    assert "Russia" not in interest.nations
+    assert len(interest.nations) == len(names) - 1
+    assert interest.fields is None
+    assert interest.unsubscribe() == EVERYTHING
+
+
+@pytest.mark.parametrize("value", ["China", [1, 2], {"China": True}, ["China", None]])
+def test_malformed_names_are_rejected(value):
+    with pytest.raises(CodecError):
+        parse_names(value)
+
+
+def test_absent_names_mean_no_change():
+    assert parse_names(None) is None
+    assert parse_names(["China"]) == ["China"]
@@ -1 +1,143 @@
- 
\ No newline at end of file
+// Client side of the game state delta protocol.
+//
+// The server sends a full "state_snapshot" on connect and on resync, then
+// one "state_delta" per change carrying only the fields that changed. Every
+// frame has a sequence number; a delta is only applied on top of the frame
+// directly before it; a gap means we missed something and must resync.
+
+import { encode, decode } from "@msgpack/msgpack";
+import { inflateRaw } from "pako";
+
+export const SNAPSHOT = "state_snapshot";
+export const DELTA = "state_delta";
+
+// Wire formats offered to the server, most preferred first. The server
+// picks one as the WebSocket subprotocol; JSON is always available.
+export const MSGPACK_PROTOCOL = "geo.msgpack";
+export const JSON_PROTOCOL = "geo.json";
+export const SUBPROTOCOLS = [MSGPACK_PROTOCOL, JSON_PROTOCOL];
+
+// "+deflate" formats compress large frames with a preset dictionary
+// fetched from the server. Their frames start with one flag byte.
+export const DEFLATE_SUFFIX = "+deflate";
+const FLAG_DEFLATE = 1;
+
+// Fetch the compression dictionary; null disables compressed formats
+export async function loadCompressionDictionary(url) {
+  try {
+    const response = await fetch(url);
+    if (!response.ok) {
+      return null;
+    }
+    return new Uint8Array(await response.arrayBuffer());
+  } catch (error) {
+    console.warn("Compression dictionary unavailable:", error);
+    return null;
+  }
+}
+
+// Subprotocols to offer, compressed MessagePack first when we have a dictionary
+export function subprotocolsFor(dictionary) {
+  return dictionary ? [MSGPACK_PROTOCOL + DEFLATE_SUFFIX, ...SUBPROTOCOLS] : SUBPROTOCOLS;
+}
+
+// Decode a server message in the socket's negotiated format. Binary frames
+// are MessagePack (or, for "+deflate" formats, flagged and maybe compressed);
+// text frames are JSON. The socket's binaryType must be "arraybuffer".
+export function decodeMessage(data, socket, dictionary) {
+  if (typeof data === "string") {
+    return JSON.parse(data);
+  }
+
+  let payload = new Uint8Array(data);
+  const protocol = socket.protocol || "";
+  if (protocol.endsWith(DEFLATE_SUFFIX)) {
+    const flag = payload[0];
+    payload = payload.subarray(1);
+    if (flag === FLAG_DEFLATE) {
+      payload = inflateRaw(payload, { dictionary });
+    }
+    if (protocol.startsWith(JSON_PROTOCOL)) {
+      return JSON.parse(new TextDecoder().decode(payload));
+    }
+  }
+  return decode(payload);
+}
+
+// Encode a command in the wire format negotiated for this socket. Commands
+// are never compressed; they are small.
+export function encodeCommand(socket, command) {
+  if ((socket.protocol || "").startsWith(MSGPACK_PROTOCOL)) {
+    return encode(command);
+  }
+  return JSON.stringify(command);
+}
+
+export class GameStateSync {
+  constructor({ requestResync } = {}) {
+    this.state = null;
+    this.seq = null;
+    this.requestResync = requestResync || (() => {});
+    this.resyncPending = false;
+  }
+
+  // Returns true if the message is a state frame (snapshot or delta)
+  static isStateFrame(message) {
+    return message.response_type === SNAPSHOT || message.response_type === DELTA;
+  }
+
+  // Apply a state frame. Returns the new state object, or null if the frame
+  // could not be applied (a resync has been requested in that case).
+  apply(message) {
+    if (message.response_type === SNAPSHOT) {
+      this.state = message.state;
+      this.seq = message.seq;
+      this.resyncPending = false;
+      return this.state;
+    }
+
+    if (message.response_type !== DELTA) {
+      return null;
+    }
+
+    // Out-of-order or missing frame: drop it and ask for a fresh snapshot
+    if (this.state === null || message.seq !== this.seq + 1) {
+      if (this.state !== null && message.seq <= this.seq) {
+        return null;  // Stale frame already covered by a snapshot
+      }
+      this.resync();
+      return null;
+    }
+
+    // Build a new top-level object so reactive consumers see the change
+    const state = { ...this.state, ...(message.changes || {}) };
+
+    for (const key of message.removed || []) {
+      delete state[key];
+    }
+
+    if (message.nations) {
+      state.nations = state.nations.map((nation) => {
+        const patch = message.nations[nation.name];
+        return patch ? { ...nation, ...patch } : nation;
+      });
+    }
+
+    this.state = state;
+    this.seq = message.seq;
+    return state;
+  }
+
+  resync() {
+    if (!this.resyncPending) {
+      this.resyncPending = true;
+      this.requestResync();
+    }
+  }
+
+  reset() {
+    this.state = null;
+    this.seq = null;
+    this.resyncPending = false;
+  }
+}
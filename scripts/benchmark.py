@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark suite for the Geopolitics 2025 backend.
+
+Measures the hot paths of the live server against generated worlds of
+10, 1,000 and 10,000 nations, in-process: no Docker, Postgres or Redis is
+needed. The benchmarks are:
+- tick: one room tick (Room.tick), the work simulate_game_progression does
+  per tick, with no clients connected: date, nation update and event roll
+- economy_per_nation: EconomySystem.calculate_gdp_growth for one nation
+- economy_world: EconomySystem.calculate_all for the whole world
+- serialize_snapshot / serialize_delta: encoding a full snapshot and a
+  one-tick delta frame, as JSON and as MessagePack
+- fanout: ConnectionManager.broadcast_game_state to fake sockets, until
+  every client's writer has sent the frame
+
+Results (milliseconds per operation, median of several runs) are written as
+JSON. Given a baseline written by an earlier run, any benchmark slower than
+the baseline by more than the tolerance fails the run.
+
+Usage:
+    python scripts/benchmark.py --output benchmark_results.json
+    python scripts/benchmark.py --baseline benchmark_results.json --tolerance 0.5
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import asyncio
+import argparse
+import platform
+import statistics
+import timeit
+from typing import Any, Callable, Dict, List
+
+# Run against the backend sources, with an in-memory database in case anything touches it
+BACKEND_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "backend")
+sys.path.insert(0, BACKEND_DIR)
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+
+import numpy as np
+
+from game_logic.economy import EconomySystem
+from game_logic.game_state import new_game_state
+from game_logic.relations import RelationshipIndex
+from realtime.codecs import JSON, MSGPACK, EncodedFrame, available_codecs
+from realtime.connections import ConnectionManager
+from realtime.delta import StateDeltaEncoder
+from realtime.rooms import Room
+
+DEFAULT_SIZES = [10, 1000, 10000]
+
+# Nations whose growth is computed for the per-nation economy benchmark
+ECONOMY_SAMPLE = 100
+
+# Timed runs per benchmark; the median is reported
+REPEATS = 5
+
+
+def generate_world(size: int, seed: int = 0) -> Dict[str, Any]:
+    """
+    A game state with `size` nations, plus alliances, trade treaties and
+    sanctions so the economy has relationships to resolve.
+    """
+    rng = random.Random(seed)
+    state = new_game_state()
+    state["paused"] = False
+    state["nations"] = [
+        {
+            "id": i + 1,
+            "name": f"Nation {i + 1}",
+            "leader": f"Leader {i + 1}",
+            "gdp": round(rng.uniform(10, 25000), 1),
+            "military_power": round(rng.uniform(5, 100), 1),
+            "tax_rate": round(rng.uniform(0.15, 0.4), 2),
+            "research_spending": round(rng.uniform(0.01, 0.1), 3)
+        }
+        for i in range(size)
+    ]
+    names = [nation["name"] for nation in state["nations"]]
+    state["alliances"] = [
+        {"name": f"Alliance {i + 1}", "members": names[i:i + 5]}
+        for i in range(0, size, 25)
+    ]
+    state["treaties"] = [
+        {"name": f"Treaty {i + 1}", "type": "trade", "participants": rng.sample(names, min(2, size))}
+        for i in range(size)
+    ]
+    state["sanctions"] = [
+        {"from": rng.choice(names), "to": rng.choice(names)}
+        for _ in range(size // 10)
+    ]
+    return state
+
+
+def measure(fn: Callable[[], Any], repeats: int = REPEATS) -> float:
+    """Median milliseconds per call, each run long enough to time reliably"""
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    runs = timer.repeat(repeat=repeats, number=number)
+    return statistics.median(runs) / number * 1000
+
+
+def bench_tick(state: Dict[str, Any]) -> float:
+    room = Room("benchmark", state)
+    room.tick()  # Load the engine's buffers outside the timed runs
+    return measure(room.tick)
+
+
+def bench_economy(state: Dict[str, Any]) -> Dict[str, float]:
+    economy = EconomySystem(RelationshipIndex.from_world(state))
+    sample = state["nations"][:ECONOMY_SAMPLE]
+
+    def per_nation():
+        for nation in sample:
+            economy.calculate_gdp_growth(nation, state)
+
+    return {
+        "economy_per_nation": measure(per_nation) / len(sample),
+        "economy_world": measure(lambda: economy.calculate_all(state))
+    }
+
+
+def bench_serialization(state: Dict[str, Any]) -> Dict[str, float]:
+    results = {}
+    engine = Room("benchmark", state).engine
+    engine.advance(state)
+    encoder = StateDeltaEncoder()
+    snapshot = encoder.snapshot(state)
+
+    # A realistic delta: every nation changed by one tick
+    engine.advance(state)
+    delta = encoder.delta(state)
+
+    for codec in (JSON, MSGPACK):
+        if codec not in available_codecs():
+            continue
+        results[f"serialize_snapshot_{codec}"] = measure(lambda: EncodedFrame(snapshot).get(codec))
+        results[f"serialize_delta_{codec}"] = measure(lambda: EncodedFrame(delta).get(codec))
+    return results
+
+
+class FakeWebSocket:
+    """Stands in for a Starlette WebSocket; counts what it is sent"""
+
+    def __init__(self, subprotocols: List[str], counter: Dict[str, int]):
+        self.scope = {"subprotocols": subprotocols}
+        self.counter = counter
+
+    async def accept(self, subprotocol=None):
+        pass
+
+    async def send_text(self, data: str):
+        self.counter["sent"] += 1
+
+    async def send_bytes(self, data: bytes):
+        self.counter["sent"] += 1
+
+
+async def _bench_fanout(state: Dict[str, Any], clients: int) -> float:
+    manager = ConnectionManager(state)
+    counter = {"sent": 0}
+    for i in range(clients):
+        # Half the clients negotiate MessagePack, the rest stay on JSON
+        subprotocols = ["geo.msgpack"] if i % 2 and MSGPACK in available_codecs() else []
+        await manager.connect(FakeWebSocket(subprotocols, counter))
+
+    async def drain(expected: int):
+        while counter["sent"] < expected:
+            await asyncio.sleep(0)
+
+    # Initial snapshots go out before timing starts
+    await drain(clients)
+    engine = Room("benchmark", state).engine
+    runs = []
+    for _ in range(REPEATS):
+        engine.advance(state)
+        expected = counter["sent"] + clients
+        started = time.perf_counter()
+        manager.broadcast_game_state()
+        await drain(expected)
+        runs.append(time.perf_counter() - started)
+
+    for websocket in list(manager.active_connections):
+        manager.disconnect(websocket)
+    return statistics.median(runs) * 1000
+
+
+def run_benchmarks(sizes: List[int], clients: int) -> Dict[str, Dict[str, float]]:
+    """
+    Returns:
+        Dict: benchmark name -> world size (as a string) -> milliseconds per operation
+    """
+    results: Dict[str, Dict[str, float]] = {}
+
+    def record(name: str, size: int, value: float):
+        results.setdefault(name, {})[str(size)] = round(value, 4)
+        print(f"  {name:<28}{value:>12.4f} ms")
+
+    for size in sizes:
+        print(f"\n{size} nations")
+        record("tick", size, bench_tick(generate_world(size)))
+        for name, value in bench_economy(generate_world(size)).items():
+            record(name, size, value)
+        for name, value in bench_serialization(generate_world(size)).items():
+            record(name, size, value)
+        record(f"fanout_{clients}_clients", size, asyncio.run(_bench_fanout(generate_world(size), clients)))
+    return results
+
+
+def compare(results: Dict[str, Dict[str, float]], baseline: Dict[str, Dict[str, float]],
+            tolerance: float) -> List[str]:
+    """Benchmarks slower than their baseline by more than the tolerance"""
+    regressions = []
+    for name, by_size in results.items():
+        for size, value in by_size.items():
+            expected = baseline.get(name, {}).get(size)
+            if expected and value > expected * (1 + tolerance):
+                regressions.append(
+                    f"{name} at {size} nations: {value:.4f} ms vs baseline {expected:.4f} ms "
+                    f"(+{(value / expected - 1) * 100:.0f}%)"
+                )
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline backend benchmarks")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="World sizes (nations)")
+    parser.add_argument("--clients", type=int, default=100, help="Fake sockets for the fan-out benchmark")
+    parser.add_argument("--output", default="benchmark_results.json", help="JSON file the results are written to")
+    parser.add_argument("--baseline", help="Results of an earlier run to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="Allowed slowdown over the baseline (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    print(f"Benchmarking {', '.join(str(size) for size in args.sizes)} nations...")
+    results = run_benchmarks(args.sizes, args.clients)
+
+    report = {
+        "environment": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        },
+        "results": results
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"\nWrote results to {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%} against {args.baseline}:")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+        print(f"No regressions over {args.tolerance:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    # Fix encoding for Windows
+    if sys.platform.startswith('win'):
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    main()
@@ -1,51 +1,277 @@
+#!/usr/bin/env python3
+"""
+WebSocket load generator for the Geopolitics 2025 backend.
+
+Opens many concurrent /ws clients from one asyncio process. Each client
+sends commands drawn from a weighted mix of pause/resume/set_speed at a
+fixed rate and records:
+- tick delivery latency: the server's "ts" on each state frame to the time
+  the client received it (client and server clocks are assumed to agree,
+  i.e. a local backend)
+- command round trip: sending a command with a request_id to receiving the
+  command_response echoing it
+- dropped clients (failed to connect or disconnected early) and slow
+  clients (tick latency p95 over a threshold, or frames skipped by the
+  server, which shows up as a fresh snapshot mid-stream)
+
+Usage:
+    python scripts/test_websocket.py --clients 2000 --duration 60
+    python scripts/test_websocket.py --clients 500 --mix pause=1,resume=3,set_speed=2 --command-rate 0.5
+"""
+
+import sys
+import json
+import time
+import random
 import asyncio
+import argparse
+import itertools
+from typing import Any, Dict, List, Optional
+
 import websockets
-import json
 
-async def test_websocket():
-    uri = "ws://localhost:3000/api/ws"
-    print(f"Connecting to {uri}...")
-    
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
+DEFAULT_URL = "ws://localhost:8000/ws"
+
+# Subprotocols offered per wire format
+SUBPROTOCOLS = {"json": "geo.json", "msgpack": "geo.msgpack"}
+
+SPEEDS = ["very_slow", "slow", "normal", "fast", "very_fast"]
+
+# Message types of the state protocol
+SNAPSHOT = "state_snapshot"
+DELTA = "state_delta"
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    """Parse "pause=1,resume=3,set_speed=2" into action weights"""
+    weights = {}
+    for part in mix.split(","):
+        action, _, weight = part.partition("=")
+        if action.strip() not in ("pause", "resume", "set_speed"):
+            raise argparse.ArgumentTypeError(f"Unknown action in mix: {action}")
+        weights[action.strip()] = float(weight or 1)
+    return weights
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of samples given in seconds, in milliseconds"""
+    if not samples:
+        return {"count": 0, "p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {
+        "count": len(ordered),
+        "p50": round(ordered[int(last * 0.50)] * 1000, 3),
+        "p95": round(ordered[int(last * 0.95)] * 1000, 3),
+        "p99": round(ordered[int(last * 0.99)] * 1000, 3),
+        "max": round(ordered[-1] * 1000, 3)
+    }
+
+
+class LoadClient:
+    """One simulated player: receives frames and sends commands from the mix"""
+
+    _ids = itertools.count(1)
+
+    def __init__(self, args, weights: Dict[str, float]):
+        self.id = next(self._ids)
+        self.args = args
+        self.actions = list(weights)
+        self.weights = list(weights.values())
+        self.rng = random.Random(args.seed + self.id)
+        self.pending: Dict[str, float] = {}  # request_id -> perf_counter at send
+        self.tick_latency: List[float] = []
+        self.command_rtt: List[float] = []
+        self.frames = 0
+        self.resyncs = 0
+        self.commands_sent = 0
+        self.connected = False
+        self.error: Optional[str] = None
+
+    def decode(self, data) -> Any:
+        if isinstance(data, bytes):
+            return msgpack.unpackb(data, raw=False)
+        return json.loads(data)
+
+    def encode(self, command: Dict[str, Any]):
+        if self.args.codec == "msgpack":
+            return msgpack.packb(command, use_bin_type=True)
+        return json.dumps(command)
+
+    def next_command(self) -> Dict[str, Any]:
+        action = self.rng.choices(self.actions, self.weights)[0]
+        command = {"action": action, "request_id": f"{self.id}-{self.commands_sent}"}
+        if action == "set_speed":
+            command["speed"] = self.rng.choice(SPEEDS)
+        return command
+
+    async def run(self, deadline: float):
+        url = self.args.url + (f"?room={self.args.room}" if self.args.room else "")
+        try:
+            async with websockets.connect(
+                url, subprotocols=[SUBPROTOCOLS[self.args.codec]], open_timeout=self.args.connect_timeout,
+                max_size=None, ping_interval=None
+            ) as websocket:
+                self.connected = True
+                sender = asyncio.create_task(self.send_commands(websocket, deadline))
+                try:
+                    await self.receive(websocket, deadline)
+                finally:
+                    sender.cancel()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            self.error = f"{type(e).__name__}: {e}"
+
+    async def receive(self, websocket, deadline: float):
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            try:
+                data = await asyncio.wait_for(websocket.recv(), remaining)
+            except asyncio.TimeoutError:
+                return
+            received = time.time()
+            message = self.decode(data)
+            response_type = message.get("response_type")
+
+            if response_type in (SNAPSHOT, DELTA):
+                self.frames += 1
+                if response_type == SNAPSHOT and self.frames > 1:
+                    # The server collapsed this client's backlog into a snapshot
+                    self.resyncs += 1
+                if response_type == DELTA and "ts" in message:
+                    self.tick_latency.append(max(0.0, received - message["ts"]))
+            elif response_type == "command_response":
+                sent = self.pending.pop(message.get("request_id"), None)
+                if sent is not None:
+                    self.command_rtt.append(time.perf_counter() - sent)
+
+    async def send_commands(self, websocket, deadline: float):
+        if self.args.command_rate <= 0:
+            return
+        interval = 1.0 / self.args.command_rate
+        # Spread clients over the interval instead of sending in lockstep
+        await asyncio.sleep(self.rng.uniform(0, interval))
+        while time.monotonic() < deadline:
+            command = self.next_command()
+            self.pending[command["request_id"]] = time.perf_counter()
+            await websocket.send(self.encode(command))
+            self.commands_sent += 1
+            await asyncio.sleep(interval)
+
+    def is_slow(self, threshold: float) -> bool:
+        if self.resyncs:
+            return True
+        return percentiles(self.tick_latency)["p95"] > threshold
+
+
+def raise_open_file_limit(clients: int):
+    """Each client needs a socket; raise the soft descriptor limit where the OS allows it"""
     try:
-        async with websockets.connect(uri) as websocket:
-            print("Connected!")
-            
-            # Receive initial state
-            data = await websocket.recv()
-            parsed = json.loads(data)
-            print(f"Received game state:")
-            print(f"- Date: {parsed.get('date', 'Not found')}")
-            print(f"- Nations: {len(parsed.get('nations', []))}")
-            print(f"- Paused: {parsed.get('paused', 'Unknown')}")
-            
-            # Test pause command
-            print("\nSending pause command...")
-            await websocket.send(json.dumps({"action": "pause"}))
-            await asyncio.sleep(1)
-            
-            # Receive updated state
-            data = await websocket.recv()
-            parsed = json.loads(data)
-            print("\nReceived updated game state:")
-            print(f"- Date: {parsed.get('date', 'Not found')}")
-            print(f"- Paused: {parsed.get('paused', 'Unknown')}")
-            
-            # Test resume command
-            print("\nSending resume command...")
-            await websocket.send(json.dumps({"action": "resume"}))
-            await asyncio.sleep(1)
-            
-            # Receive updated state
-            data = await websocket.recv()
-            parsed = json.loads(data)
-            print("\nReceived updated game state:")
-            print(f"- Date: {parsed.get('date', 'Not found')}")
-            print(f"- Paused: {parsed.get('paused', 'Unknown')}")
-            
-            print("\nWebSocket test completed successfully!")
-    
-    except Exception as e:
-        print(f"Error: {e}")
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    wanted = clients + 256
+    if soft < wanted:
+        limit = wanted if hard == resource.RLIM_INFINITY else min(wanted, hard)
+        resource.setrlimit(resource.RLIMIT_NOFILE, (limit, hard))
+        if limit < wanted:
+            print(f"Warning: open file limit is {limit}; some of the {clients} clients may fail to connect")
+
+
+async def run_load(args) -> Dict[str, Any]:
+    weights = parse_mix(args.mix)
+    clients = [LoadClient(args, weights) for _ in range(args.clients)]
+    deadline = time.monotonic() + args.ramp + args.duration
+
+    print(f"Connecting {args.clients} clients to {args.url} over {args.ramp}s "
+          f"({args.codec}, {args.command_rate} commands/s each, mix {args.mix})...")
+    tasks = []
+    for client in clients:
+        tasks.append(asyncio.create_task(client.run(deadline)))
+        if args.ramp > 0:
+            await asyncio.sleep(args.ramp / args.clients)
+    await asyncio.gather(*tasks)
+
+    failed = [client for client in clients if not client.connected]
+    dropped = [client for client in clients if client.connected and client.error]
+    slow = [client for client in clients if client.connected and client.is_slow(args.slow_ms)]
+    commands_sent = sum(client.commands_sent for client in clients)
+    unanswered = sum(len(client.pending) for client in clients)
+
+    report = {
+        "clients": args.clients,
+        "duration_s": args.duration,
+        "codec": args.codec,
+        "mix": weights,
+        "connected": args.clients - len(failed),
+        "failed_to_connect": len(failed),
+        "dropped": len(dropped),
+        "slow": len(slow),
+        "frames_received": sum(client.frames for client in clients),
+        "server_resyncs": sum(client.resyncs for client in clients),
+        "commands_sent": commands_sent,
+        "commands_unanswered": unanswered,
+        "tick_latency_ms": percentiles([sample for client in clients for sample in client.tick_latency]),
+        "command_rtt_ms": percentiles([sample for client in clients for sample in client.command_rtt]),
+        "errors": sorted({client.error for client in failed + dropped})[:10]
+    }
+    return report
+
+
+def print_report(report: Dict[str, Any]):
+    print(f"\nClients: {report['connected']}/{report['clients']} connected, "
+          f"{report['failed_to_connect']} failed, {report['dropped']} dropped, {report['slow']} slow")
+    print(f"Frames received: {report['frames_received']} ({report['server_resyncs']} server resyncs)")
+    print(f"Commands: {report['commands_sent']} sent, {report['commands_unanswered']} unanswered")
+    for label, key in (("Tick delivery latency", "tick_latency_ms"), ("Command round trip", "command_rtt_ms")):
+        stats = report[key]
+        print(f"{label:<22} n={stats['count']:<8} p50={stats['p50']:.1f}ms p95={stats['p95']:.1f}ms "
+              f"p99={stats['p99']:.1f}ms max={stats['max']:.1f}ms")
+    for error in report["errors"]:
+        print(f"- {error}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the /ws endpoint with many concurrent clients")
+    parser.add_argument("--url", default=DEFAULT_URL, help="WebSocket URL of the backend")
+    parser.add_argument("--room", help="Room to join (default: the default room)")
+    parser.add_argument("--clients", type=int, default=100, help="Concurrent clients")
+    parser.add_argument("--duration", type=float, default=30.0, help="Seconds to run after the ramp-up")
+    parser.add_argument("--ramp", type=float, default=5.0, help="Seconds over which clients connect")
+    parser.add_argument("--command-rate", type=float, default=0.2, help="Commands per second per client")
+    parser.add_argument("--mix", default="pause=1,resume=3,set_speed=2", help="Weighted command mix")
+    parser.add_argument("--codec", choices=list(SUBPROTOCOLS), default="json", help="Wire format to negotiate")
+    parser.add_argument("--slow-ms", type=float, default=250.0, help="Tick latency p95 marking a client slow")
+    parser.add_argument("--connect-timeout", type=float, default=10.0, help="Seconds to wait for the handshake")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the command mix")
+    parser.add_argument("--output", help="Also write the report to this JSON file")
+    args = parser.parse_args()
+
+    parse_mix(args.mix)
+    if args.codec == "msgpack" and msgpack is None:
+        parser.error("--codec msgpack needs the msgpack package")
+
+    raise_open_file_limit(args.clients)
+    report = asyncio.run(run_load(args))
+    print_report(report)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote report to {args.output}")
+
 
 if __name__ == "__main__":
-    asyncio.run(test_websocket()) 
\ No newline at end of file
+    # Fix encoding for Windows
+    if sys.platform.startswith('win'):
+        import io
+        sys.stdout = io.TextIOWrapper(sys.stdout.buffer, encoding='utf-8')
+    main()